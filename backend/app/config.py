@@ -9,8 +9,13 @@ class Config:
     BASE_DIR = Path('/app') if Path('/app/reports').exists() else Path(__file__).parent.parent.parent
     REPORTS_DIR = BASE_DIR / 'reports'
     GRAPHICS_DIR = REPORTS_DIR / 'graficas'
+    CACHE_DIR = REPORTS_DIR / 'cache'
     DATA_DIR = BASE_DIR / 'data'
 
+    # Esquemas de datos (réplica de utils/config.py, el backend no importa utils)
+    CATEGORIES_SCHEMA = {'CategoryID': 'int32', 'CategoryName': 'category'}
+    PRODUCT_CATEGORY_SCHEMA = {'v.Code_pr': 'int32', 'v.code': 'int32'}
+
     # Flask config
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     DEBUG = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
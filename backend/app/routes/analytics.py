@@ -80,25 +80,39 @@ def get_product_analysis():
         current_app.logger.error(f"Error en /products: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def _load_catalog(parquet_name, csv_name, schema, header='infer'):
+    """
+    Carga un catálogo desde la caché parquet del pipeline o, si no existe,
+    desde el CSV original con el mismo esquema de dtypes
+    """
+    parquet_path = current_app.config['CACHE_DIR'] / parquet_name
+    if parquet_path.exists():
+        return pd.read_parquet(parquet_path)
+
+    csv_path = current_app.config['DATA_DIR'] / 'DataSet' / 'Products' / csv_name
+    return pd.read_csv(
+        csv_path,
+        sep='|',
+        names=list(schema) if header is None else None,
+        header=header,
+        dtype=schema
+    )
+
 def generate_category_summary():
     """Genera resumen de productos por categoría"""
     try:
-        data_dir = current_app.config['DATA_DIR']
-
-        # Leer archivos de datos
-        categories_df = pd.read_csv(
-            data_dir / 'DataSet' / 'Products' / 'Categories.csv',
-            sep='|',
-            names=['categoria_id', 'categoria_nombre'],
+        categories_df = _load_catalog(
+            'categories.parquet',
+            'Categories.csv',
+            current_app.config['CATEGORIES_SCHEMA'],
             header=None
-        )
-
-        product_category_df = pd.read_csv(
-            data_dir / 'DataSet' / 'Products' / 'ProductCategory.csv',
-            sep='|',
-            names=['producto_id', 'categoria_id'],
-            skiprows=1
-        )
+        ).rename(columns={'CategoryID': 'categoria_id', 'CategoryName': 'categoria_nombre'})
+
+        product_category_df = _load_catalog(
+            'product_category.parquet',
+            'ProductCategory.csv',
+            current_app.config['PRODUCT_CATEGORY_SCHEMA']
+        ).rename(columns={'v.Code_pr': 'producto_id', 'v.code': 'categoria_id'})
 
         # Contar productos por categoría
         category_counts = product_category_df.groupby('categoria_id').size().reset_index(name='total_productos')
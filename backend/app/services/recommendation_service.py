@@ -1,6 +1,7 @@
 """
 Servicio de recomendaciones de productos basado en reglas de asociación
 """
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from flask import current_app
@@ -12,6 +13,7 @@ class RecommendationService:
         self.reglas = None
         self.frecuencia_clientes = None
         self.transacciones = None
+        self.coocurrencia = None
         self._load_data()
 
     def _load_data(self):
@@ -32,13 +34,19 @@ class RecommendationService:
             # Cargar transacciones para obtener historial de clientes
             trans_path = self.reports_dir / 'cache' / 'transactions_transformed.parquet'
             if trans_path.exists():
-                self.transacciones = pd.read_parquet(trans_path)
-                # Convertir productos_str a lista si existe
-                if 'productos_str' in self.transacciones.columns:
-                    self.transacciones['productos_list'] = self.transacciones['productos_str'].apply(
-                        lambda x: [int(p) for p in str(x).split()] if pd.notna(x) and str(x).strip() else []
-                    )
+                # La columna 'productos' es list<int32>: cada fila llega como arreglo
+                # de enteros, ya sin repetidos y ordenado
+                self.transacciones = pd.read_parquet(trans_path, columns=['persona_id', 'productos'])
+                self.transacciones = self.transacciones.rename(columns={'productos': 'productos_list'})
                 current_app.logger.info(f"Transacciones cargadas: {len(self.transacciones)} registros")
+
+            # Matriz de co-ocurrencia persistida por el pipeline (CSR en .npz,
+            # claves de scipy.sparse.save_npz); se lee solo con numpy
+            cooc_path = Path(current_app.config['CACHE_DIR']) / 'product_cooccurrence.npz'
+            if cooc_path.exists():
+                with np.load(cooc_path) as f:
+                    self.coocurrencia = {key: f[key] for key in ('indptr', 'indices', 'data', 'product_ids', 'counts')}
+                current_app.logger.info(f"Co-ocurrencia cargada: {len(self.coocurrencia['product_ids'])} productos")
         except Exception as e:
             current_app.logger.error(f"Error cargando datos para recomendaciones: {str(e)}")
 
@@ -69,11 +77,10 @@ class RecommendationService:
                     "recommendations": []
                 }
 
-            # Obtener todos los productos que el cliente ha comprado
-            customer_products = set()
-            for products_list in customer_transactions['productos_list']:
-                if isinstance(products_list, list):
-                    customer_products.update(products_list)
+            # Obtener todos los productos que el cliente ha comprado (arreglo
+            # ordenado: la unión de canastas ya ordenadas no necesita sets)
+            baskets = [products for products in customer_transactions['productos_list'] if products is not None]
+            customer_products = np.unique(np.concatenate(baskets)) if baskets else np.empty(0, dtype=np.int64)
 
             # Obtener estadísticas del cliente
             num_transactions = len(customer_transactions)
@@ -83,7 +90,7 @@ class RecommendationService:
             recommendations = []
 
             if self.reglas is not None and len(self.reglas) > 0:
-                for product in customer_products:
+                for product in customer_products.tolist():
                     product_str = str(product)
 
                     # Buscar reglas donde el producto es antecedente
@@ -96,7 +103,8 @@ class RecommendationService:
                         consequents = [int(p.strip()) for p in str(rule['consecuente']).split(',')]
 
                         # Filtrar productos que el cliente ya compró
-                        new_products = [p for p in consequents if p not in customer_products]
+                        bought = np.isin(consequents, customer_products)
+                        new_products = [p for p, seen in zip(consequents, bought) if not seen]
 
                         for rec_product in new_products:
                             recommendations.append({
@@ -120,7 +128,7 @@ class RecommendationService:
                 "customer_stats": {
                     "num_transactions": int(num_transactions),
                     "total_products_bought": int(total_products),
-                    "unique_products": list(customer_products)[:20]  # Limitar para no saturar
+                    "unique_products": customer_products[:20].tolist()  # Limitar para no saturar
                 },
                 "recommendations": recommendations[:top_n],
                 "total_recommendations": len(recommendations)
@@ -145,15 +153,29 @@ class RecommendationService:
             product_id = int(product_id)
             product_str = str(product_id)
 
-            if self.reglas is None:
+            if self.reglas is None and self.coocurrencia is None:
                 return {"error": "Reglas de asociación no disponibles"}
 
             # Buscar reglas donde el producto es antecedente
-            matching_rules = self.reglas[
-                self.reglas['antecedente'].str.contains(product_str, na=False, regex=False)
-            ].copy()
+            if self.reglas is not None:
+                matching_rules = self.reglas[
+                    self.reglas['antecedente'].str.contains(product_str, na=False, regex=False)
+                ].copy()
+            else:
+                matching_rules = pd.DataFrame()
 
             if len(matching_rules) == 0:
+                # Sin reglas: vecinos de la matriz de co-ocurrencia
+                recommendations = self._cooccurrence_neighbors(product_id, top_n)
+                if recommendations:
+                    return {
+                        "product_id": product_id,
+                        "product_stats": self._get_product_stats(product_id),
+                        "recommendations": recommendations,
+                        "total_recommendations": len(recommendations),
+                        "based_on_rules": 0,
+                        "source": "coocurrencia"
+                    }
                 return {
                     "product_id": product_id,
                     "message": "No se encontraron recomendaciones para este producto",
@@ -202,6 +224,57 @@ class RecommendationService:
             current_app.logger.error(f"Error generando recomendaciones para producto {product_id}: {str(e)}")
             return {"error": str(e)}
 
+    def _cooccurrence_neighbors(self, product_id: int, top_n: int = 10):
+        """
+        Productos que más se compran junto con product_id según la co-ocurrencia
+
+        Returns:
+            Lista de dicts con producto_id, soporte, confianza, lift,
+            num_transacciones y score (mismo formato que las reglas)
+        """
+        if self.coocurrencia is None:
+            return []
+
+        cooc = self.coocurrencia
+        code = np.flatnonzero(cooc['product_ids'] == product_id)
+        if len(code) == 0:
+            return []
+        code = int(code[0])
+
+        start, end = cooc['indptr'][code], cooc['indptr'][code + 1]
+        cols = cooc['indices'][start:end]
+        counts = cooc['data'][start:end].astype(np.int64)
+        # La diagonal (canastas con el producto) no es una recomendación
+        item_count = counts[cols == code].sum()
+        mask = cols != code
+        cols, counts = cols[mask], counts[mask]
+        if item_count == 0 or len(cols) == 0:
+            return []
+
+        order = np.argsort(-counts, kind='stable')[:top_n]
+        cols, counts = cols[order], counts[order]
+
+        # Diagonal de las columnas vecinas: canastas con cada vecino
+        indptr, indices, data = cooc['indptr'], cooc['indices'], cooc['data']
+        neighbor_counts = np.array([
+            data[indptr[c]:indptr[c + 1]][indices[indptr[c]:indptr[c + 1]] == c].sum() for c in cols
+        ], dtype=np.int64)
+
+        n = max(int(cooc['counts'][1]), 1)
+        confianza = counts / item_count
+        lift = confianza * n / np.maximum(neighbor_counts, 1)
+        return [
+            {
+                'producto_id': int(cooc['product_ids'][c]),
+                'lift': round(float(l), 2),
+                'confianza': round(float(conf), 4),
+                'soporte': round(float(cnt / n), 4),
+                'num_transacciones': int(cnt),
+                'score': float(l) * float(conf)
+            }
+            for c, cnt, conf, l in zip(cols, counts, confianza, lift)
+        ]
+
     def _get_product_stats(self, product_id: int):
         """Obtiene estadísticas de un producto"""
         try:
@@ -3,7 +3,6 @@ from __future__ import annotations
 from datetime import datetime
 from pathlib import Path
 
-import numpy as np
 import pandas as pd
 from airflow import DAG
 from airflow.operators.empty import EmptyOperator
@@ -11,7 +10,9 @@ from airflow.operators.python import PythonOperator
 from airflow.utils.task_group import TaskGroup
 
 from utils.analyzer import DatasetAnalyzer
-from utils.config import REPORTS_DIR
+from utils.basket_store import BasketStore, refresh_basket_stores
+from utils.config import CACHE_DIR, CACHE_FILES, REPORTS_DIR, SCHEMAS, TRANSACTIONS_DIR
+from utils.cooccurrence import build_cooccurrence, load_cooccurrence
 from utils.customer_analysis import (
     analyze_customer_behavior_summary,
     analyze_customer_frequency,
@@ -19,16 +20,19 @@ from utils.customer_analysis import (
     segment_customers,
 )
 from utils.data_loader import (
+    apply_schema,
     load_categories,
     load_product_category,
     load_transactions,
 )
+from utils.ingestion_cache import read_transaction_shards, refresh_transaction_shards
 from utils.data_review import (
     check_data_quality,
     get_data_summary,
 )
 from utils.data_transformer import (
-    transform_transactions_data,
+    refresh_transformed_partitions,
+    quarantine_summary,
     analyze_products_per_transaction,
     analyze_by_transaction_type,
     get_product_frequency,
@@ -37,6 +41,7 @@ from utils.product_analysis import (
     analyze_product_cooccurrence,
     analyze_top_products,
 )
+from utils.product_dictionary import build_product_dictionary, load_product_dictionary
 from utils.product_analysis_optimized import analyze_association_rules_optimized
 from utils.statistics import descriptive_statistics_numeric
 from utils.temporal_analysis import (
@@ -47,13 +52,13 @@ from utils.temporal_analysis import (
     analyze_trends_and_seasonality,
     analyze_weekly_sales,
 )
+from utils.transformed_store import head_transformed, legacy_view, read_transformed
 from utils.visualization import generate_all_visualizations
 
-CACHE_DIR = REPORTS_DIR / "cache"
-RAW_TRANSACTIONS_PATH = CACHE_DIR / "transactions.parquet"
-TRANSFORMED_TRANSACTIONS_PATH = CACHE_DIR / "transactions_transformed.parquet"
-CATEGORIES_PATH = CACHE_DIR / "categories.parquet"
-PRODUCT_CATEGORY_PATH = CACHE_DIR / "product_category.parquet"
+TRANSFORMED_TRANSACTIONS_PATH = CACHE_DIR / CACHE_FILES["transactions_transformed"]
+CATEGORIES_PATH = CACHE_DIR / CACHE_FILES["categories"]
+PRODUCT_CATEGORY_PATH = CACHE_DIR / CACHE_FILES["product_category"]
+BASKET_STORE_DIR = CACHE_DIR / "basket_store"
 
 VENTAS_DIARIAS_PATH = REPORTS_DIR / "ventas_diarias.csv"
 VENTAS_SEMANALES_PATH = REPORTS_DIR / "ventas_semanales.csv"
@@ -78,13 +83,20 @@ CUSTOMER_SUMMARY_PATH = REPORTS_DIR / "customer_behavior_summary.csv"
 
 GRAPHICS_DIR = REPORTS_DIR / "graficas"
 
+# Rango de fechas [fecha_desde, fecha_hasta) y tipos de transacción para
+# los análisis temporales y de clientes; se leen solo esas particiones
+ANALYSIS_PARAMS = {"fecha_desde": None, "fecha_hasta": None, "tipos": None}
+
 
 def ensure_directories():
     for path in (REPORTS_DIR, CACHE_DIR, GRAPHICS_DIR):
         path.mkdir(parents=True, exist_ok=True)
 
 
-def _write(df: pd.DataFrame, path: Path):
+def _write(df: pd.DataFrame, path: Path, schema: dict | None = None):
+    # El parquet conserva los dtypes compactos del registro para las tareas y el backend
+    if schema is not None:
+        df = apply_schema(df, schema)
     path.parent.mkdir(parents=True, exist_ok=True)
     df.to_parquet(path, index=False)
 
@@ -97,28 +109,55 @@ def _load_with_analyzer(load_fn: str, attr: str) -> pd.DataFrame:
 
 def load_categories_task():
     df = _load_with_analyzer("load_categories", "categories")
-    _write(df, CATEGORIES_PATH)
+    _write(df, CATEGORIES_PATH, SCHEMAS["categories"])
 
 
 def load_product_category_task():
     df = _load_with_analyzer("load_product_category", "product_category")
-    _write(df, PRODUCT_CATEGORY_PATH)
+    _write(df, PRODUCT_CATEGORY_PATH, SCHEMAS["product_category"])
+    # Códigos densos por producto del catálogo, compartidos por las tareas de conteo
+    build_product_dictionary().save(CACHE_DIR)
 
 
 def load_transactions_task():
-    df = _load_with_analyzer("load_transactions", "transactions")
-    _write(df, RAW_TRANSACTIONS_PATH)
+    # Solo se parsean los CSV nuevos o modificados; los shards por archivo
+    # son el dataset crudo (no se reescribe una copia completa cada noche)
+    refresh_transaction_shards(TRANSACTIONS_DIR, CACHE_DIR)
 
 
 def transform_transactions_task():
-    df = pd.read_parquet(RAW_TRANSACTIONS_PATH)
-    transformed = transform_transactions_data(df)
-    transformed.to_parquet(TRANSFORMED_TRANSACTIONS_PATH, index=False)
-    transformed.head(1000).to_csv(
+    # Solo se transforman los archivos fuente nuevos o modificados (en
+    # paralelo, EDA_TRANSFORM_WORKERS) y se compactan los meses que tocan
+    # Los registros inválidos o con productos fuera del catálogo quedan en
+    # cuarentena: el dataset que leen las demás tareas ya está limpio
+    dictionary = load_product_dictionary(CACHE_DIR)
+    result = refresh_transformed_partitions(
+        TRANSFORMED_TRANSACTIONS_PATH, CACHE_DIR, catalog=dictionary.catalog_ids
+    )
+    quarantine_summary(TRANSFORMED_TRANSACTIONS_PATH).to_csv(
+        REPORTS_DIR / "cuarentena_transacciones.csv", index=False
+    )
+    # Un almacén de canastas por mes: solo se reescriben los meses compactados
+    refresh_basket_stores(TRANSFORMED_TRANSACTIONS_PATH, BASKET_STORE_DIR, result["months"])
+    # La muestra son las primeras transacciones por fecha, de todos los
+    # tipos; solo se leen los primeros meses
+    sample = head_transformed(TRANSFORMED_TRANSACTIONS_PATH, 1000)
+    legacy_view(sample).to_csv(
         REPORTS_DIR / "transacciones_transformadas_sample.csv", index=False
     )
 
 
+def _basket_store() -> BasketStore:
+    # Mapeado en memoria: las tareas concurrentes comparten la caché de páginas
+    return BasketStore(BASKET_STORE_DIR)
+
+
+def _filters(params: dict | None) -> dict:
+    # Filtros opcionales del DAG (params o conf del dag_run); None = sin filtrar
+    params = params or {}
+    return {key: params.get(key) for key in ANALYSIS_PARAMS}
+
+
 def _save_review_outputs(df: pd.DataFrame, dataset_name: str, summary_path: Path):
     summary_df = pd.DataFrame([get_data_summary(df)])
     summary_df.to_csv(summary_path, index=False)
@@ -140,83 +179,73 @@ def review_product_category_task():
 
 
 def review_transactions_task():
-    df = pd.read_parquet(RAW_TRANSACTIONS_PATH)
+    df = read_transaction_shards(CACHE_DIR)
     _save_review_outputs(df, "TRANSACTIONS", REPORTS_DIR / "transactions_summary.csv")
 
 
 def descriptive_stats_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
+    # Solo las columnas numéricas de la transacción: las dimensiones de
+    # tiempo precalculadas (año, mes, hora...) no son medidas
+    df = read_transformed(
+        TRANSFORMED_TRANSACTIONS_PATH, columns=["tipo_transaccion", "persona_id", "num_productos"]
+    )
     stats = descriptive_statistics_numeric(df, name="TRANSACTIONS_TRANSFORMED")
     if stats is not None:
         stats.to_csv(ESTADISTICAS_NUMERICAS_PATH, index=False)
 
 
 def products_per_transaction_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
+    df = _basket_store().to_frame()
     stats = analyze_products_per_transaction(df)
     pd.DataFrame([stats]).to_csv(PRODUCTOS_POR_TRANSACCION_PATH, index=False)
 
 
-def _ensure_list(value):
-    if isinstance(value, list):
-        return value
-    if isinstance(value, np.ndarray):
-        return value.tolist()
-    if pd.isna(value) or value is None:
-        return []
-    return [value]
-
-
 def top_products_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    if "productos_list" in df.columns:
-        df["productos_list"] = df["productos_list"].apply(_ensure_list)
+    df = _basket_store()
     top_df = analyze_top_products(df, top_n=50)
     top_df.to_csv(TOP_PRODUCTOS_PATH, index=False)
 
 
 def transactions_summary_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
+    df = _basket_store().to_frame()
     stats_df = analyze_by_transaction_type(df).reset_index()
     stats_df.to_csv(TRANSACCIONES_TIPO_PATH, index=False)
 
 
-def daily_sales_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    analyze_daily_sales(df).to_csv(VENTAS_DIARIAS_PATH, index=False)
+def daily_sales_task(params=None):
+    result = analyze_daily_sales(TRANSFORMED_TRANSACTIONS_PATH, **_filters(params))
+    result.to_csv(VENTAS_DIARIAS_PATH, index=False)
 
 
-def weekly_sales_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    analyze_weekly_sales(df).to_csv(VENTAS_SEMANALES_PATH, index=False)
+def weekly_sales_task(params=None):
+    result = analyze_weekly_sales(TRANSFORMED_TRANSACTIONS_PATH, **_filters(params))
+    result.to_csv(VENTAS_SEMANALES_PATH, index=False)
 
 
-def monthly_sales_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    analyze_monthly_sales(df).to_csv(VENTAS_MENSUALES_PATH, index=False)
+def monthly_sales_task(params=None):
+    result = analyze_monthly_sales(TRANSFORMED_TRANSACTIONS_PATH, **_filters(params))
+    result.to_csv(VENTAS_MENSUALES_PATH, index=False)
 
 
-def weekday_patterns_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    analyze_day_of_week_patterns(df).to_csv(VENTAS_DIA_SEMANA_PATH, index=False)
+def weekday_patterns_task(params=None):
+    result = analyze_day_of_week_patterns(TRANSFORMED_TRANSACTIONS_PATH, **_filters(params))
+    result.to_csv(VENTAS_DIA_SEMANA_PATH, index=False)
 
 
-def hourly_patterns_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    analyze_hourly_patterns(df).to_csv(VENTAS_POR_HORA_PATH, index=False)
+def hourly_patterns_task(params=None):
+    result = analyze_hourly_patterns(TRANSFORMED_TRANSACTIONS_PATH, **_filters(params))
+    result.to_csv(VENTAS_POR_HORA_PATH, index=False)
 
 
-def trends_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    trends = analyze_trends_and_seasonality(df)
+def trends_task(params=None):
+    trends = analyze_trends_and_seasonality(TRANSFORMED_TRANSACTIONS_PATH, **_filters(params))
     ventas_mensuales = trends.get("ventas_mensuales", pd.DataFrame())
     if isinstance(ventas_mensuales, pd.DataFrame) and not ventas_mensuales.empty:
         ventas_mensuales.to_csv(TRENDS_PATH, index=False)
 
 
-def customer_frequency_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    freq = analyze_customer_frequency(df)
+def customer_frequency_task(params=None):
+    freq = analyze_customer_frequency(TRANSFORMED_TRANSACTIONS_PATH, **_filters(params))
     freq.to_csv(FRECUENCIA_CLIENTES_PATH, index=False)
 
     # Exportar top 10 clientes
@@ -228,14 +257,12 @@ def customer_frequency_task():
     top_clientes.to_csv(TOP_CLIENTES_PATH, index=False)
 
 
-def time_between_purchases_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    time_df = analyze_time_between_purchases(df)
+def time_between_purchases_task(params=None):
+    time_df = analyze_time_between_purchases(TRANSFORMED_TRANSACTIONS_PATH, **_filters(params))
     time_df.to_csv(TIEMPO_ENTRE_COMPRAS_PATH, index=False)
 
 
-def segment_customers_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
+def segment_customers_task(params=None):
     freq = pd.read_csv(FRECUENCIA_CLIENTES_PATH)
     if (
         TIEMPO_ENTRE_COMPRAS_PATH.exists()
@@ -244,33 +271,39 @@ def segment_customers_task():
         tiempo = pd.read_csv(TIEMPO_ENTRE_COMPRAS_PATH)
     else:
         tiempo = pd.DataFrame()
-    segments = segment_customers(df, freq, tiempo)
+    segments = segment_customers(TRANSFORMED_TRANSACTIONS_PATH, freq, tiempo, **_filters(params))
     segments.to_csv(SEGMENTACION_CLIENTES_PATH, index=False)
     summary = analyze_customer_behavior_summary(segments)
     pd.DataFrame([summary]).to_csv(CUSTOMER_SUMMARY_PATH, index=False)
 
 
 def top_products_detailed_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    if "productos_list" in df.columns:
-        df["productos_list"] = df["productos_list"].apply(_ensure_list)
+    df = _basket_store()
     detailed = get_product_frequency(df, top_n=200)
     detailed.to_csv(PRODUCTOS_TOP_DETALLADO_PATH, index=False)
 
 
 def cooccurrence_task():
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    cooc = analyze_product_cooccurrence(df, top_n=100)
+    # La matriz persistida la reutilizan association_rules_task y el backend
+    matrix = build_cooccurrence(_basket_store(), dictionary=load_product_dictionary(CACHE_DIR))
+    matrix.save(CACHE_DIR)
+    cooc = analyze_product_cooccurrence(matrix, top_n=100)
     cooc.to_csv(COOCURRENCIA_PATH, index=False)
 
 
 def association_rules_task():
     """Genera reglas de asociación usando FP-Growth (optimizado)"""
-    df = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
+    # Solo las columnas que usa la minería: las canastas van a una matriz dispersa
+    df = read_transformed(TRANSFORMED_TRANSACTIONS_PATH, columns=["productos", "tiene_productos"])
+    try:
+        cooccurrence = load_cooccurrence(CACHE_DIR)
+    except (FileNotFoundError, ValueError):
+        cooccurrence = None
 
     # Usar FP-Growth optimizado (10-100x más rápido)
     rules_df = analyze_association_rules_optimized(
         df,
+        cooccurrence=cooccurrence,
         min_support=0.01,      # 1% = ~11,000 transacciones
         min_confidence=0.3,     # 30% confianza mínima
         use_fpgrowth=True,      # FP-Growth (rápido) vs Apriori (lento)
@@ -292,12 +325,8 @@ def association_rules_task():
 
 
 def export_global_summary_task():
-    analyzer = DatasetAnalyzer()
-    analyzer.load_categories()
-    analyzer.load_product_category()
-    analyzer.load_transactions()
-    analyzer.transactions_transformed = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
-    analyzer.export_summary(REPORTS_DIR)
+    # Los datasets se leen de la caché parquet al pedir cada resumen, sin re-parsear CSV
+    DatasetAnalyzer(cache_dir=CACHE_DIR).export_summary(REPORTS_DIR)
 
 
 def _safe_read_csv(path: Path, parse_dates: list | None = None) -> pd.DataFrame:
@@ -325,7 +354,7 @@ def visualization_task():
     # Cargar transacciones transformadas para visualizaciones analíticas
     df_transactions = None
     if TRANSFORMED_TRANSACTIONS_PATH.exists():
-        df_transactions = pd.read_parquet(TRANSFORMED_TRANSACTIONS_PATH)
+        df_transactions = read_transformed(TRANSFORMED_TRANSACTIONS_PATH)
 
     generate_all_visualizations(
         ventas_diarias,
@@ -358,6 +387,7 @@ with DAG(
     default_args=default_args,
     description="EDA modular para ventas",
     tags=["eda", "ventas"],
+    params=ANALYSIS_PARAMS,
 ) as dag:
     start = PythonOperator(
         task_id="ensure_directories",
@@ -474,6 +504,7 @@ with DAG(
             task_id="association_rules",
             python_callable=association_rules_task,
         )
+        cooc >> rules  # las reglas reutilizan la matriz de co-ocurrencia
 
     export_summary = PythonOperator(
         task_id="export_global_summary",
@@ -0,0 +1,109 @@
+"""
+Script para generar transacciones sintéticas con el formato crudo del dataset
+Ejecutar desde la raíz del proyecto:
+    python scripts/generate_synthetic_data.py --escala 10 --workers 4
+
+Los archivos se escriben por defecto en data/synthetic/Transactions_x<escala>;
+para analizarlos, apuntar TRANSACTIONS_DIR (o el argumento transactions_dir de
+los loaders) a ese directorio.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar directorio raíz al path ANTES de los imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.config import (
+    SYNTHETIC_BASKET_MAX,
+    SYNTHETIC_BASKET_MEAN,
+    SYNTHETIC_CUSTOMERS,
+    SYNTHETIC_DAYS,
+    SYNTHETIC_DIR,
+    SYNTHETIC_SEED,
+    SYNTHETIC_START_DATE,
+    SYNTHETIC_TIPO_WEIGHTS,
+    SYNTHETIC_TRANSACTIONS,
+    SYNTHETIC_ZIPF_EXPONENT,
+)
+from utils.synthetic_data import COMPRESSION_EXTENSIONS, generate_transactions
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Generar transacciones sintéticas fecha|tipo|id|productos")
+    parser.add_argument("--salida", type=Path, default=None,
+                        help="Directorio destino (por defecto data/synthetic/Transactions_x<escala>)")
+    parser.add_argument("--escala", type=float, default=1.0,
+                        help="Multiplicador de transacciones y clientes (1, 10, 100...)")
+    parser.add_argument("--dias", type=int, default=SYNTHETIC_DAYS, help="Número de días (un archivo por día)")
+    parser.add_argument("--inicio", default=SYNTHETIC_START_DATE, help="Primer día, AAAA-MM-DD")
+    parser.add_argument("--transacciones", type=int, default=SYNTHETIC_TRANSACTIONS,
+                        help="Transacciones totales a escala 1")
+    parser.add_argument("--clientes", type=int, default=SYNTHETIC_CUSTOMERS, help="Clientes a escala 1")
+    parser.add_argument("--tipos", type=int, nargs="+", default=list(SYNTHETIC_TIPO_WEIGHTS),
+                        help="Tipos de transacción (tiendas)")
+    parser.add_argument("--pesos-tipos", type=float, nargs="+", default=None,
+                        help="Peso de cada tipo (por defecto los del README, o iguales si se cambian los tipos)")
+    parser.add_argument("--media-canasta", type=float, default=SYNTHETIC_BASKET_MEAN,
+                        help="Media de productos por canasta")
+    parser.add_argument("--max-canasta", type=int, default=SYNTHETIC_BASKET_MAX,
+                        help="Máximo de productos por canasta")
+    parser.add_argument("--dispersion-canasta", type=float, default=1.0,
+                        help="Parámetro r de la binomial negativa (menor = cola más larga)")
+    parser.add_argument("--zipf", type=float, default=SYNTHETIC_ZIPF_EXPONENT,
+                        help="Exponente de popularidad de productos")
+    parser.add_argument("--grupos-por-fila", type=int, default=1,
+                        help="Transacciones por fila en formato ancho")
+    parser.add_argument("--compresion", choices=[c for c in COMPRESSION_EXTENSIONS if c], default=None,
+                        help="Comprimir los archivos (por defecto CSV plano)")
+    parser.add_argument("--semilla", type=int, default=SYNTHETIC_SEED, help="Semilla del generador")
+    parser.add_argument("--workers", type=int, default=1, help="Días generados en paralelo")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Función principal"""
+    args = parse_args(argv)
+
+    if args.pesos_tipos is not None:
+        if len(args.pesos_tipos) != len(args.tipos):
+            print("ERROR: --pesos-tipos debe tener un peso por cada tipo de --tipos")
+            return 1
+        tipo_weights = dict(zip(args.tipos, args.pesos_tipos))
+    elif args.tipos == list(SYNTHETIC_TIPO_WEIGHTS):
+        tipo_weights = SYNTHETIC_TIPO_WEIGHTS
+    else:
+        tipo_weights = {tipo: 1.0 for tipo in args.tipos}
+
+    output_dir = args.salida or SYNTHETIC_DIR / f"Transactions_x{args.escala:g}"
+
+    try:
+        generate_transactions(
+            output_dir,
+            n_days=args.dias,
+            start_date=args.inicio,
+            n_transactions=args.transacciones,
+            scale=args.escala,
+            n_customers=args.clientes,
+            tipo_weights=tipo_weights,
+            basket_mean=args.media_canasta,
+            basket_max=args.max_canasta,
+            basket_dispersion=args.dispersion_canasta,
+            zipf_exponent=args.zipf,
+            groups_per_row=args.grupos_por_fila,
+            compression=args.compresion,
+            seed=args.semilla,
+            n_workers=args.workers,
+        )
+    except ValueError as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
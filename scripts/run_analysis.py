@@ -11,10 +11,9 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-import pandas as pd
 from utils.analyzer import DatasetAnalyzer
 from utils.config import REPORTS_DIR
-from utils.data_transformer import transform_transactions_data
+from utils.data_transformer import transform_transactions_sharded
 from utils.statistics import descriptive_statistics_numeric
 from utils.temporal_analysis import (
     analyze_daily_sales,
@@ -35,6 +34,8 @@ from utils.product_analysis import (
     analyze_association_rules,
     analyze_product_cooccurrence,
 )
+from utils.product_dictionary import load_product_dictionary
+from utils.product_frequency import product_frequency
 from utils.visualization import generate_all_visualizations
 
 warnings.filterwarnings("ignore")
@@ -79,7 +80,8 @@ def main():
         print("=" * 70)
 
         print("\n2.1 Transformando estructura de transacciones...")
-        df_transformed = transform_transactions_data(analyzer.transactions)
+        # Por rangos de filas en un pool de procesos (EDA_TRANSFORM_WORKERS, 1 = secuencial)
+        df_transformed = transform_transactions_sharded(analyzer.transactions)
 
         # Guardar datos transformados
         analyzer.transactions_transformed = df_transformed
@@ -130,24 +132,12 @@ def main():
 
         print("\n5.1 Calculando frecuencia de productos...")
 
-        # Expandir lista de productos
-        all_products = []
-        for products in df_transformed["productos_list"]:
-            if products:
-                all_products.extend(products)
-
-        # Contar frecuencias
-        product_freq = pd.Series(all_products).value_counts()
-        product_freq_df = pd.DataFrame(
-            {
-                "producto_id": product_freq.index,
-                "frecuencia": product_freq.values,
-                "porcentaje": (product_freq.values / product_freq.sum() * 100).round(2),
-            }
-        )
+        # Un solo bincount sobre los arreglos de canastas, sin expandir listas
+        product_freq, _ = product_frequency(df_transformed)
+        product_freq_df = product_freq[["producto_id", "frecuencia", "porcentaje"]]
 
-        print(f"\n✓ Total productos únicos: {len(product_freq)}")
-        print(f"✓ Total items vendidos: {len(all_products):,}")
+        print(f"\n✓ Total productos únicos: {len(product_freq_df)}")
+        print(f"✓ Total items vendidos: {product_freq_df['frecuencia'].sum():,}")
         print("\nTop 10 productos más vendidos:")
         print(product_freq_df.head(10).to_string(index=False))
 
@@ -313,15 +303,19 @@ def main():
         productos_top.to_csv(REPORTS_DIR / "productos_top_detallado.csv", index=False)
         print(f"\n✓ Guardado en: {REPORTS_DIR / 'productos_top_detallado.csv'}")
 
+        # Diccionario de productos: los conteos trabajan sobre códigos int32
+        diccionario = load_product_dictionary()
+
         print("\n12.2 Co-ocurrencia de productos:")
-        coocurrencia = analyze_product_cooccurrence(df_transformed, top_n=50)
+        coocurrencia = analyze_product_cooccurrence(df_transformed, top_n=50, dictionary=diccionario)
         if len(coocurrencia) > 0:
             coocurrencia.to_csv(REPORTS_DIR / "productos_coocurrencia.csv", index=False)
             print(f"\n✓ Guardado en: {REPORTS_DIR / 'productos_coocurrencia.csv'}")
 
         print("\n12.3 Reglas de asociación (Market Basket Analysis):")
         reglas, stats_reglas = analyze_association_rules(
-            df_transformed, min_support=0.01, min_confidence=0.3, top_n=50
+            df_transformed, min_support=0.01, min_confidence=0.3, top_n=50,
+            dictionary=diccionario
         )
         if len(reglas) > 0:
             reglas.to_csv(REPORTS_DIR / "reglas_asociacion.csv", index=False)
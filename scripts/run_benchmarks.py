@@ -0,0 +1,85 @@
+"""
+Script para medir el rendimiento del pipeline por etapas
+Ejecutar desde la raíz del proyecto:
+    python scripts/run_benchmarks.py --escalas 0.1 1
+    python scripts/run_benchmarks.py --guardar-base        # fijar la línea base
+    python scripts/run_benchmarks.py --umbral 0.1          # comparar con 10 % de tolerancia
+
+Los datos sintéticos de cada escala se generan la primera vez en
+data/synthetic/. Los resultados se escriben como JSON en reports/benchmarks/
+y, si existe una línea base, el script termina con código 1 cuando alguna
+métrica empeora más que el umbral.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar directorio raíz al path ANTES de los imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.benchmark import (
+    BENCHMARK_STAGES,
+    compare_results,
+    load_results,
+    report_comparison,
+    run_benchmarks,
+    save_results,
+)
+from utils.config import BENCHMARK_DIR, BENCHMARK_REGRESSION_THRESHOLD, BENCHMARK_SCALES
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline por etapas")
+    parser.add_argument("--escalas", type=float, nargs="+", default=list(BENCHMARK_SCALES),
+                        help="Escalas de datos sintéticos (1 = ~1.1M transacciones)")
+    parser.add_argument("--etapas", nargs="+", choices=BENCHMARK_STAGES, default=None,
+                        help="Etapas a medir (por defecto todas, en orden)")
+    parser.add_argument("--repeticiones", type=int, default=1,
+                        help="Corridas por escala; se informa la mediana")
+    parser.add_argument("--salida", type=Path, default=BENCHMARK_DIR / "resultados.json",
+                        help="Archivo JSON de resultados")
+    parser.add_argument("--base", type=Path, default=BENCHMARK_DIR / "baseline.json",
+                        help="Archivo JSON de la línea base")
+    parser.add_argument("--guardar-base", action="store_true",
+                        help="Guardar los resultados como nueva línea base")
+    parser.add_argument("--umbral", type=float, default=BENCHMARK_REGRESSION_THRESHOLD,
+                        help="Empeoramiento relativo tolerado (0.2 = 20 %%)")
+    parser.add_argument("--trabajo", type=Path, default=BENCHMARK_DIR / "trabajo",
+                        help="Directorio de trabajo de las corridas")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos para generar los datos sintéticos")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Función principal"""
+    args = parse_args(argv)
+
+    results = run_benchmarks(
+        args.escalas,
+        args.trabajo,
+        stages=args.etapas,
+        repetitions=args.repeticiones,
+        n_workers=args.workers,
+    )
+    print(f"\n✓ Resultados guardados en: {save_results(results, args.salida)}")
+
+    if args.guardar_base:
+        print(f"✓ Línea base guardada en: {save_results(results, args.base)}")
+        return 0
+
+    if not args.base.exists():
+        print("\nSin línea base para comparar (usar --guardar-base)")
+        return 0
+
+    comparisons = compare_results(results, load_results(args.base), threshold=args.umbral)
+    regressions = report_comparison(comparisons, threshold=args.umbral)
+    errors = [entry for entry in results['resultados'] if entry['estado'] != 'ok']
+    return 1 if regressions or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""Configuración común de pytest: el paquete utils se importa desde la raíz del repo"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
@@ -0,0 +1,29 @@
+"""Pruebas de la huella de contenido de los datasets (utils/analyzer.py)"""
+
+import pandas as pd
+import pytest
+
+from utils.analyzer import dataframe_fingerprint
+from utils.transformed_store import to_canonical
+
+
+def baskets_frame(last=('3',)):
+    return pd.DataFrame({
+        'fecha': pd.Timestamp('2013-01-01'),
+        'productos_list': [['1', '2', '2'], [], list(last)],
+    })
+
+
+@pytest.mark.parametrize('make_frame', [baskets_frame, lambda **kw: to_canonical(baskets_frame(**kw))])
+def test_fingerprint_follows_basket_content(make_frame):
+    assert dataframe_fingerprint(make_frame()) == dataframe_fingerprint(make_frame())
+    assert dataframe_fingerprint(make_frame()) != dataframe_fingerprint(make_frame(last=('4',)))
+    assert dataframe_fingerprint(make_frame()) != dataframe_fingerprint(make_frame(last=('3', '3')))
+
+
+def test_fingerprint_of_sliced_canonical_frame():
+    df = baskets_frame()
+
+    sliced = to_canonical(df).iloc[1:].reset_index(drop=True)
+
+    assert dataframe_fingerprint(sliced) == dataframe_fingerprint(to_canonical(df.iloc[1:].reset_index(drop=True)))
@@ -0,0 +1,71 @@
+"""Pruebas del parser directo a canastas (utils/basket_parser.py)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.basket_parser import concat_baskets, parse_transaction_file, parse_transactions
+from utils.basket_store import baskets_from_frame, baskets_to_frame
+from utils.data_loader import load_transactions
+from utils.data_transformer import _transform_wide_frame
+from utils.transformed_store import to_canonical
+
+LINES = [
+    'fecha|tipo|id|productos|tipo|id|productos',
+    '2013-01-01 08:00:00|101|1|10 20 10|102|2|30',
+    '2013-01-01 09:00:00|102|3||||',
+    '2013-01-01 10:00:00|103|4|40|101|5|',
+    '2013-01-01 11:00:00|102|6|10 abc|103|7|3000000000',
+    '2013-01-01 12:00:00|x|8|10|102|9.5|20',
+    '2013-01-01 13:00:00||10|20|102||30',
+    '2013-01-01 14:00:00|101|11|99|102|12|0007 20',
+    'no es fecha|101|13|10',
+]
+
+
+@pytest.fixture
+def raw_file(tmp_path):
+    path = tmp_path / '2013-01-01.csv'
+    path.write_text('\n'.join(LINES) + '\n')
+    return path
+
+
+@pytest.mark.parametrize('catalog', [None, np.array([3, 7, 10, 20, 30, 40])])
+def test_parser_matches_wide_transform(raw_file, catalog):
+    baskets, quarantine = parse_transaction_file(raw_file, catalog=catalog, return_quarantine=True)
+
+    wide = load_transactions(raw_file.parent, n_workers=1)
+    expected, expected_quarantine = _transform_wide_frame(wide, catalog=catalog, return_quarantine=True)
+
+    pd.testing.assert_frame_equal(baskets_to_frame(baskets), to_canonical(expected))
+    assert quarantine['motivo'].tolist() == expected_quarantine['motivo'].tolist()
+    assert quarantine['persona_id'].tolist() == expected_quarantine['persona_id'].tolist()
+
+
+def test_parser_canonical_baskets(raw_file):
+    baskets = parse_transaction_file(raw_file)
+
+    assert baskets['persona_id'].tolist() == [1, 2, 3, 4, 5, 11, 12]
+    assert baskets['offsets'].tolist() == [0, 2, 3, 3, 4, 4, 5, 7]
+    assert baskets['productos'].tolist() == [10, 20, 30, 40, 99, 7, 20]
+    assert baskets['cantidades'].tolist() == [2, 1, 1, 1, 1, 1, 1]
+
+
+def test_baskets_round_trip(raw_file):
+    baskets = parse_transaction_file(raw_file)
+
+    result = baskets_from_frame(baskets_to_frame(baskets))
+
+    for name, values in baskets.items():
+        assert np.array_equal(result[name], values), name
+
+
+def test_parse_transactions_concatenates_files(raw_file):
+    (raw_file.parent / '2013-01-02.csv').write_text('\n'.join([LINES[0], '2013-01-02 08:00:00|101|20|5 5']) + '\n')
+
+    baskets = parse_transactions(raw_file.parent, n_workers=2)
+
+    first = parse_transaction_file(raw_file)
+    assert baskets['persona_id'].tolist() == first['persona_id'].tolist() + [20]
+    assert baskets['offsets'][-2:].tolist() == [first['offsets'][-1], first['offsets'][-1] + 1]
+    assert concat_baskets([first])['offsets'].tolist() == first['offsets'].tolist()
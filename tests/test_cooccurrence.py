@@ -0,0 +1,53 @@
+"""Pruebas de la co-ocurrencia dispersa (utils/cooccurrence.py)"""
+
+import numpy as np
+import pandas as pd
+
+import pytest
+
+from utils.cooccurrence import build_cooccurrence, load_cooccurrence
+from utils.transformed_store import to_canonical
+
+
+def baskets_frame():
+    return pd.DataFrame({'productos_list': [['1', '2', '3'], ['1', '2'], ['2', '2'], [], ['3']]})
+
+
+def canonical_frame():
+    df = baskets_frame()
+    df['fecha'] = pd.Timestamp('2013-01-01')
+    return to_canonical(df)
+
+
+@pytest.mark.parametrize('make_frame', [baskets_frame, canonical_frame])
+def test_percentage_over_baskets_with_two_or_more_items(make_frame):
+    cooc = build_cooccurrence(make_frame())
+
+    pairs = cooc.pairs()
+
+    # La canasta ['2', '2'] tiene un solo producto distinto pero 2 items
+    assert (cooc.n_transacciones, cooc.n_con_productos, cooc.n_multiproducto) == (5, 4, 3)
+    assert pairs[['producto_1', 'producto_2', 'frecuencia']].values.tolist() == [
+        ['1', '2', 2], ['1', '3', 1], ['2', '3', 1]
+    ]
+    assert pairs['porcentaje'].tolist() == [66.67, 33.33, 33.33]
+    assert cooc.item_counts.tolist() == [2, 3, 2]
+    assert cooc.neighbors(1)['soporte'].tolist() == [0.6667, 0.3333]
+
+
+def test_pairs_as_text_in_lexicographic_order():
+    cooc = build_cooccurrence(pd.DataFrame({'productos_list': [['9', '10'], ['9', '10'], ['10', '2']]}))
+
+    pairs = cooc.top_pairs(2)
+
+    assert pairs[['producto_1', 'producto_2', 'frecuencia']].values.tolist() == [['10', '9', 2], ['10', '2', 1]]
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    cooc = build_cooccurrence(baskets_frame())
+
+    loaded = load_cooccurrence(cooc.save(tmp_path).parent)
+
+    assert np.array_equal(loaded.product_ids, cooc.product_ids)
+    assert (loaded.matrix != cooc.matrix).nnz == 0
+    pd.testing.assert_frame_equal(loaded.top_pairs(2), cooc.top_pairs(2))
@@ -0,0 +1,41 @@
+"""Pruebas de la lectura de transacciones (utils/data_loader.py)"""
+
+import pandas as pd
+import pytest
+
+from utils.data_loader import iter_transaction_batches, load_transactions
+
+
+def write_csv(path, lines):
+    path.write_text('\n'.join(['fecha|tipo|id|productos'] + lines) + '\n')
+
+
+@pytest.fixture
+def transactions_dir(tmp_path):
+    write_csv(tmp_path / '2013-01-01.csv', [
+        '2013-01-01 08:00:00|101|1|10 20',
+        '2013-01-01 09:00:00|102|2|20',
+        '2013-01-01 10:00:00|102|3|30',
+        '2013-01-01 11:00:00|103|x|40',
+        '2013-01-01 12:00:00|101|5|',
+    ])
+    write_csv(tmp_path / '2013-01-02.csv', ['2013-01-02 08:00:00|101|6|10'])
+    return tmp_path
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'pyarrow'])
+@pytest.mark.parametrize('batch_rows', [2, 100])
+def test_batches_fall_back_to_text_on_schema_errors(transactions_dir, engine, batch_rows):
+    batches = list(iter_transaction_batches(transactions_dir, batch_rows=batch_rows, engine=engine))
+
+    ids = [str(value) for batch in batches for value in batch['id']]
+    assert ids == ['1', '2', '3', 'x', '5', '6']
+    assert all(len(batch) <= batch_rows for batch in batches)
+
+
+def test_batches_match_load_transactions(transactions_dir, capsys):
+    loaded = load_transactions(transactions_dir, n_workers=1)
+    streamed = pd.concat(list(iter_transaction_batches(transactions_dir, batch_rows=2)), ignore_index=True)
+
+    assert streamed['id'].astype(str).tolist() == loaded['id'].astype(str).tolist()
+    assert streamed['productos'].tolist() == loaded['productos'].tolist()
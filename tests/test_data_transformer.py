@@ -0,0 +1,116 @@
+"""Pruebas de la transformación ancho→largo (utils/data_transformer.py)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_transformer import (
+    QUARANTINE_REASONS,
+    _transform_wide_frame,
+    _transform_wide_frame_iterrows,
+    quarantine_counts,
+    validate_transform,
+)
+
+
+def wide_frame(rows):
+    """DataFrame crudo sin encabezados: fecha seguida de grupos tipo|id|productos"""
+    width = max(len(row) for row in rows)
+    return pd.DataFrame([list(row) + [None] * (width - len(row)) for row in rows])
+
+
+def clean_frame(seed, n_rows=200, n_groups=4):
+    """Filas crudas válidas de largo variable, con grupos sin productos"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_rows):
+        row = [pd.Timestamp('2013-01-01') + pd.Timedelta(hours=int(i))]
+        for _ in range(rng.integers(1, n_groups + 1)):
+            productos = ' '.join(str(p) for p in rng.integers(1, 50, size=rng.integers(0, 5)))
+            row += [int(rng.choice([101, 102, 103])), int(rng.integers(1, 10_000)), productos or None]
+        rows.append(row)
+    return wide_frame(rows)
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_vectorized_matches_reference_on_clean_data(seed):
+    df = clean_frame(seed)
+
+    result = _transform_wide_frame(df)
+
+    pd.testing.assert_frame_equal(result, _transform_wide_frame_iterrows(df))
+
+
+def test_validate_transform_ignores_quarantined_groups():
+    df = wide_frame([
+        ['2013-01-01', 102, 1, '10 20', 103, 'abc', '30'],
+        ['2013-01-02', 102, 2, '99999999999999999999'],
+        ['no es fecha', 102, 3, '10'],
+        ['2013-01-03', 101, 4, None, 102, 5, '10 x'],
+    ])
+
+    assert validate_transform(df)
+
+
+def test_quarantine_reasons():
+    df = wide_frame([
+        ['2013-01-01', 102, 1, '10 20', 103, 2, '3000000000'],
+        ['2013-01-02', 102, 3, '99999999999999999999 10', 103, None, '10'],
+        ['2013-01-03', 'x', 4, '10', 102, 5.5, '20'],
+        ['no es fecha', 102, 6, '10'],
+        ['2013-01-04', 102, 7, '10 abc', 103, 8, '30'],
+        ['2013-01-05', 102, 9, None],
+    ])
+
+    result, quarantine = _transform_wide_frame(df, catalog=np.array([10, 20]), return_quarantine=True)
+
+    assert result['persona_id'].tolist() == [1, 9]
+    assert result['productos_list'].tolist() == [['10', '20'], []]
+    assert quarantine_counts(quarantine) == {
+        'fecha_invalida': 1,
+        'grupo_incompleto': 1,
+        'tipo_invalido': 1,
+        'persona_invalida': 1,
+        'producto_no_numerico': 1,
+        'producto_fuera_de_rango': 2,
+        'producto_desconocido': 1,
+    }
+    assert list(quarantine['motivo'].cat.categories) == list(QUARANTINE_REASONS)
+
+
+@pytest.mark.parametrize('productos', ['99999999999999999999', '2147483648', '1 000000000000000000000002147483648'])
+def test_out_of_range_products_without_catalog(productos):
+    df = wide_frame([['2013-01-01', 102, 1, productos], ['2013-01-01', 103, 2, '2147483647']])
+
+    result, quarantine = _transform_wide_frame(df, return_quarantine=True)
+
+    assert result['persona_id'].tolist() == [2]
+    assert quarantine['motivo'].tolist() == ['producto_fuera_de_rango']
+
+
+def test_leading_zeros_within_range():
+    df = wide_frame([['2013-01-01', 102, 1, '0000000000000000000000007 3']])
+
+    result, quarantine = _transform_wide_frame(df, catalog=np.array([3, 7]), return_quarantine=True)
+
+    assert len(quarantine) == 0
+    assert result['num_productos'].tolist() == [2]
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'pyarrow'])
+def test_vectorized_matches_reference_on_loaded_files(tmp_path, engine):
+    from utils.data_loader import load_transactions
+
+    (tmp_path / '2013-01-01.csv').write_text('\n'.join([
+        'fecha|tipo|id|productos|tipo|id|productos',
+        '2013-01-01 08:00:00|101|1|10 20 10|102|2|30',
+        '2013-01-01 09:00:00|102|3||||',
+        '2013-01-01 10:00:00|103|4|40|101|5|',
+    ]) + '\n')
+
+    df = load_transactions(tmp_path, n_workers=1, engine=engine)
+    result = _transform_wide_frame(df)
+
+    pd.testing.assert_frame_equal(result, _transform_wide_frame_iterrows(df))
+    assert result['persona_id'].tolist() == [1, 2, 3, 4, 5]
+    assert result['num_productos'].tolist() == [3, 1, 0, 1, 0]
@@ -0,0 +1,57 @@
+"""Pruebas de la ingesta incremental (utils/ingestion_cache.py)"""
+
+import contextlib
+import gzip
+import io
+
+import pytest
+
+from utils.ingestion_cache import (
+    list_shard_paths,
+    load_manifest,
+    read_transaction_shards,
+    refresh_transaction_shards,
+)
+
+
+def refresh(raw_dir, cache_dir):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return refresh_transaction_shards(raw_dir, cache_dir, n_workers=1)
+
+
+def write_gzip(path, lines):
+    path.write_bytes(gzip.compress(('\n'.join(['fecha|tipo|id|productos'] + lines) + '\n').encode()))
+
+
+def test_read_transaction_shards_in_file_order(tmp_path):
+    raw_dir, cache_dir = tmp_path / 'raw', tmp_path / 'cache'
+    raw_dir.mkdir()
+    write_gzip(raw_dir / '2013-01-02.csv.gz', ['2013-01-02 09:00:00|102|2|20'])
+    write_gzip(raw_dir / '2013-01-01.csv.gz', ['2013-01-01 08:00:00|101|1|10 20'])
+    refresh(raw_dir, cache_dir)
+
+    df = read_transaction_shards(cache_dir)
+
+    assert df['id'].tolist() == [1, 2]
+
+
+def test_failed_reparse_drops_stale_shard(tmp_path):
+    raw_dir, cache_dir = tmp_path / 'raw', tmp_path / 'cache'
+    raw_dir.mkdir()
+    write_gzip(raw_dir / '2013-01-01.csv.gz', ['2013-01-01 08:00:00|101|1|10 20'])
+    write_gzip(raw_dir / '2013-01-02.csv.gz', ['2013-01-02 09:00:00|102|2|20'])
+    refresh(raw_dir, cache_dir)
+    stale = list_shard_paths(cache_dir)[1]
+
+    (raw_dir / '2013-01-02.csv.gz').write_bytes(b'no es gzip')
+    result = refresh(raw_dir, cache_dir)
+
+    assert len(result['errors']) == 1
+    assert not stale.exists()
+    assert sorted(load_manifest(cache_dir)['files']) == ['2013-01-01.csv.gz']
+    assert read_transaction_shards(cache_dir)['id'].tolist() == [1]
+
+
+def test_read_transaction_shards_without_manifest(tmp_path):
+    with pytest.raises(ValueError):
+        read_transaction_shards(tmp_path)
@@ -0,0 +1,84 @@
+"""Pruebas de la minería vertical de itemsets (utils/itemset_mining.py)"""
+
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from utils.itemset_mining import mine_frequent_itemsets, popcount_rows, transaction_bitsets
+
+
+def random_transactions(seed, n_transactions=300, n_items=12, max_size=6):
+    """Offsets y códigos de canastas aleatorias (con repetidos dentro de la canasta)"""
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(0, max_size + 1, size=n_transactions)
+    offsets = np.zeros(n_transactions + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    # Distribución sesgada para que haya itemsets frecuentes de varios tamaños
+    weights = 1.0 / np.arange(1, n_items + 1)
+    codes = rng.choice(n_items, size=int(offsets[-1]), p=weights / weights.sum())
+    return offsets, codes.astype(np.int64)
+
+
+def brute_force_itemsets(offsets, codes, min_count, max_len=None):
+    """Conteo exhaustivo de todos los subconjuntos de cada canasta"""
+    counter = Counter()
+    for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        items = sorted(set(codes[start:end].tolist()))
+        top = len(items) if max_len is None else min(max_len, len(items))
+        for size in range(1, top + 1):
+            counter.update(combinations(items, size))
+    return {itemset: count for itemset, count in counter.items() if count >= min_count}
+
+
+def test_transaction_bitsets_sets_expected_bits():
+    offsets = np.array([0, 2, 3, 5], dtype=np.int64)
+    codes = np.array([1, 4, 4, 1, 1], dtype=np.int64)
+
+    bits = transaction_bitsets(offsets, codes, np.array([1, 4]))
+
+    assert bits.shape == (2, 1)
+    assert bits[:, 0].tolist() == [0b101, 0b011]
+
+
+def test_transaction_bitsets_without_matching_items():
+    bits = transaction_bitsets(np.array([0, 2]), np.array([1, 2]), np.array([5]))
+
+    assert bits.shape == (1, 1)
+    assert not bits.any()
+
+
+def test_popcount_rows_matches_python():
+    rng = np.random.default_rng(0)
+    bits = rng.integers(0, 2**63, size=(5, 3), dtype=np.uint64)
+
+    expected = [sum(bin(int(word)).count('1') for word in row) for row in bits]
+    assert popcount_rows(bits).tolist() == expected
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('min_count, max_len', [(5, None), (15, 3), (30, 2), (1, 1)])
+def test_mine_frequent_itemsets_matches_brute_force(seed, min_count, max_len):
+    offsets, codes = random_transactions(seed)
+
+    result = mine_frequent_itemsets(offsets, codes, min_count, max_len)
+
+    assert result == brute_force_itemsets(offsets, codes, min_count, max_len)
+
+
+def test_mine_frequent_itemsets_canonical_input():
+    offsets, codes = random_transactions(3)
+    # Canastas sin repetidos y ordenadas, como las del parquet canónico
+    baskets = [np.unique(codes[start:end]) for start, end in zip(offsets[:-1], offsets[1:])]
+    canonical_offsets = np.zeros(len(baskets) + 1, dtype=np.int64)
+    np.cumsum([len(basket) for basket in baskets], out=canonical_offsets[1:])
+    canonical_codes = np.concatenate(baskets)
+
+    result = mine_frequent_itemsets(canonical_offsets, canonical_codes, 10, canonical=True)
+
+    assert result == brute_force_itemsets(offsets, codes, 10)
+
+
+def test_mine_frequent_itemsets_empty_input():
+    assert mine_frequent_itemsets(np.array([0, 0]), np.array([], dtype=np.int64), 1) == {}
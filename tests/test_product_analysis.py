@@ -0,0 +1,98 @@
+"""Pruebas del análisis de canastas (utils/product_analysis.py)"""
+
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.basket_store import BasketStore, baskets_from_frame, write_basket_store
+from utils.product_analysis import (
+    analyze_association_rules,
+    encoded_basket_arrays,
+    find_frequent_itemsets,
+    find_frequent_itemsets_arrays,
+)
+from utils.product_dictionary import ProductDictionary
+from utils.transformed_store import to_canonical
+from test_itemset_mining import brute_force_itemsets, random_transactions
+
+
+def baskets_frame(seed=0, n_transactions=300):
+    """DataFrame transformado con canastas aleatorias (IDs de producto como texto)"""
+    offsets, codes = random_transactions(seed, n_transactions=n_transactions)
+    product_ids = (codes * 7 + 3).astype(str)
+    return pd.DataFrame({
+        'fecha': pd.Timestamp('2013-01-01'),
+        'tipo_transaccion': 102,
+        'persona_id': np.arange(n_transactions),
+        'productos_list': [product_ids[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])],
+    })
+
+
+def basket_store(df, store_dir):
+    with contextlib.redirect_stdout(io.StringIO()):
+        write_basket_store(baskets_from_frame(to_canonical(df)), store_dir)
+    return BasketStore(store_dir)
+
+
+@pytest.mark.parametrize('n_shards', [1, 3])
+def test_arrays_entry_point_matches_brute_force(n_shards):
+    offsets, codes = random_transactions(1)
+
+    result = find_frequent_itemsets_arrays(offsets, codes, 0.05, max_len=3, n_shards=n_shards, n_workers=1)
+
+    expected = brute_force_itemsets(offsets, codes, result['min_count'], max_len=3)
+    assert result['n_transactions'] == 300
+    assert result['1-itemsets'] == {itemset[0]: count for itemset, count in expected.items() if len(itemset) == 1}
+    assert result['3-itemsets'] == {itemset: count for itemset, count in expected.items() if len(itemset) == 3}
+
+
+def test_list_path_matches_arrays_entry_point():
+    df = baskets_frame()
+    dictionary = ProductDictionary([])
+    offsets, codes = encoded_basket_arrays(df, dictionary)
+
+    result = find_frequent_itemsets(df['productos_list'].tolist(), 0.05, n_shards=1)
+    expected = find_frequent_itemsets_arrays(offsets, codes, 0.05, canonical=True, n_shards=1)
+
+    decode = lambda itemset: tuple(sorted(dictionary.decode(list(itemset)).astype(str)))
+    for key in ('2-itemsets', '3-itemsets'):
+        assert result[key] == {decode(itemset): count for itemset, count in expected[key].items()}
+
+
+@pytest.mark.parametrize('source', ['frame', 'canonical', 'store', 'blocks'])
+def test_encoded_basket_arrays_sources(source, tmp_path):
+    df = baskets_frame(n_transactions=50)
+    data = {
+        'frame': lambda: df,
+        'canonical': lambda: to_canonical(df),
+        'store': lambda: basket_store(df, tmp_path / 'store'),
+        'blocks': lambda: [df.iloc[:20], df.iloc[20:]],
+    }[source]()
+    dictionary = ProductDictionary([])
+
+    offsets, codes = encoded_basket_arrays(data, dictionary, with_products_only=True)
+
+    expected = [sorted(set(basket)) for basket in df['productos_list'] if basket]
+    baskets = [
+        sorted(dictionary.decode(codes[start:end].tolist()).astype(str).tolist())
+        for start, end in zip(offsets[:-1], offsets[1:])
+    ]
+    assert baskets == expected
+    assert np.all(np.diff(offsets) > 0)
+
+
+def test_association_rules_from_store_match_frame(tmp_path):
+    df = baskets_frame()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from_frame, stats = analyze_association_rules(df, 0.05, 0.2, n_shards=1)
+        from_store, _ = analyze_association_rules(basket_store(df, tmp_path / 'store'), 0.05, 0.2, n_shards=1)
+
+    assert stats['frequent_itemsets']['n_transactions'] == sum(1 for basket in df['productos_list'] if basket)
+    assert len(from_frame) > 0
+    # Los empates de lift pueden salir en otro orden: los códigos se asignan distinto
+    sort = lambda rules: rules.sort_values(['antecedente', 'consecuente']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(sort(from_frame), sort(from_store))
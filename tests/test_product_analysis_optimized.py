@@ -0,0 +1,92 @@
+"""Pruebas de las reglas de asociación con mlxtend (utils/product_analysis_optimized.py)"""
+
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('mlxtend')
+from mlxtend.frequent_patterns import association_rules, fpgrowth
+from mlxtend.preprocessing import TransactionEncoder
+
+from utils.cooccurrence import build_cooccurrence
+from utils.product_analysis_optimized import analyze_association_rules_optimized
+from test_itemset_mining import random_transactions
+
+COLUMNS = ['antecedente', 'consecuente', 'soporte', 'confianza', 'lift', 'conviction', 'num_transacciones']
+
+
+def baskets_frame(seed=0, n_transactions=200):
+    """DataFrame transformado con canastas aleatorias (con repetidos y canastas vacías)"""
+    offsets, codes = random_transactions(seed, n_transactions=n_transactions, n_items=10)
+    product_ids = (codes * 11 + 5).astype(str)
+    df = pd.DataFrame({
+        'productos_list': [product_ids[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])],
+    })
+    df['tiene_productos'] = df['productos_list'].str.len() > 0
+    return df
+
+
+def dense_rules(df, min_support, min_confidence, max_len):
+    """Reglas de referencia con el one-hot denso de TransactionEncoder"""
+    transactions = df.loc[df['tiene_productos'], 'productos_list'].tolist()
+    encoder = TransactionEncoder()
+    encoded = pd.DataFrame(encoder.fit(transactions).transform(transactions), columns=encoder.columns_)
+    itemsets = fpgrowth(encoded, min_support=min_support, use_colnames=True, max_len=max_len)
+    rules = association_rules(itemsets, metric='confidence', min_threshold=min_confidence)
+    return pd.DataFrame({
+        'antecedente': rules['antecedents'].apply(lambda x: ', '.join(sorted(x))),
+        'consecuente': rules['consequents'].apply(lambda x: ', '.join(sorted(x))),
+        'soporte': rules['support'].round(4),
+        'confianza': rules['confidence'].round(4),
+        'lift': rules['lift'].round(2),
+        'conviction': rules['conviction'].round(2),
+        'num_transacciones': (rules['support'] * len(transactions)).astype(int),
+    })
+
+
+def sort_rules(rules):
+    return rules.sort_values(['antecedente', 'consecuente']).reset_index(drop=True)
+
+
+def run(df, **kwargs):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        rules = analyze_association_rules_optimized(df, **kwargs)
+    return rules, output.getvalue()
+
+
+@pytest.mark.parametrize('min_support, min_confidence, max_len', [(0.05, 0.2, 3), (0.1, 0.4, 2)])
+@pytest.mark.parametrize('with_cooccurrence', [False, True])
+def test_matches_dense_transaction_encoder(min_support, min_confidence, max_len, with_cooccurrence):
+    df = baskets_frame()
+    cooccurrence = build_cooccurrence(df) if with_cooccurrence else None
+
+    rules, output = run(
+        df, min_support=min_support, min_confidence=min_confidence, max_len=max_len, cooccurrence=cooccurrence
+    )
+
+    assert list(rules.columns) == COLUMNS
+    assert len(rules) > 0
+    assert rules['lift'].is_monotonic_decreasing
+    assert 'se ignora' not in output
+    pd.testing.assert_frame_equal(sort_rules(rules), sort_rules(dense_rules(df, min_support, min_confidence, max_len)))
+
+
+def test_cooccurrence_of_other_transactions_is_ignored():
+    df = baskets_frame()
+    cooccurrence = build_cooccurrence(df.iloc[:50])
+    assert cooccurrence.n_con_productos != df['tiene_productos'].sum()
+
+    rules, output = run(df, min_support=0.05, min_confidence=0.2, cooccurrence=cooccurrence)
+
+    assert 'se ignora' in output
+    pd.testing.assert_frame_equal(sort_rules(rules), sort_rules(dense_rules(df, 0.05, 0.2, 3)))
+
+
+def test_without_frequent_items_returns_empty_frame():
+    rules, _ = run(baskets_frame(), min_support=0.9)
+
+    assert rules.empty
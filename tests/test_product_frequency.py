@@ -0,0 +1,104 @@
+"""Pruebas de las frecuencias de productos y cortes de Pareto (utils/product_frequency.py)"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.product_frequency import product_frequency
+from utils.transformed_store import to_canonical
+
+
+def baskets_frame():
+    return pd.DataFrame({
+        'fecha': pd.to_datetime([
+            '2013-01-05', '2013-01-20', '2013-01-31', '2013-02-01', '2013-02-15', '2013-02-28',
+        ]),
+        'tipo_transaccion': [101, 102, 101, 102, 102, 101],
+        'persona_id': np.arange(6),
+        'productos_list': [
+            ['10', '20', '10'], ['30'], ['20', '40'], [], ['10', '10', '10', '50'], ['20'],
+        ],
+    })
+
+
+def reference(df, by):
+    """Conteo por grupo con Counter, ordenado por frecuencia descendente y producto_id"""
+    keys = {
+        None: lambda row: None,
+        'tipo_transaccion': lambda row: row.tipo_transaccion,
+        'mes': lambda row: row.fecha.strftime('%Y-%m'),
+    }[by]
+    counters = {}
+    for row in df.itertuples():
+        counters.setdefault(keys(row), Counter()).update(int(product) for product in row.productos_list)
+    rows = []
+    for group in sorted(counters):
+        ranked = sorted(counters[group].items(), key=lambda item: (-item[1], item[0]))
+        rows.extend((group, product, count, rank) for rank, (product, count) in enumerate(ranked, start=1))
+    return rows, counters
+
+
+@pytest.mark.parametrize('make_frame', [baskets_frame, lambda: to_canonical(baskets_frame())])
+@pytest.mark.parametrize('by', [None, 'tipo_transaccion', 'mes'])
+def test_ranking_per_group(make_frame, by):
+    freq, pareto = product_frequency(make_frame(), by=by)
+
+    rows, counters = reference(baskets_frame(), by)
+    assert freq['producto_id'].tolist() == [row[1] for row in rows]
+    assert freq['frecuencia'].tolist() == [row[2] for row in rows]
+    assert freq['ranking'].tolist() == [row[3] for row in rows]
+    if by is None:
+        assert by not in freq.columns
+        assert pareto['items'].tolist() == [11]
+    else:
+        assert freq[by].tolist() == [row[0] for row in rows]
+        assert pareto[by].tolist() == sorted(counters)
+        assert pareto['items'].tolist() == [sum(counters[group].values()) for group in sorted(counters)]
+
+
+@pytest.mark.parametrize('by', [None, 'tipo_transaccion', 'mes'])
+def test_cumulative_percentage_restarts_per_group(by):
+    freq, _ = product_frequency(baskets_frame(), by=by)
+
+    groups = [None] * len(freq) if by is None else freq[by]
+    for _, group in freq.groupby(pd.Series(groups, index=freq.index).astype(str), sort=False):
+        total = group['frecuencia'].sum()
+        expected = (group['frecuencia'].cumsum() / total * 100).round(2)
+        assert group['porcentaje_acumulado'].tolist() == expected.tolist()
+        assert group['porcentaje_acumulado'].iloc[-1] == 100.0
+        assert group['porcentaje'].tolist() == (group['frecuencia'] / total * 100).round(2).tolist()
+
+
+def test_pareto_cuts():
+    _, pareto = product_frequency(baskets_frame(), by='mes', breakpoints=(0.5, 0.8, 1.0))
+
+    # 2013-01: 10 ×2, 20 ×2, 30, 40 → 50 % con 2 productos, 80 % con 3 (83 %)
+    # 2013-02: 10 ×3, 20, 50 → 50 % con 1 producto, 80 % con 2
+    assert pareto.columns.tolist() == [
+        'mes', 'productos', 'items', 'ventas_top_20_pct', 'productos_50', 'productos_80', 'productos_100'
+    ]
+    assert pareto['productos'].tolist() == [4, 3]
+    assert pareto['productos_50'].tolist() == [2, 1]
+    assert pareto['productos_80'].tolist() == [3, 2]
+    assert pareto['productos_100'].tolist() == [4, 3]
+    assert pareto['ventas_top_20_pct'].tolist() == [0.0, 0.0]
+
+
+EMPTY_FRAME = pd.DataFrame({'fecha': pd.to_datetime([]), 'tipo_transaccion': [], 'productos_list': []})
+
+
+@pytest.mark.parametrize('data', [[], EMPTY_FRAME])
+@pytest.mark.parametrize('by', [None, 'tipo_transaccion', 'mes'])
+def test_empty_input(data, by):
+    freq, pareto = product_frequency(data, by=by)
+
+    assert freq.empty
+    assert freq.columns.tolist()[-5:] == ['producto_id', 'frecuencia', 'porcentaje', 'porcentaje_acumulado', 'ranking']
+    assert pareto['productos'].sum() == 0
+
+
+def test_invalid_group():
+    with pytest.raises(ValueError):
+        product_frequency(baskets_frame(), by='persona_id')
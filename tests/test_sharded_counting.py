@@ -0,0 +1,75 @@
+"""Pruebas del conteo de itemsets por shards (utils/sharded_counting.py)"""
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from utils.itemset_mining import mine_frequent_itemsets
+from utils.sharded_counting import (
+    count_candidates,
+    sharded_cooccurrence,
+    sharded_frequent_itemsets,
+    split_shards,
+)
+from test_itemset_mining import brute_force_itemsets, random_transactions
+
+
+def disjoint_transactions():
+    """Canastas cuya segunda mitad usa items que nunca son frecuentes"""
+    offsets, codes = random_transactions(7, n_transactions=200, n_items=6)
+    rare_sizes = np.full(200, 2)
+    rare_offsets = offsets[-1] + np.concatenate(([0], np.cumsum(rare_sizes)))
+    rare_codes = 100 + np.arange(400, dtype=np.int64)
+    return np.concatenate((offsets, rare_offsets[1:])), np.concatenate((codes, rare_codes))
+
+
+def test_split_shards_covers_all_transactions():
+    offsets, codes = random_transactions(0)
+
+    shards = split_shards(offsets, codes, 4)
+
+    assert sum(len(shard_offsets) - 1 for shard_offsets, _ in shards) == len(offsets) - 1
+    assert np.array_equal(np.concatenate([shard_codes for _, shard_codes in shards]), codes)
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+@pytest.mark.parametrize('n_shards', [1, 3, 7])
+def test_sharded_matches_single_pass(seed, n_shards):
+    offsets, codes = random_transactions(seed)
+
+    result = sharded_frequent_itemsets(offsets, codes, 12, max_len=3, n_shards=n_shards, n_workers=1)
+
+    assert result == mine_frequent_itemsets(offsets, codes, 12, max_len=3)
+    assert result == brute_force_itemsets(offsets, codes, 12, max_len=3)
+
+
+@pytest.mark.parametrize('n_shards', [2, 5])
+def test_sharded_with_shards_without_candidates(n_shards):
+    offsets, codes = disjoint_transactions()
+
+    result = sharded_frequent_itemsets(offsets, codes, 20, n_shards=n_shards, n_workers=1)
+
+    assert result == mine_frequent_itemsets(offsets, codes, 20)
+    assert all(code < 100 for itemset in result for code in itemset)
+
+
+def test_count_candidates_shard_without_candidate_items():
+    shard = (np.array([0, 2, 3], dtype=np.int64), np.array([100, 101, 102], dtype=np.int64))
+
+    counts = count_candidates(shard, [(1,), (1, 2)])
+
+    assert counts.tolist() == [0, 0]
+
+
+def test_sharded_cooccurrence_matches_single_product():
+    offsets, codes = random_transactions(4)
+    baskets = sp.csr_matrix(
+        (np.ones(len(codes), dtype=np.int32), codes, offsets),
+        shape=(len(offsets) - 1, int(codes.max()) + 1)
+    )
+    baskets.sum_duplicates()
+    baskets.data[:] = 1
+
+    result = sharded_cooccurrence(baskets, n_shards=4, n_workers=1)
+
+    assert (result != (baskets.T @ baskets)).nnz == 0
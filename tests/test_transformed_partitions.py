@@ -0,0 +1,137 @@
+"""Pruebas del dataset transformado particionado (refresh_transformed_partitions)"""
+
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.basket_store import BasketStore, baskets_from_frame, refresh_basket_stores, write_basket_store
+from utils.data_transformer import PARTITION_BASENAME, refresh_transformed_partitions
+from utils.ingestion_cache import refresh_transaction_shards
+from utils.transformed_store import head_transformed, read_transformed
+
+FILES = {
+    '2013-01-30.csv': [
+        '2013-01-30 08:00:00|101|1|10 20',
+        '2013-01-30 09:00:00|102|2|20',
+    ],
+    '2013-01-31.csv': [
+        '2013-01-31 10:00:00|102|3|10 10 30',
+        '2013-01-31 11:00:00|103|4|',
+    ],
+    '2013-02-01.csv': [
+        '2013-02-01 08:30:00|101|5|30',
+        '2013-02-01 12:00:00|102|6|abc',
+    ],
+}
+
+
+def write_files(directory, files):
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, lines in files.items():
+        (directory / name).write_text('\n'.join(['fecha|tipo|id|productos'] + lines) + '\n')
+
+
+def refresh(raw_dir, cache_dir, transformed_dir):
+    with contextlib.redirect_stdout(io.StringIO()):
+        refresh_transaction_shards(raw_dir, cache_dir, n_workers=1)
+        return refresh_transformed_partitions(transformed_dir, cache_dir, n_workers=1)
+
+
+def canonical_rows(transformed_dir):
+    df = read_transformed(transformed_dir).sort_values(['fecha', 'persona_id'])
+    return [
+        (row.fecha, row.tipo_transaccion, row.persona_id, list(row.productos), list(row.cantidades))
+        for row in df.itertuples()
+    ]
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    raw_dir, cache_dir, transformed_dir = tmp_path / 'raw', tmp_path / 'cache', tmp_path / 'transformed'
+    write_files(raw_dir, FILES)
+    result = refresh(raw_dir, cache_dir, transformed_dir)
+    return raw_dir, cache_dir, transformed_dir, result
+
+
+def test_one_file_per_partition(dataset):
+    _, _, transformed_dir, result = dataset
+
+    files = sorted(str(path.relative_to(transformed_dir)) for path in result['partitions'])
+
+    assert files == [
+        f'año_mes=2013-01/tipo_transaccion={tipo}/{PARTITION_BASENAME}.parquet' for tipo in (101, 102, 103)
+    ] + [f'año_mes=2013-02/tipo_transaccion=101/{PARTITION_BASENAME}.parquet']
+    assert result['quarantined'] == {'producto_no_numerico': 1}
+    assert canonical_rows(transformed_dir)[2] == (
+        pd.Timestamp('2013-01-31 10:00:00'), 102, 3, [10, 30], [2, 1]
+    )
+
+
+def test_incremental_refresh_matches_full_rebuild(dataset, tmp_path):
+    raw_dir, cache_dir, transformed_dir, _ = dataset
+    (raw_dir / '2013-01-31.csv').unlink()
+    write_files(raw_dir, {'2013-02-01.csv': ['2013-02-01 08:30:00|103|7|40 50']})
+
+    result = refresh(raw_dir, cache_dir, transformed_dir)
+
+    assert result['changed'] == ['2013-02-01.csv']
+    assert result['removed'] == ['2013-01-31.csv']
+    assert not (transformed_dir / 'año_mes=2013-01' / 'tipo_transaccion=103').exists()
+    assert not (transformed_dir / 'año_mes=2013-02' / 'tipo_transaccion=101').exists()
+
+    rebuild_dir = tmp_path / 'rebuild'
+    refresh(raw_dir, tmp_path / 'rebuild_cache', rebuild_dir)
+    assert canonical_rows(transformed_dir) == canonical_rows(rebuild_dir)
+
+
+def refresh_stores(transformed_dir, store_dir, months):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return refresh_basket_stores(transformed_dir, store_dir, months)
+
+
+def test_monthly_stores_match_single_store(dataset, tmp_path):
+    _, _, transformed_dir, result = dataset
+    assert result['months'] == ['2013-01', '2013-02']
+
+    written = refresh_stores(transformed_dir, tmp_path / 'stores', result['months'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        write_basket_store(baskets_from_frame(read_transformed(transformed_dir)), tmp_path / 'single')
+
+    assert [path.name for path in written] == ['año_mes=2013-01', 'año_mes=2013-02']
+    monthly, single = BasketStore(tmp_path / 'stores'), BasketStore(tmp_path / 'single')
+    for name, values in single.to_arrays().items():
+        assert np.array_equal(getattr(monthly, name), values), name
+
+
+def test_monthly_stores_rewrite_only_changed_months(dataset, tmp_path):
+    raw_dir, cache_dir, transformed_dir, result = dataset
+    store_dir = tmp_path / 'stores'
+    refresh_stores(transformed_dir, store_dir, result['months'])
+
+    write_files(raw_dir, {'2013-02-01.csv': ['2013-02-01 08:30:00|103|7|40 50']})
+    result = refresh(raw_dir, cache_dir, transformed_dir)
+    written = refresh_stores(transformed_dir, store_dir, result['months'])
+
+    assert result['months'] == ['2013-02']
+    assert [path.name for path in written] == ['año_mes=2013-02']
+    assert BasketStore(store_dir).persona_id.tolist() == read_transformed(transformed_dir)['persona_id'].tolist()
+
+    (raw_dir / '2013-02-01.csv').unlink()
+    result = refresh(raw_dir, cache_dir, transformed_dir)
+    assert refresh_stores(transformed_dir, store_dir, result['months']) == []
+    assert not (store_dir / 'año_mes=2013-02').exists()
+    assert len(BasketStore(store_dir)) == 4
+
+
+@pytest.mark.parametrize('n', [1, 3, 10])
+def test_head_transformed_matches_full_read(dataset, n):
+    _, _, transformed_dir, _ = dataset
+
+    expected = read_transformed(transformed_dir).sort_values('fecha', kind='stable').head(n)
+
+    pd.testing.assert_frame_equal(
+        head_transformed(transformed_dir, n).reset_index(drop=True), expected.reset_index(drop=True)
+    )
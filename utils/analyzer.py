@@ -3,9 +3,12 @@ Clase principal para análisis de datasets
 Integra todas las funcionalidades de análisis
 """
 
+import hashlib
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Any, Callable, Optional, Dict
 
 from .data_loader import (
     load_categories, 
@@ -20,26 +23,209 @@ from .statistics import (
     detect_outliers,
     correlation_analysis
 )
-from .config import PRODUCTS_DIR, TRANSACTIONS_DIR
+from .data_transformer import extract_transaction_features
+from .ingestion_cache import load_manifest, read_transaction_shards
+from .transformed_store import (
+    PRODUCTS_COLUMN,
+    QUANTITIES_COLUMN,
+    basket_arrays,
+    product_arrays,
+    read_transformed,
+)
+from .config import (
+    PRODUCTS_DIR,
+    TRANSACTIONS_DIR,
+    CACHE_DIR,
+    CACHE_FILES,
+    ANALYZER_STATS_CACHE_SIZE,
+)
+
+DATASET_NAMES = ('categories', 'product_category', 'transactions', 'transactions_transformed', 'merged')
+
+
+def _basket_columns(df: pd.DataFrame) -> Dict[str, tuple]:
+    """
+    Arreglos planos de las columnas de canastas de un DataFrame transformado
+
+    Args:
+        df: DataFrame a resumir
+
+    Returns:
+        Diccionario {columna: (offsets, valores)} para productos (o
+        productos_list) y cantidades; vacío si no hay canastas o si algún
+        producto no es un ID entero
+    """
+    if PRODUCTS_COLUMN in df.columns:
+        products = PRODUCTS_COLUMN
+    elif 'productos_list' in df.columns:
+        products = 'productos_list'
+    else:
+        return {}
+
+    try:
+        if QUANTITIES_COLUMN in df.columns:
+            offsets, productos, cantidades = basket_arrays(df)
+            return {products: (offsets, productos), QUANTITIES_COLUMN: (offsets, cantidades)}
+        return {products: product_arrays(df)}
+    except ValueError:
+        return {}
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Huella del contenido de un DataFrame (columnas, dtypes y valores)
+
+    Las columnas de canastas (productos/cantidades o productos_list) se
+    hashean por sus offsets y valores planos, sin pasar cada lista a texto.
+
+    Args:
+        df: DataFrame a resumir
+        
+    Returns:
+        Hash hexadecimal; dos DataFrames con el mismo contenido coinciden
+    """
+    digest = hashlib.sha256()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(str(len(df)).encode())
+    baskets = _basket_columns(df)
+    for col in df.columns:
+        if col in baskets:
+            offsets, values = baskets[col]
+            digest.update(np.ascontiguousarray(offsets, dtype=np.int64).tobytes())
+            digest.update(np.ascontiguousarray(values).tobytes())
+            continue
+        try:
+            hashed = pd.util.hash_pandas_object(df[col], index=False)
+        except TypeError:
+            # Otras columnas de listas se hashean como texto
+            hashed = pd.util.hash_pandas_object(df[col].astype(str), index=False)
+        digest.update(hashed.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _dataset_property(name: str, doc: str) -> property:
+    """Atributo de dataset que se carga en el primer acceso"""
+    def getter(self):
+        if name not in self._datasets:
+            self._set_dataset(name, self._load_lazy(name))
+        return self._datasets[name]
+    
+    def setter(self, df):
+        self._set_dataset(name, df)
+    
+    return property(getter, setter, doc=doc)
 
 
 class DatasetAnalyzer:
     """
     Clase principal para análisis exploratorio de datos
     
+    Los datasets se cargan en el primer acceso, primero desde la caché
+    parquet del pipeline y si no existe desde los archivos originales. Los
+    resultados de revisión y estadísticas se memoizan por huella de contenido
+    del dataset, de modo que repetir un resumen sobre los mismos datos no
+    vuelve a calcularlo.
+    
     Atributos:
         categories: DataFrame con categorías
         product_category: DataFrame con productos y categorías
         transactions: DataFrame con transacciones
+        transactions_transformed: DataFrame con transacciones transformadas
         merged_data: DataFrame con datos combinados
     """
     
-    def __init__(self):
-        self.categories = None
-        self.product_category = None
-        self.transactions = None
-        self.merged_data = None
-        self._stats_cache = {}
+    categories = _dataset_property('categories', "DataFrame con categorías")
+    product_category = _dataset_property('product_category', "DataFrame con productos y categorías")
+    transactions = _dataset_property('transactions', "DataFrame con transacciones")
+    transactions_transformed = _dataset_property(
+        'transactions_transformed', "DataFrame con transacciones transformadas"
+    )
+    merged_data = _dataset_property('merged', "DataFrame con datos combinados")
+    
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = CACHE_DIR,
+        stats_cache_size: int = ANALYZER_STATS_CACHE_SIZE
+    ):
+        """
+        Args:
+            cache_dir: Directorio de la caché parquet (None = leer siempre los originales)
+            stats_cache_size: Máximo de resultados memoizados
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.stats_cache_size = stats_cache_size
+        self._datasets = {}
+        self._fingerprints = {}
+        self._stats_cache = OrderedDict()
+    
+    def _set_dataset(self, name: str, df: Optional[pd.DataFrame]):
+        """Registrar un dataset; su huella se recalcula en el siguiente uso"""
+        self._datasets[name] = df
+        self._fingerprints.pop(name, None)
+    
+    def _load_lazy(self, name: str) -> Optional[pd.DataFrame]:
+        """
+        Cargar un dataset en su primer acceso
+        
+        Args:
+            name: Nombre del dataset
+            
+        Returns:
+            DataFrame (None para 'merged', que solo se construye con merge_data)
+        """
+        if name == 'merged':
+            return None
+        
+        if name == 'transactions' and self.cache_dir is not None and load_manifest(self.cache_dir)['files']:
+            print(f"Cargando transactions desde los shards de ingesta: {self.cache_dir}")
+            return read_transaction_shards(self.cache_dir)
+        if self.cache_dir is not None and name in CACHE_FILES:
+            parquet_path = self.cache_dir / CACHE_FILES[name]
+            if parquet_path.exists():
+                print(f"Cargando {name} desde caché: {parquet_path}")
+                if name == 'transactions_transformed':
+                    return read_transformed(parquet_path)
+                return pd.read_parquet(parquet_path)
+        
+        if name == 'categories':
+            return load_categories(PRODUCTS_DIR / 'Categories.csv')
+        if name == 'product_category':
+            return load_product_category(PRODUCTS_DIR / 'ProductCategory.csv')
+        if name == 'transactions':
+            return load_transactions(TRANSACTIONS_DIR)
+        return extract_transaction_features(self.transactions)
+    
+    def fingerprint(self, dataset_name: str) -> str:
+        """
+        Huella de contenido de un dataset (calculada una vez por carga)
+        
+        Args:
+            dataset_name: Nombre del dataset
+        """
+        if dataset_name not in self._fingerprints:
+            self._fingerprints[dataset_name] = dataframe_fingerprint(self._get_dataset(dataset_name))
+        return self._fingerprints[dataset_name]
+    
+    def _memoize(self, method: str, dataset_name: str, compute: Callable[[pd.DataFrame], Any], *args) -> Any:
+        """
+        Devolver un resultado memoizado o calcularlo y guardarlo (LRU)
+        
+        Args:
+            method: Nombre del análisis
+            dataset_name: Nombre del dataset
+            compute: Función que recibe el DataFrame y calcula el resultado
+            *args: Parámetros adicionales que forman parte de la clave
+        """
+        key = (method, dataset_name, self.fingerprint(dataset_name)) + args
+        if key in self._stats_cache:
+            self._stats_cache.move_to_end(key)
+            return self._stats_cache[key]
+        
+        result = compute(self._get_dataset(dataset_name))
+        self._stats_cache[key] = result
+        if len(self._stats_cache) > self.stats_cache_size:
+            self._stats_cache.popitem(last=False)
+        return result
     
     def load_categories(self, file_path: Optional[Path] = None) -> pd.DataFrame:
         """Cargar archivo de categorías"""
@@ -60,13 +246,22 @@ class DatasetAnalyzer:
     def load_transactions(
         self, 
         transactions_dir: Optional[Path] = None, 
-        sample_size: Optional[int] = None
+        sample_size: Optional[int] = None,
+        n_workers: Optional[int] = None,
+        executor: Optional[str] = None,
+        engine: Optional[str] = None
     ) -> pd.DataFrame:
-        """Cargar archivos de transacciones"""
+        """Cargar archivos de transacciones (opcionalmente en paralelo)"""
         if transactions_dir is None:
             transactions_dir = TRANSACTIONS_DIR
         
-        self.transactions = load_transactions(transactions_dir, sample_size)
+        self.transactions = load_transactions(
+            transactions_dir, 
+            sample_size, 
+            n_workers=n_workers, 
+            executor=executor,
+            engine=engine
+        )
         return self.transactions
     
     def load_all(self, sample_transactions: Optional[int] = None) -> Dict[str, pd.DataFrame]:
@@ -91,8 +286,7 @@ class DatasetAnalyzer:
         Args:
             dataset_name: 'categories', 'product_category', o 'transactions'
         """
-        df = self._get_dataset(dataset_name)
-        return initial_review(df, dataset_name.upper())
+        return self._memoize('review', dataset_name, lambda df: initial_review(df, dataset_name.upper()))
     
     def analyze_numeric(self, dataset_name: str) -> pd.DataFrame:
         """
@@ -101,8 +295,9 @@ class DatasetAnalyzer:
         Args:
             dataset_name: Nombre del dataset a analizar
         """
-        df = self._get_dataset(dataset_name)
-        return descriptive_statistics_numeric(df, dataset_name.upper())
+        return self._memoize(
+            'numeric', dataset_name, lambda df: descriptive_statistics_numeric(df, dataset_name.upper())
+        )
     
     def analyze_categorical(self, dataset_name: str) -> dict:
         """
@@ -111,8 +306,9 @@ class DatasetAnalyzer:
         Args:
             dataset_name: Nombre del dataset a analizar
         """
-        df = self._get_dataset(dataset_name)
-        return descriptive_statistics_categorical(df, dataset_name.upper())
+        return self._memoize(
+            'categorical', dataset_name, lambda df: descriptive_statistics_categorical(df, dataset_name.upper())
+        )
     
     def get_summary(self, dataset_name: str) -> dict:
         """
@@ -121,8 +317,7 @@ class DatasetAnalyzer:
         Args:
             dataset_name: Nombre del dataset
         """
-        df = self._get_dataset(dataset_name)
-        return get_data_summary(df)
+        return self._memoize('summary', dataset_name, get_data_summary)
     
     def check_quality(self, dataset_name: str) -> dict:
         """
@@ -131,8 +326,7 @@ class DatasetAnalyzer:
         Args:
             dataset_name: Nombre del dataset
         """
-        df = self._get_dataset(dataset_name)
-        return check_data_quality(df, dataset_name.upper())
+        return self._memoize('quality', dataset_name, lambda df: check_data_quality(df, dataset_name.upper()))
     
     def find_outliers(
         self, 
@@ -148,8 +342,7 @@ class DatasetAnalyzer:
             column: Columna a analizar
             method: Método de detección
         """
-        df = self._get_dataset(dataset_name)
-        return detect_outliers(df, column, method)
+        return self._memoize('outliers', dataset_name, lambda df: detect_outliers(df, column, method), column, method)
     
     def correlations(self, dataset_name: str, method: str = 'pearson') -> pd.DataFrame:
         """
@@ -159,8 +352,7 @@ class DatasetAnalyzer:
             dataset_name: Nombre del dataset
             method: Método de correlación
         """
-        df = self._get_dataset(dataset_name)
-        return correlation_analysis(df, method)
+        return self._memoize('correlations', dataset_name, lambda df: correlation_analysis(df, method), method)
     
     def merge_data(self) -> pd.DataFrame:
         """
@@ -222,18 +414,12 @@ class DatasetAnalyzer:
             print(f"  • {key}: {value}")
     
     def _get_dataset(self, name: str) -> pd.DataFrame:
-        """Obtener dataset por nombre"""
-        datasets = {
-            'categories': self.categories,
-            'product_category': self.product_category,
-            'transactions': self.transactions,
-            'merged': self.merged_data
-        }
-        
-        if name not in datasets:
-            raise ValueError(f"Dataset '{name}' no válido. Opciones: {list(datasets.keys())}")
-        
-        df = datasets[name]
+        """Obtener dataset por nombre (cargándolo si aún no se ha usado)"""
+        if name not in DATASET_NAMES:
+            raise ValueError(f"Dataset '{name}' no válido. Opciones: {list(DATASET_NAMES)}")
+        
+        attr = 'merged_data' if name == 'merged' else name
+        df = getattr(self, attr)
         if df is None:
             raise ValueError(f"Dataset '{name}' no ha sido cargado")
         
@@ -248,17 +434,10 @@ class DatasetAnalyzer:
         """
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        datasets = {
-            'categories': self.categories,
-            'product_category': self.product_category,
-            'transactions': self.transactions
-        }
-        
-        for name, df in datasets.items():
-            if df is not None:
-                # Guardar resumen
-                summary = get_data_summary(df)
-                summary_df = pd.DataFrame([summary])
-                summary_df.to_csv(output_dir / f'{name}_summary.csv', index=False)
-                
-                print(f"Resumen de {name} exportado")
\ No newline at end of file
+        for name in ('categories', 'product_category', 'transactions'):
+            # Guardar resumen (memoizado por huella: repetir la exportación es gratis)
+            summary = self.get_summary(name)
+            summary_df = pd.DataFrame([summary])
+            summary_df.to_csv(output_dir / f'{name}_summary.csv', index=False)
+            
+            print(f"Resumen de {name} exportado")
@@ -0,0 +1,386 @@
+"""
+Módulo para parsear transacciones crudas directamente a canastas
+Lee los archivos fecha|tipo|id|productos|... y produce arreglos compactos
+(fechas, tipo, persona, offsets de canasta, IDs de producto y cantidades)
+sin construir el DataFrame ancho ni listas de Python por transacción.
+Las canastas se guardan en forma canónica: productos únicos y ordenados
+dentro de cada canasta, con la cantidad de cada uno aparte
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .config import SEPARATOR, ENCODING, LOAD_WORKERS
+from .data_loader import list_transaction_files
+from .transaction_validation import QUARANTINE_REASONS, group_reasons, quarantine_counts, report_quarantine
+
+# Separador que nunca aparece en los archivos: cada línea se lee como un único campo
+_LINE_DELIMITER = '\x1f'
+# Valores numéricos que acepta pd.to_numeric (enteros, decimales y notación científica)
+_NUMBER_PATTERN = r'^[+-]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][+-]?[0-9]+)?$'
+
+# Arreglos de un conjunto de canastas: fecha (datetime64[ns]),
+# tipo_transaccion (int16) y persona_id (int32) por transacción; offsets
+# int64 de largo n+1 (la canasta i es productos[offsets[i]:offsets[i + 1]]);
+# productos int32 únicos y ordenados por canasta y cantidades int16 de cada uno
+BASKET_ARRAYS = ('fecha', 'tipo_transaccion', 'persona_id', 'offsets', 'productos', 'cantidades')
+
+
+def is_canonical(offsets: np.ndarray, values: np.ndarray) -> bool:
+    """
+    Comprobar si cada canasta ya está ordenada y sin repetidos
+
+    Args:
+        offsets: Offsets int64 de largo n+1
+        values: Valores concatenados de todas las canastas
+
+    Returns:
+        True si los valores crecen estrictamente dentro de cada canasta
+    """
+    increasing = np.diff(values) > 0
+    # Entre el último valor de una canasta y el primero de la siguiente no se compara
+    boundaries = offsets[1:-1]
+    boundaries = boundaries[(boundaries > 0) & (boundaries < len(values))] - 1
+    increasing[boundaries] = True
+    return bool(increasing.all())
+
+
+def canonical_baskets(offsets: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Ordenar y deduplicar los valores de cada canasta en bloque
+
+    Args:
+        offsets: Offsets int64 de largo n+1
+        values: Valores concatenados de todas las canastas
+
+    Returns:
+        Tupla (offsets, valores únicos ordenados por canasta, cantidades
+        int16 de cada valor en su canasta)
+    """
+    n = len(offsets) - 1
+    basket = np.repeat(np.arange(n), np.diff(offsets))
+    order = np.lexsort((values, basket))
+    basket = basket[order]
+    values = values[order]
+
+    first = np.ones(len(values), dtype=bool)
+    first[1:] = (basket[1:] != basket[:-1]) | (values[1:] != values[:-1])
+    starts = np.flatnonzero(first)
+
+    canonical_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(basket[starts], minlength=n), out=canonical_offsets[1:])
+    cantidades = np.diff(np.append(starts, len(values))).astype(np.int16)
+    return canonical_offsets, values[starts], cantidades
+
+
+def basket_sizes(offsets: np.ndarray, cantidades: np.ndarray) -> np.ndarray:
+    """
+    Número de productos por canasta contando las cantidades
+
+    Args:
+        offsets: Offsets int64 de largo n+1
+        cantidades: Cantidad de cada producto único
+
+    Returns:
+        Arreglo int64 con el total de productos de cada canasta
+    """
+    n = len(offsets) - 1
+    basket = np.repeat(np.arange(n), np.diff(offsets))
+    return np.bincount(basket, weights=cantidades, minlength=n).astype(np.int64)
+
+
+def expand_baskets(
+    offsets: np.ndarray,
+    values: np.ndarray,
+    cantidades: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Repetir cada valor según su cantidad (inverso de canonical_baskets, en orden)
+
+    Returns:
+        Tupla (offsets, valores con repetidos)
+    """
+    expanded_offsets = np.zeros(len(offsets), dtype=np.int64)
+    np.cumsum(basket_sizes(offsets, cantidades), out=expanded_offsets[1:])
+    return expanded_offsets, np.repeat(values, cantidades)
+
+
+def _read_lines(file: Path):
+    """
+    Leer las líneas de datos de un archivo como un arreglo de texto de Arrow
+
+    La primera línea se descarta porque pd.read_csv la usa como cabecera.
+    Los archivos .gz, .bz2 y .zst se descomprimen al vuelo, sin temporales.
+
+    Args:
+        file: Ruta al archivo de transacciones
+
+    Returns:
+        pyarrow.StringArray con una entrada por línea
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    table = pa_csv.read_csv(
+        str(file),
+        read_options=pa_csv.ReadOptions(
+            use_threads=True,
+            column_names=['linea'],
+            skip_rows=1,
+            encoding=ENCODING
+        ),
+        parse_options=pa_csv.ParseOptions(
+            delimiter=_LINE_DELIMITER,
+            quote_char=False,
+            double_quote=False,
+            escape_char=False,
+            ignore_empty_lines=True
+        ),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={'linea': pa.string()},
+            strings_can_be_null=False
+        )
+    )
+    return table.column('linea').combine_chunks()
+
+
+def _null_if_empty(values):
+    """Campos de texto recortados, con los vacíos como nulos (como NaN en pd.read_csv)"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    values = pc.utf8_trim_whitespace(values)
+    return pc.if_else(pc.equal(values, ''), pa.scalar(None, pa.string()), values)
+
+
+def _numeric_values(values) -> np.ndarray:
+    """Campos de texto como float64; los nulos y no numéricos pasan a NaN (como pd.to_numeric)"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    numeric = pc.fill_null(pc.match_substring_regex(values, _NUMBER_PATTERN), False)
+    result = np.full(len(values), np.nan)
+    result[numeric.to_numpy(zero_copy_only=False)] = pc.cast(values.filter(numeric), pa.float64()).to_numpy()
+    return result
+
+
+def _parse_dates(values) -> np.ndarray:
+    """Fechas de texto como datetime64[ns]; las que no se pueden interpretar pasan a NaT"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        return pc.cast(values, pa.timestamp('ns')).to_numpy(zero_copy_only=False)
+    except pa.ArrowInvalid:
+        return pd.to_datetime(values.to_numpy(zero_copy_only=False), errors='coerce').to_numpy()
+
+
+def parse_transaction_file(
+    file: Path,
+    catalog: Optional[np.ndarray] = None,
+    return_quarantine: bool = False
+) -> Union[Dict[str, np.ndarray], Tuple[Dict[str, np.ndarray], pd.DataFrame]]:
+    """
+    Parsear un archivo de transacciones a arreglos de canastas
+
+    Cada línea tiene la forma fecha|tipo|id|productos|tipo|id|productos|...
+    Los grupos se validan con las mismas reglas que la transformación del
+    DataFrame ancho (ver transaction_validation.group_reasons): los que
+    fallan van a cuarentena con su motivo, los grupos completamente vacíos
+    se descartan y un grupo sin productos produce una canasta vacía.
+
+    Args:
+        file: Ruta al archivo de transacciones
+        catalog: IDs de producto conocidos (None = no se comprueba el catálogo)
+        return_quarantine: Si True devuelve también los grupos rechazados
+
+    Returns:
+        Diccionario con:
+            - 'fecha': datetime64[ns], una por transacción
+            - 'tipo_transaccion': int16
+            - 'persona_id': int32
+            - 'offsets': int64 de largo n+1; la canasta i es
+              productos[offsets[i]:offsets[i + 1]]
+            - 'productos': int32 con los IDs únicos y ordenados de cada
+              canasta, concatenados
+            - 'cantidades': int16 con las veces que aparece cada producto
+              en su canasta
+        o tupla (arreglos, cuarentena) si return_quarantine=True; la
+        cuarentena tiene los mismos valores crudos (texto) y motivo que la
+        de _transform_wide_frame
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    lines = _read_lines(file)
+    fields = pc.split_pattern(lines, SEPARATOR)
+    field_offsets = fields.offsets.to_numpy().astype(np.int64)
+    values = fields.values
+
+    # Grupos tipo|id|productos de cada línea; a un grupo final incompleto le
+    # faltan campos, que se leen como nulos (igual que el relleno de pd.read_csv)
+    n_fields = np.diff(field_offsets)
+    n_groups = np.maximum((n_fields + 1) // 3, 0)
+
+    line_idx = np.repeat(np.arange(len(lines)), n_groups)
+    group_starts = np.cumsum(n_groups) - n_groups
+    group_k = np.arange(len(line_idx)) - np.repeat(group_starts, n_groups)
+    base = field_offsets[:-1][line_idx] + 1 + 3 * group_k
+    line_end = field_offsets[1:][line_idx]
+
+    def group_field(position):
+        return values.take(pa.array(position, mask=position >= line_end))
+
+    tipo_raw = group_field(base)
+    persona_raw = group_field(base + 1)
+    productos_raw = group_field(base + 2)
+    tipo = _null_if_empty(tipo_raw)
+    persona = _null_if_empty(persona_raw)
+    productos = _null_if_empty(productos_raw)
+
+    fecha_raw = values.take(pa.array(field_offsets[:-1]))
+    fecha = _parse_dates(pc.utf8_trim_whitespace(fecha_raw))[line_idx]
+
+    tipo_present = tipo.is_valid().to_numpy(zero_copy_only=False)
+    id_present = persona.is_valid().to_numpy(zero_copy_only=False)
+    present = tipo_present | id_present | productos.is_valid().to_numpy(zero_copy_only=False)
+    tipos = _numeric_values(tipo)
+    ids = _numeric_values(persona)
+    reason = group_reasons(~np.isnat(fecha), tipo_present, id_present, tipos, ids, productos, catalog)
+    valid = present & (reason < 0)
+
+    # Los grupos sin productos quedan como nulos y el split produce listas vacías
+    baskets = pc.utf8_split_whitespace(productos.filter(pa.array(valid)))
+    basket_offsets = baskets.offsets.to_numpy().astype(np.int64)
+    offsets, productos_ids, cantidades = canonical_baskets(
+        basket_offsets - basket_offsets[0],
+        pc.cast(
+            baskets.values.slice(basket_offsets[0], basket_offsets[-1] - basket_offsets[0]),
+            pa.int32()
+        ).to_numpy()
+    )
+
+    result = {
+        'fecha': fecha[valid],
+        'tipo_transaccion': tipos[valid].astype(np.int16),
+        'persona_id': ids[valid].astype(np.int32),
+        'offsets': offsets,
+        'productos': productos_ids,
+        'cantidades': cantidades,
+    }
+    if not return_quarantine:
+        return result
+
+    # Valores crudos como texto para poder inspeccionarlos tal cual llegaron
+    rejected = pa.array(present & (reason >= 0))
+    quarantine = pd.DataFrame({
+        name: pc.if_else(pc.equal(raw, ''), pa.scalar(None, pa.string()), raw).filter(rejected).to_numpy(
+            zero_copy_only=False
+        )
+        for name, raw in (
+            ('fecha', fecha_raw.take(pa.array(line_idx))),
+            ('tipo_transaccion', tipo_raw),
+            ('persona_id', persona_raw),
+            ('productos', productos_raw),
+        )
+    }).astype("string")
+    quarantine["motivo"] = pd.Categorical.from_codes(
+        reason[present & (reason >= 0)], categories=list(QUARANTINE_REASONS)
+    )
+    return result, quarantine
+
+
+def concat_baskets(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Concatenar varios conjuntos de arreglos de canastas, reajustando offsets
+
+    Args:
+        parts: Lista de diccionarios como los de parse_transaction_file
+
+    Returns:
+        Diccionario con los arreglos concatenados
+    """
+    offsets = [np.zeros(1, dtype=np.int64)]
+    shift = 0
+    for part in parts:
+        offsets.append(part['offsets'][1:] + shift)
+        shift += part['offsets'][-1]
+
+    result = {
+        name: np.concatenate([part[name] for part in parts])
+        for name in BASKET_ARRAYS if name != 'offsets'
+    }
+    result['offsets'] = np.concatenate(offsets)
+    return result
+
+
+def parse_transactions(
+    transactions_dir: Path,
+    sample_size: Optional[int] = None,
+    file_pattern: Union[str, Sequence[str], None] = None,
+    n_workers: Optional[int] = None,
+    catalog: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Parsear todos los archivos de transacciones directamente a canastas
+
+    Sustituye a load_transactions + extract_transaction_features cuando
+    solo se necesitan los arreglos de canastas. Los grupos inválidos se
+    descartan con las reglas de cuarentena y se informan sus conteos.
+
+    Args:
+        transactions_dir: Directorio con archivos de transacciones
+        sample_size: Número de archivos a parsear (None = todos)
+        file_pattern: Patrón o patrones de archivos (None = CSV planos y .gz/.zst/.bz2)
+        n_workers: Archivos parseados en paralelo (None = LOAD_WORKERS)
+        catalog: IDs de producto conocidos (None = no se comprueba el catálogo)
+
+    Returns:
+        Diccionario de arreglos (ver parse_transaction_file)
+    """
+    print("PARSEANDO TRANSACCIONES A CANASTAS")
+
+    n_workers = LOAD_WORKERS if n_workers is None else n_workers
+
+    transaction_files = list_transaction_files(transactions_dir, file_pattern, sample_size)
+
+    print(f"Archivos encontrados: {len(transaction_files)}")
+
+    def parse_or_error(file):
+        try:
+            return parse_transaction_file(file, catalog=catalog, return_quarantine=True), None
+        except Exception as e:
+            return None, str(e)
+
+    # pyarrow libera el GIL al parsear, por lo que basta con hilos
+    with ThreadPoolExecutor(max_workers=max(n_workers, 1)) as pool:
+        results = list(pool.map(parse_or_error, transaction_files))
+
+    parts = []
+    quarantined = {}
+    errors = []
+    for file, (parsed, error) in zip(transaction_files, results):
+        if error is None:
+            part, quarantine = parsed
+            parts.append(part)
+            for motivo, count in quarantine_counts(quarantine).items():
+                quarantined[motivo] = quarantined.get(motivo, 0) + count
+        else:
+            errors.append(f"Error en {file.name}: {error}")
+            print(f"  {errors[-1]}")
+
+    if not parts:
+        raise ValueError("No se pudieron cargar transacciones")
+
+    baskets = concat_baskets(parts)
+
+    report_quarantine({motivo: quarantined[motivo] for motivo in QUARANTINE_REASONS if motivo in quarantined})
+    print(f"\nTransacciones parseadas: {len(baskets['persona_id']):,}")
+    print(f"Items en canastas: {len(baskets['productos']):,}")
+    if errors:
+        print(f"\nArchivos con errores: {len(errors)}")
+
+    return baskets
@@ -0,0 +1,351 @@
+"""
+Módulo para el almacén columnar de canastas en disco
+Guarda fecha, tipo, persona, offsets de canasta, IDs de producto y cantidades como
+archivos .npy de ancho fijo que se abren con np.memmap, de modo que todas
+las tareas del pipeline comparten las mismas páginas en caché del sistema.
+El pipeline guarda un almacén por mes, que BasketStore combina al leer
+"""
+
+import json
+import os
+import re
+import shutil
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from .basket_parser import BASKET_ARRAYS, basket_sizes, concat_baskets
+from .transformed_store import (
+    PRODUCTS_COLUMN,
+    QUANTITIES_COLUMN,
+    basket_arrays,
+    filter_transformed,
+    month_bounds,
+    products_series,
+    read_transformed,
+    to_canonical,
+    transformed_months,
+)
+
+STORE_VERSION = 2  # 2: canastas canónicas con cantidades
+STORE_META_FILENAME = 'meta.json'
+# Subdirectorio de cada almacén mensual (ver refresh_basket_stores)
+MONTH_STORE_PREFIX = 'año_mes='
+
+STORE_DTYPES = {
+    'fecha': 'datetime64[ns]',
+    'tipo_transaccion': 'int16',
+    'persona_id': 'int32',
+    'offsets': 'int64',
+    'productos': 'int32',
+    'cantidades': 'int16',
+}
+
+# Columnas del parquet transformado de las que se arma un almacén
+BASKET_FRAME_COLUMNS = ('fecha', 'tipo_transaccion', 'persona_id', PRODUCTS_COLUMN, QUANTITIES_COLUMN)
+
+# Columnas escalares que BasketStore.to_frame puede construir
+FRAME_COLUMNS = ('fecha', 'tipo_transaccion', 'persona_id', 'num_productos', 'tiene_productos')
+
+
+def baskets_from_frame(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Convertir un DataFrame transformado a arreglos de canastas
+
+    Args:
+        df: DataFrame transformado con fecha, tipo_transaccion, persona_id y
+            las columnas canónicas 'productos' y 'cantidades' (sin copia) o
+            productos_list
+
+    Returns:
+        Diccionario de arreglos con las claves de BASKET_ARRAYS
+
+    Raises:
+        ValueError: si algún producto no es un ID entero
+    """
+    offsets, productos, cantidades = basket_arrays(df)
+    return {
+        'fecha': pd.to_datetime(df['fecha']).to_numpy(dtype='datetime64[ns]'),
+        'tipo_transaccion': df['tipo_transaccion'].to_numpy(dtype=np.int16),
+        'persona_id': df['persona_id'].to_numpy(dtype=np.int32),
+        'offsets': offsets,
+        'productos': productos,
+        'cantidades': cantidades,
+    }
+
+
+def baskets_to_frame(baskets: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """
+    Construir el DataFrame transformado canónico a partir de arreglos de canastas
+
+    Inverso de baskets_from_frame: las columnas 'productos' y 'cantidades'
+    son listas de Arrow construidas sobre los mismos arreglos, sin listas de
+    Python por transacción.
+
+    Args:
+        baskets: Diccionario de arreglos (ver parse_transaction_file)
+
+    Returns:
+        DataFrame canónico (ver to_canonical) con fecha, tipo_transaccion,
+        persona_id, productos, cantidades, num_productos, tiene_productos y
+        las dimensiones de tiempo
+    """
+    offsets = baskets['offsets']
+    num_productos = basket_sizes(offsets, baskets['cantidades'])
+    df = pd.DataFrame({
+        'fecha': baskets['fecha'],
+        'tipo_transaccion': baskets['tipo_transaccion'],
+        'persona_id': baskets['persona_id'],
+    })
+    df[PRODUCTS_COLUMN] = products_series(offsets, baskets['productos'])
+    df[QUANTITIES_COLUMN] = products_series(offsets, baskets['cantidades'], name=QUANTITIES_COLUMN, dtype='int16')
+    df['num_productos'] = num_productos
+    df['tiene_productos'] = num_productos > 0
+    return to_canonical(df)
+
+
+def write_basket_store(baskets: Dict[str, np.ndarray], store_dir: Path) -> Path:
+    """
+    Escribir los arreglos de canastas como almacén .npy
+
+    Se escribe en un directorio temporal y se reemplaza el anterior al final,
+    para que un lector nunca vea un almacén a medio escribir.
+
+    Args:
+        baskets: Diccionario de arreglos (ver baskets_from_frame)
+        store_dir: Directorio destino
+
+    Returns:
+        Ruta del almacén escrito
+    """
+    store_dir = Path(store_dir)
+    tmp_dir = store_dir.with_name(store_dir.name + '.tmp')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    for name in BASKET_ARRAYS:
+        array = np.ascontiguousarray(baskets[name], dtype=STORE_DTYPES[name])
+        np.save(tmp_dir / f"{name}.npy", array)
+
+    meta = {
+        'version': STORE_VERSION,
+        'n_transacciones': int(len(baskets['persona_id'])),
+        'n_items': int(len(baskets['productos'])),
+        'dtypes': STORE_DTYPES,
+    }
+    with open(tmp_dir / STORE_META_FILENAME, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    old_dir = store_dir.with_name(store_dir.name + '.old')
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if store_dir.exists():
+        os.replace(store_dir, old_dir)
+    os.replace(tmp_dir, store_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    print(f"✓ Almacén de canastas escrito en: {store_dir} ({meta['n_transacciones']:,} transacciones)")
+    return store_dir
+
+
+def _month_stores(store_dir: Path) -> List[Path]:
+    """Almacenes mensuales de store_dir en orden de mes (sin temporales a medio escribir)"""
+    pattern = re.compile(re.escape(MONTH_STORE_PREFIX) + r'\d{4}-\d{2}')
+    return sorted(path for path in Path(store_dir).iterdir() if path.is_dir() and pattern.fullmatch(path.name))
+
+
+def _is_current_store(store_dir: Path) -> bool:
+    """Si store_dir tiene un almacén completo de la versión actual"""
+    meta_path = store_dir / STORE_META_FILENAME
+    if not meta_path.exists():
+        return False
+    with open(meta_path, encoding='utf-8') as f:
+        return json.load(f).get('version') == STORE_VERSION
+
+
+def refresh_basket_stores(
+    transformed_dir: Path,
+    store_dir: Path,
+    months: Optional[Iterable[str]] = None
+) -> List[Path]:
+    """
+    Actualizar los almacenes de canastas por mes del dataset transformado
+
+    Cada mes va a store_dir/año_mes=AAAA-MM (un almacén como los de
+    write_basket_store) y BasketStore(store_dir) los combina al leer. Solo
+    se reescriben los meses indicados (p. ej. los que compactó
+    refresh_transformed_partitions) y los que no tienen un almacén vigente;
+    los almacenes de meses que ya no están en el dataset se borran.
+
+    Args:
+        transformed_dir: Directorio raíz del dataset transformado particionado
+        store_dir: Directorio de los almacenes mensuales
+        months: Meses AAAA-MM a reescribir (None = todos)
+
+    Returns:
+        Rutas de los almacenes escritos
+    """
+    transformed_dir = Path(transformed_dir)
+    store_dir = Path(store_dir)
+    dataset_months = transformed_months(transformed_dir)
+
+    # Un almacén único de versiones anteriores se reemplaza por los mensuales
+    if (store_dir / STORE_META_FILENAME).exists():
+        shutil.rmtree(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    for path in store_dir.iterdir():
+        if path.is_dir() and path.name[len(MONTH_STORE_PREFIX):] not in dataset_months:
+            shutil.rmtree(path)
+
+    pending = set(dataset_months) if months is None else set(months) & set(dataset_months)
+    pending.update(
+        month for month in dataset_months
+        if not _is_current_store(store_dir / f"{MONTH_STORE_PREFIX}{month}")
+    )
+
+    written = []
+    for month in sorted(pending):
+        desde, hasta = month_bounds(month)
+        month_df = read_transformed(
+            transformed_dir, columns=list(BASKET_FRAME_COLUMNS), fecha_desde=desde, fecha_hasta=hasta
+        )
+        written.append(write_basket_store(baskets_from_frame(month_df), store_dir / f"{MONTH_STORE_PREFIX}{month}"))
+    return written
+
+
+class BasketStore:
+    """
+    Lector del almacén de canastas mapeado en memoria
+
+    store_dir puede ser un almacén (write_basket_store) o un directorio de
+    almacenes mensuales (refresh_basket_stores); estos se combinan en orden
+    de mes. Con un solo almacén los arreglos son vistas del mapa de memoria;
+    con varios se concatenan al abrir.
+
+    Atributos:
+        fecha: datetime64[ns] por transacción
+        tipo_transaccion: int16 por transacción
+        persona_id: int32 por transacción
+        offsets: int64 de largo n+1 (la canasta i es productos[offsets[i]:offsets[i + 1]])
+        productos: int32 con los IDs únicos y ordenados de cada canasta, concatenados
+        cantidades: int16 con la cantidad de cada producto en su canasta
+    """
+
+    def __init__(self, store_dir: Path):
+        self.store_dir = Path(store_dir)
+        if (self.store_dir / STORE_META_FILENAME).exists():
+            stores = [self.store_dir]
+        elif self.store_dir.is_dir():
+            stores = _month_stores(self.store_dir)
+        else:
+            stores = []
+        if not stores:
+            raise FileNotFoundError(f"No existe un almacén de canastas en {self.store_dir}")
+
+        parts = []
+        for path in stores:
+            meta_path = path / STORE_META_FILENAME
+            if not meta_path.exists():
+                raise FileNotFoundError(f"No existe un almacén de canastas en {path}")
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') != STORE_VERSION:
+                raise ValueError(f"Versión de almacén no soportada: {meta.get('version')}")
+            parts.append({name: np.load(path / f"{name}.npy", mmap_mode='r') for name in BASKET_ARRAYS})
+
+        arrays = parts[0] if len(parts) == 1 else concat_baskets(parts)
+        for name in BASKET_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.meta = {
+            'version': STORE_VERSION,
+            'n_transacciones': int(len(self.persona_id)),
+            'n_items': int(len(self.productos)),
+            'dtypes': STORE_DTYPES,
+            'almacenes': [path.name for path in stores],
+        }
+
+    def __len__(self) -> int:
+        return len(self.persona_id)
+
+    def __repr__(self) -> str:
+        return f"BasketStore('{self.store_dir}', transacciones={len(self):,}, items={len(self.productos):,})"
+
+    @property
+    def num_productos(self) -> np.ndarray:
+        """Número de productos por canasta (contando cantidades)"""
+        return basket_sizes(self.offsets, self.cantidades)
+
+    def basket(self, i: int) -> np.ndarray:
+        """Productos únicos y ordenados de la canasta i (vista sobre el mapa de memoria)"""
+        return self.productos[self.offsets[i]:self.offsets[i + 1]]
+
+    def iter_baskets(self) -> Iterator[np.ndarray]:
+        """Recorrer las canastas como vistas de arreglos int32 ordenados y sin repetidos"""
+        productos = self.productos
+        offsets = self.offsets
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            yield productos[start:end]
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Arreglos del almacén con las claves de BASKET_ARRAYS"""
+        return {name: getattr(self, name) for name in BASKET_ARRAYS}
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Construir un DataFrame con columnas escalares del almacén
+
+        Args:
+            columns: Columnas a incluir (None = todas las de FRAME_COLUMNS)
+
+        Returns:
+            DataFrame con una fila por transacción
+        """
+        columns = list(FRAME_COLUMNS) if columns is None else columns
+        unknown = [col for col in columns if col not in FRAME_COLUMNS]
+        if unknown:
+            raise ValueError(f"Columnas no disponibles en el almacén: {unknown}. Opciones: {list(FRAME_COLUMNS)}")
+
+        data = {}
+        for col in columns:
+            if col == 'num_productos':
+                data[col] = self.num_productos
+            elif col == 'tiene_productos':
+                data[col] = np.diff(self.offsets) > 0
+            else:
+                data[col] = np.asarray(getattr(self, col))
+        return pd.DataFrame(data)
+
+
+def as_frame(
+    data: Union[pd.DataFrame, BasketStore, Path, str],
+    columns: List[str],
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
+    """
+    Obtener un DataFrame a partir de un DataFrame transformado, de un almacén
+    o de la ruta del dataset transformado
+
+    Args:
+        data: DataFrame transformado, BasketStore o ruta del parquet
+            transformado (se leen solo las columnas y filas pedidas)
+        columns: Columnas necesarias si data es un almacén o una ruta
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a conservar (None = todos)
+
+    Returns:
+        El mismo DataFrame (filtrado si se pidieron filtros), o uno nuevo con
+        las columnas pedidas del almacén o del parquet
+    """
+    if isinstance(data, (str, Path)):
+        return read_transformed(
+            data, columns=columns, fecha_desde=fecha_desde, fecha_hasta=fecha_hasta, tipos=tipos
+        )
+    if isinstance(data, BasketStore):
+        needed = list(columns)
+        if tipos is not None and 'tipo_transaccion' not in needed:
+            needed.append('tipo_transaccion')
+        data = data.to_frame(needed)
+    return filter_transformed(data, fecha_desde=fecha_desde, fecha_hasta=fecha_hasta, tipos=tipos)
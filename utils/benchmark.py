@@ -0,0 +1,505 @@
+"""
+Módulo de benchmarks del pipeline
+Ejecuta cada etapa del DAG (carga, transformación, análisis temporal, de
+clientes, top productos, co-ocurrencia, reglas de asociación y
+visualización) en un proceso propio sobre datos sintéticos, mide tiempo de
+pared, tiempo de CPU y pico de memoria RSS, y compara los resultados con
+una línea base guardada
+"""
+
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .config import (
+    BASE_DIR,
+    BENCHMARK_MIN_SECONDS,
+    BENCHMARK_REGRESSION_THRESHOLD,
+    CACHE_FILES,
+    SYNTHETIC_DIR,
+)
+
+RESULTS_VERSION = 1
+
+# Etapas en orden de ejecución: cada una lee lo que dejaron las anteriores
+# en el directorio de trabajo, igual que las tareas del DAG
+BENCHMARK_STAGES = (
+    'load',
+    'transform',
+    'temporal',
+    'customer',
+    'top_products',
+    'cooccurrence',
+    'association_rules',
+    'visualization',
+)
+
+# Métricas comparadas con la línea base
+BENCHMARK_METRICS = ('wall_s', 'cpu_s', 'peak_rss_mb')
+
+# Entrada de cada proceso hijo (se ejecuta con cwd=BASE_DIR)
+_CHILD_CODE = 'import sys; from utils.benchmark import _run_stage_child; sys.exit(_run_stage_child(*sys.argv[1:]))'
+
+
+def _paths(work_dir: Path) -> Dict[str, Path]:
+    """Rutas del directorio de trabajo de una corrida"""
+    cache_dir = work_dir / 'cache'
+    return {
+        'cache': cache_dir,
+        'transformed': cache_dir / CACHE_FILES['transactions_transformed'],
+        'store': cache_dir / 'basket_store',
+        'reports': work_dir / 'reports',
+    }
+
+
+def _stage_load(data_dir: Path, paths: Dict[str, Path]):
+    from .ingestion_cache import load_transactions_incremental
+    from .product_dictionary import build_product_dictionary
+
+    load_transactions_incremental(data_dir, paths['cache'])
+    build_product_dictionary().save(paths['cache'])
+
+
+def _stage_transform(data_dir: Path, paths: Dict[str, Path]):
+    from .basket_store import refresh_basket_stores
+    from .data_transformer import refresh_transformed_partitions
+    from .product_dictionary import load_product_dictionary
+
+    dictionary = load_product_dictionary(paths['cache'])
+    result = refresh_transformed_partitions(paths['transformed'], paths['cache'], catalog=dictionary.catalog_ids)
+    refresh_basket_stores(paths['transformed'], paths['store'], result['months'])
+
+
+def _stage_temporal(data_dir: Path, paths: Dict[str, Path]):
+    from .temporal_analysis import (
+        analyze_daily_sales,
+        analyze_day_of_week_patterns,
+        analyze_hourly_patterns,
+        analyze_monthly_sales,
+        analyze_trends_and_seasonality,
+        analyze_weekly_sales,
+    )
+
+    source, reports = paths['transformed'], paths['reports']
+    analyze_daily_sales(source).to_csv(reports / 'ventas_diarias.csv', index=False)
+    analyze_weekly_sales(source).to_csv(reports / 'ventas_semanales.csv', index=False)
+    analyze_monthly_sales(source).to_csv(reports / 'ventas_mensuales.csv', index=False)
+    analyze_day_of_week_patterns(source).to_csv(reports / 'ventas_dia_semana.csv', index=False)
+    analyze_hourly_patterns(source).to_csv(reports / 'ventas_por_hora.csv', index=False)
+    analyze_trends_and_seasonality(source)
+
+
+def _stage_customer(data_dir: Path, paths: Dict[str, Path]):
+    from .customer_analysis import (
+        analyze_customer_behavior_summary,
+        analyze_customer_frequency,
+        analyze_time_between_purchases,
+        segment_customers,
+    )
+
+    source, reports = paths['transformed'], paths['reports']
+    freq = analyze_customer_frequency(source)
+    freq.to_csv(reports / 'frecuencia_clientes.csv', index=False)
+    tiempo = analyze_time_between_purchases(source)
+    tiempo.to_csv(reports / 'tiempo_entre_compras.csv', index=False)
+    segments = segment_customers(source, freq, tiempo)
+    segments.to_csv(reports / 'segmentacion_clientes.csv', index=False)
+    analyze_customer_behavior_summary(segments)
+
+
+def _stage_top_products(data_dir: Path, paths: Dict[str, Path]):
+    from .basket_store import BasketStore
+    from .data_transformer import get_product_frequency
+    from .product_analysis import analyze_top_products
+    from .transformed_store import read_transformed
+
+    analyze_top_products(BasketStore(paths['store']), top_n=50).to_csv(
+        paths['reports'] / 'top_productos.csv', index=False
+    )
+    get_product_frequency(read_transformed(paths['transformed']), top_n=200)
+
+
+def _stage_cooccurrence(data_dir: Path, paths: Dict[str, Path]):
+    from .basket_store import BasketStore
+    from .cooccurrence import build_cooccurrence
+    from .product_analysis import analyze_product_cooccurrence
+    from .product_dictionary import load_product_dictionary
+
+    matrix = build_cooccurrence(BasketStore(paths['store']), dictionary=load_product_dictionary(paths['cache']))
+    matrix.save(paths['cache'])
+    cooc = analyze_product_cooccurrence(matrix, top_n=100)
+    cooc.to_csv(paths['reports'] / 'productos_coocurrencia.csv', index=False)
+
+
+def _stage_association_rules(data_dir: Path, paths: Dict[str, Path]):
+    import pandas as pd
+    from .cooccurrence import load_cooccurrence
+    from .product_analysis_optimized import analyze_association_rules_optimized
+    from .transformed_store import read_transformed
+
+    try:
+        cooccurrence = load_cooccurrence(paths['cache'])
+    except (FileNotFoundError, ValueError):
+        cooccurrence = None
+    rules = analyze_association_rules_optimized(
+        read_transformed(paths['transformed'], columns=['productos', 'tiene_productos']), min_support=0.01, min_confidence=0.3, use_fpgrowth=True, max_len=3,
+        cooccurrence=cooccurrence
+    )
+    if rules is None:
+        rules = pd.DataFrame()
+    rules.to_csv(paths['reports'] / 'reglas_asociacion.csv', index=False)
+
+
+def _stage_visualization(data_dir: Path, paths: Dict[str, Path]):
+    import matplotlib
+    matplotlib.use('Agg')
+    import pandas as pd
+    from .transformed_store import read_transformed
+    from .visualization import generate_all_visualizations
+
+    def read(name, **kwargs):
+        path = paths['reports'] / name
+        if not path.exists() or path.stat().st_size <= 1:
+            return pd.DataFrame()
+        return pd.read_csv(path, **kwargs)
+
+    generate_all_visualizations(
+        read('ventas_diarias.csv', parse_dates=['fecha']),
+        read('ventas_semanales.csv'),
+        read('ventas_mensuales.csv'),
+        read('ventas_dia_semana.csv'),
+        read('ventas_por_hora.csv'),
+        read('frecuencia_clientes.csv'),
+        read('tiempo_entre_compras.csv'),
+        read('segmentacion_clientes.csv'),
+        read('top_productos.csv'),
+        read('productos_coocurrencia.csv'),
+        read('reglas_asociacion.csv'),
+        output_dir=paths['reports'],
+        df_transactions=read_transformed(paths['transformed']),
+    )
+
+
+_STAGE_FUNCTIONS = {
+    'load': _stage_load,
+    'transform': _stage_transform,
+    'temporal': _stage_temporal,
+    'customer': _stage_customer,
+    'top_products': _stage_top_products,
+    'cooccurrence': _stage_cooccurrence,
+    'association_rules': _stage_association_rules,
+    'visualization': _stage_visualization,
+}
+
+
+def _peak_rss_mb(who: int) -> float:
+    """Pico de RSS en MB según getrusage (Linux informa KB y macOS bytes)"""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _cpu_seconds() -> float:
+    """Tiempo de CPU (usuario + sistema) del proceso y de sus hijos terminados"""
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def _run_stage_child(stage: str, data_dir: str, work_dir: str, result_path: str) -> int:
+    """
+    Ejecutar una etapa en el proceso actual y guardar sus métricas como JSON
+
+    Es el punto de entrada de los procesos hijos de run_stage: así el pico de
+    RSS de cada etapa no incluye la memoria de las anteriores. pandas, numpy
+    y pyarrow se importan antes de medir, como base común a todas las etapas.
+    """
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import pyarrow  # noqa: F401
+
+    paths = _paths(Path(work_dir))
+    paths['reports'].mkdir(parents=True, exist_ok=True)
+
+    result = {'etapa': stage, 'rss_inicial_mb': round(_peak_rss_mb(resource.RUSAGE_SELF), 1)}
+    wall_start = time.perf_counter()
+    cpu_start = _cpu_seconds()
+    try:
+        _STAGE_FUNCTIONS[stage](Path(data_dir), paths)
+        result['estado'] = 'ok'
+    except Exception as e:
+        result['estado'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['wall_s'] = round(time.perf_counter() - wall_start, 3)
+    result['cpu_s'] = round(_cpu_seconds() - cpu_start, 3)
+    result['peak_rss_mb'] = round(
+        max(_peak_rss_mb(resource.RUSAGE_SELF), _peak_rss_mb(resource.RUSAGE_CHILDREN)), 1
+    )
+
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+    return 0 if result['estado'] == 'ok' else 1
+
+
+def run_stage(stage: str, data_dir: Path, work_dir: Path) -> Dict:
+    """
+    Ejecutar una etapa del pipeline en un proceso propio y medirla
+
+    La salida de la etapa se guarda en work_dir/logs/<etapa>.log.
+
+    Args:
+        stage: Nombre de la etapa (ver BENCHMARK_STAGES)
+        data_dir: Directorio con los archivos de transacciones
+        work_dir: Directorio de trabajo compartido por las etapas de la corrida
+
+    Returns:
+        Diccionario con etapa, estado, wall_s, cpu_s, peak_rss_mb,
+        rss_inicial_mb y error (si falló)
+    """
+    if stage not in _STAGE_FUNCTIONS:
+        raise ValueError(f"Etapa '{stage}' no válida. Opciones: {list(BENCHMARK_STAGES)}")
+
+    work_dir = Path(work_dir)
+    log_dir = work_dir / 'logs'
+    log_dir.mkdir(parents=True, exist_ok=True)
+    result_path = log_dir / f"{stage}.json"
+    result_path.unlink(missing_ok=True)
+
+    env = dict(os.environ, MPLBACKEND='Agg')
+    with open(log_dir / f"{stage}.log", 'w', encoding='utf-8') as log:
+        subprocess.run(
+            [sys.executable, '-c', _CHILD_CODE, stage, str(data_dir), str(work_dir), str(result_path)],
+            cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT, check=False
+        )
+
+    if not result_path.exists():
+        return {'etapa': stage, 'estado': 'error', 'error': f"El proceso terminó sin resultados (ver {log_dir / stage}.log)"}
+    with open(result_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def ensure_dataset(scale: float, seed: Optional[int] = None, n_workers: int = 1) -> Path:
+    """
+    Directorio de datos sintéticos de una escala, generándolo si no existe
+
+    Args:
+        scale: Escala respecto al dataset del README (1 = ~1.1M transacciones)
+        seed: Semilla (None = SYNTHETIC_SEED)
+        n_workers: Procesos para generar los días
+
+    Returns:
+        Ruta del directorio de transacciones
+    """
+    from .synthetic_data import generate_transactions
+
+    data_dir = SYNTHETIC_DIR / f"Transactions_x{scale:g}"
+    if not any(data_dir.glob('*.csv*')):
+        kwargs = {} if seed is None else {'seed': seed}
+        generate_transactions(data_dir, scale=scale, n_workers=n_workers, **kwargs)
+    return data_dir
+
+
+def _count_transactions(transformed_dir: Path) -> Optional[int]:
+    """Transacciones del dataset transformado según su manifiesto (None si no existe)"""
+    from .data_transformer import PARTITIONS_MANIFEST_FILENAME
+
+    manifest_path = transformed_dir / PARTITIONS_MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, encoding='utf-8') as f:
+        return sum(entry['rows'] for entry in json.load(f)['files'].values())
+
+
+def _median(values: List[float]) -> float:
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def run_benchmarks(
+    scales: Sequence[float],
+    work_root: Path,
+    stages: Optional[Sequence[str]] = None,
+    repetitions: int = 1,
+    n_workers: int = 1
+) -> Dict:
+    """
+    Ejecutar el pipeline completo sobre datos sintéticos de varias escalas
+
+    Cada repetición parte de un directorio de trabajo vacío (la carga y la
+    transformación incrementales no reutilizan nada) y ejecuta las etapas en
+    orden. Con varias repeticiones se informa la mediana de cada métrica.
+
+    Args:
+        scales: Escalas a medir (p. ej. 0.1, 1, 10)
+        work_root: Directorio donde se crean los directorios de trabajo
+        stages: Etapas a ejecutar (None = todas); las que se omiten no
+            producen sus salidas, por lo que las siguientes pueden fallar
+        repetitions: Corridas por escala
+        n_workers: Procesos para generar los datos sintéticos
+
+    Returns:
+        Diccionario con version, fecha, entorno y resultados (una entrada
+        por escala y etapa)
+    """
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+    stages = list(BENCHMARK_STAGES) if stages is None else list(stages)
+    unknown = [stage for stage in stages if stage not in BENCHMARK_STAGES]
+    if unknown:
+        raise ValueError(f"Etapas no válidas: {unknown}. Opciones: {list(BENCHMARK_STAGES)}")
+
+    print("BENCHMARK DEL PIPELINE")
+    print("=" * 70)
+
+    results = []
+    for scale in scales:
+        data_dir = ensure_dataset(scale, n_workers=n_workers)
+        runs = {stage: [] for stage in stages}
+        for repetition in range(repetitions):
+            work_dir = Path(work_root) / f"x{scale:g}"
+            shutil.rmtree(work_dir, ignore_errors=True)
+            print(f"\nEscala {scale:g} - repetición {repetition + 1}/{repetitions}")
+            for stage in stages:
+                run = run_stage(stage, data_dir, work_dir)
+                runs[stage].append(run)
+                if run['estado'] == 'ok':
+                    print(f"  {stage:<18} {run['wall_s']:>9.2f} s  CPU {run['cpu_s']:>9.2f} s  RSS {run['peak_rss_mb']:>8.1f} MB")
+                else:
+                    print(f"  {stage:<18} ERROR: {run['error']}")
+
+        n_transactions = _count_transactions(_paths(Path(work_root) / f"x{scale:g}")['transformed'])
+        for stage in stages:
+            ok = [run for run in runs[stage] if run['estado'] == 'ok']
+            entry = {'escala': scale, 'transacciones': n_transactions, 'etapa': stage}
+            if ok:
+                entry['estado'] = 'ok'
+                for metric in BENCHMARK_METRICS + ('rss_inicial_mb',):
+                    entry[metric] = round(_median([run[metric] for run in ok]), 3)
+            else:
+                entry['estado'] = 'error'
+                entry['error'] = runs[stage][-1].get('error')
+            results.append(entry)
+
+    return {
+        'version': RESULTS_VERSION,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'entorno': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'pyarrow': pa.__version__,
+        },
+        'repeticiones': repetitions,
+        'resultados': results,
+    }
+
+
+def save_results(results: Dict, path: Path) -> Path:
+    """Guardar resultados de benchmark como JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_results(path: Path) -> Dict:
+    """
+    Leer resultados de benchmark guardados con save_results
+
+    Raises:
+        ValueError: si el archivo es de otra versión
+    """
+    with open(path, encoding='utf-8') as f:
+        results = json.load(f)
+    if results.get('version') != RESULTS_VERSION:
+        raise ValueError(f"Versión de resultados no soportada: {results.get('version')}")
+    return results
+
+
+def compare_results(
+    current: Dict,
+    baseline: Dict,
+    threshold: float = BENCHMARK_REGRESSION_THRESHOLD,
+    min_seconds: float = BENCHMARK_MIN_SECONDS
+) -> List[Dict]:
+    """
+    Comparar resultados con una línea base por escala, etapa y métrica
+
+    Una métrica es regresión si supera a la base en más de threshold
+    (proporción). Las diferencias de tiempo menores que min_seconds se
+    ignoran porque están dentro del ruido de medición.
+
+    Args:
+        current: Resultados de run_benchmarks
+        baseline: Resultados de referencia
+        threshold: Tolerancia relativa (0.2 = 20 %)
+        min_seconds: Diferencia absoluta mínima para tiempos
+
+    Returns:
+        Lista de comparaciones con escala, etapa, metrica, base, actual,
+        cambio (proporción) y regresion (bool)
+    """
+    base_index = {
+        (entry['escala'], entry['etapa']): entry
+        for entry in baseline['resultados'] if entry.get('estado') == 'ok'
+    }
+    comparisons = []
+    for entry in current['resultados']:
+        base = base_index.get((entry['escala'], entry['etapa']))
+        if base is None or entry.get('estado') != 'ok':
+            continue
+        for metric in BENCHMARK_METRICS:
+            before, after = base[metric], entry[metric]
+            change = (after - before) / before if before else 0.0
+            regression = change > threshold
+            if metric != 'peak_rss_mb' and after - before < min_seconds:
+                regression = False
+            comparisons.append({
+                'escala': entry['escala'],
+                'etapa': entry['etapa'],
+                'metrica': metric,
+                'base': before,
+                'actual': after,
+                'cambio': round(change, 4),
+                'regresion': regression,
+            })
+    return comparisons
+
+
+def report_comparison(comparisons: List[Dict], threshold: float = BENCHMARK_REGRESSION_THRESHOLD) -> int:
+    """
+    Imprimir la comparación con la línea base
+
+    Returns:
+        Número de regresiones
+    """
+    print("\nCOMPARACIÓN CON LA LÍNEA BASE")
+    print("=" * 70)
+    for comparison in comparisons:
+        flag = '✗' if comparison['regresion'] else '✓'
+        print(
+            f"  {flag} x{comparison['escala']:g} {comparison['etapa']:<18} {comparison['metrica']:<12}"
+            f" {comparison['base']:>10.2f} → {comparison['actual']:>10.2f} ({comparison['cambio']:+.1%})"
+        )
+
+    regressions = sum(comparison['regresion'] for comparison in comparisons)
+    if regressions:
+        print(f"\n⚠ {regressions} métricas empeoraron más de {threshold:.0%}")
+    else:
+        print(f"\n✓ Sin regresiones por encima de {threshold:.0%}")
+    return regressions
@@ -3,6 +3,7 @@ Configuración global del proyecto
 Rutas, constantes y parámetros de configuración
 """
 
+import os
 from pathlib import Path
 
 # Rutas del proyecto
@@ -11,6 +12,7 @@ DATA_DIR = BASE_DIR / 'data' / 'DataSet'
 PRODUCTS_DIR = DATA_DIR / 'Products'
 TRANSACTIONS_DIR = DATA_DIR / 'Transactions'
 REPORTS_DIR = BASE_DIR / 'reports'
+CACHE_DIR = REPORTS_DIR / 'cache'
 NOTEBOOKS_DIR = BASE_DIR / 'notebooks'
 SCRIPTS_DIR = BASE_DIR / 'scripts'
 UTILS_DIR = BASE_DIR / 'utils'
@@ -24,6 +26,62 @@ FILES_CONFIG = {
     'product_category': 'ProductCategory.csv'
 }
 
+# Registro de esquemas: dtypes compactos compartidos por los loaders, el DAG
+# y el backend (backend/app/config.py replica estos valores)
+CATEGORIES_SCHEMA = {
+    'CategoryID': 'int32',
+    'CategoryName': 'category',
+}
+PRODUCT_CATEGORY_SCHEMA = {
+    'v.Code_pr': 'int32',
+    'v.code': 'int32',
+}
+# Las transacciones crudas se tipan por posición: fecha y luego grupos
+# tipo|id|productos (enteros nulables porque no todas las filas traen
+# todos los grupos)
+TRANSACTION_DATE_DTYPE = 'datetime64[ns]'
+TRANSACTION_GROUP_DTYPES = ('Int16', 'Int32', 'object')
+# Dimensiones de tiempo que se materializan una vez en el parquet transformado
+# para que los análisis temporales no vuelvan a derivarlas de 'fecha'
+TIME_DIMENSIONS_SCHEMA = {
+    'fecha_solo': 'datetime64[ns]',
+    'año': 'int16',
+    'mes': 'int8',
+    'semana_año': 'int16',
+    'dia_semana': 'int8',
+    'hora': 'int8',
+}
+TRANSFORMED_SCHEMA = {
+    'fecha': 'datetime64[ns]',
+    'tipo_transaccion': 'int16',
+    'persona_id': 'int32',
+    'num_productos': 'int16',
+    'tiene_productos': 'bool',
+    **TIME_DIMENSIONS_SCHEMA,
+}
+SCHEMAS = {
+    'categories': CATEGORIES_SCHEMA,
+    'product_category': PRODUCT_CATEGORY_SCHEMA,
+    'transactions_transformed': TRANSFORMED_SCHEMA,
+}
+
+# Archivos parquet de la caché del pipeline por dataset (los escribe el DAG)
+CACHE_FILES = {
+    'categories': 'categories.parquet',
+    'product_category': 'product_category.parquet',
+    # Directorio de particiones por mes y tipo, un archivo por partición (se lee como un dataset)
+    'transactions_transformed': 'transactions_transformed.parquet',
+}
+
+# Particiones hive del dataset transformado (año_mes=AAAA-MM/tipo_transaccion=N)
+# y filas por row group: cada partición se ordena por fecha para que las
+# estadísticas min/max de los row groups permitan saltarlos al filtrar
+TRANSFORMED_PARTITION_COLUMNS = ('año_mes', 'tipo_transaccion')
+TRANSFORMED_ROW_GROUP_SIZE = 128 * 1024
+
+# Patrones de archivos de transacciones (CSV plano o comprimido)
+TRANSACTION_FILE_PATTERNS = ('*.csv', '*.csv.gz', '*.csv.zst', '*.csv.bz2')
+
 # Configuración de separadores
 SEPARATOR = '|'
 
@@ -34,4 +92,45 @@ ENCODING = 'utf-8'
 DISPLAY_TOP_N = 20  # Número de registros a mostrar en frecuencias
 
 # Configuración de análisis
-OUTLIER_THRESHOLD = 1.5  # Factor para detección de outliers (IQR)
\ No newline at end of file
+OUTLIER_THRESHOLD = 1.5  # Factor para detección de outliers (IQR)
+ANALYZER_STATS_CACHE_SIZE = 32  # Resultados memoizados por DatasetAnalyzer (LRU)
+
+# Configuración de carga paralela de transacciones
+# Número de workers para leer archivos (1 = secuencial). Se puede
+# sobrescribir con la variable de entorno EDA_LOAD_WORKERS
+LOAD_WORKERS = int(os.environ.get('EDA_LOAD_WORKERS', 1))
+LOAD_EXECUTOR = os.environ.get('EDA_LOAD_EXECUTOR', 'thread')  # 'thread' o 'process'
+LOAD_ENGINE = os.environ.get('EDA_LOAD_ENGINE', 'pandas')  # 'pandas' o 'pyarrow'
+SLOWEST_FILES_TO_REPORT = 5  # Archivos más lentos a mostrar tras la carga
+
+# Configuración de la transformación por shards (transform_transactions_sharded)
+# Procesos para transformar shards en paralelo (1 = secuencial). Se puede
+# sobrescribir con la variable de entorno EDA_TRANSFORM_WORKERS
+TRANSFORM_WORKERS = int(os.environ.get('EDA_TRANSFORM_WORKERS', 1))
+TRANSFORM_ROWS_PER_SHARD = 200_000  # Filas por shard al partir un DataFrame en memoria
+
+# Configuración del conteo de itemsets y co-ocurrencia por shards (utils/sharded_counting.py)
+# Shards de canastas (1 = conteo en un solo proceso) y procesos que los
+# cuentan; se pueden sobrescribir con EDA_MINING_SHARDS / EDA_MINING_WORKERS
+MINING_SHARDS = int(os.environ.get('EDA_MINING_SHARDS', 1))
+MINING_WORKERS = int(os.environ.get('EDA_MINING_WORKERS', 1))
+
+# Configuración del generador de transacciones sintéticas (utils/synthetic_data.py)
+# Los valores por defecto reproducen el dataset descrito en el README:
+# 1,108,983 transacciones en 181 días, 131,185 clientes y ~9.5 productos por canasta
+SYNTHETIC_DIR = BASE_DIR / 'data' / 'synthetic'
+SYNTHETIC_START_DATE = '2013-01-01'
+SYNTHETIC_DAYS = 181
+SYNTHETIC_TRANSACTIONS = 1_108_983
+SYNTHETIC_CUSTOMERS = 131_185
+SYNTHETIC_TIPO_WEIGHTS = {102: 0.2834, 103: 0.3671, 107: 0.2296, 110: 0.1199}
+SYNTHETIC_BASKET_MEAN = 9.5
+SYNTHETIC_BASKET_MAX = 128
+SYNTHETIC_ZIPF_EXPONENT = 1.0
+SYNTHETIC_SEED = 42
+
+# Configuración de benchmarks del pipeline (utils/benchmark.py)
+BENCHMARK_DIR = REPORTS_DIR / 'benchmarks'
+BENCHMARK_SCALES = (0.1, 1.0)
+BENCHMARK_REGRESSION_THRESHOLD = 0.2  # Empeoramiento relativo tolerado (20 %)
+BENCHMARK_MIN_SECONDS = 0.5  # Diferencias de tiempo menores se consideran ruido
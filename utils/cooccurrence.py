@@ -0,0 +1,326 @@
+"""
+Módulo para la co-ocurrencia de productos con matrices dispersas
+Arma la matriz canasta×producto (CSR binaria) y obtiene la co-ocurrencia
+producto×producto como el producto disperso Xᵀ·X, sin enumerar los pares de
+cada canasta en Python. La matriz se persiste como .npz en la caché para que
+el backend y la minería de reglas la reutilicen
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from .basket_parser import basket_sizes
+from .basket_store import BasketStore
+from .config import CACHE_DIR, MINING_SHARDS
+from .product_dictionary import ProductDictionary
+from .product_frequency import dense_codes
+from .sharded_counting import sharded_cooccurrence
+from .transformed_store import QUANTITIES_COLUMN, basket_arrays, product_arrays
+
+COOCCURRENCE_VERSION = 2  # 2: n_multiproducto cuenta las cantidades
+COOCCURRENCE_FILENAME = 'product_cooccurrence.npz'
+
+CooccurrenceSource = Union[pd.DataFrame, Iterable[pd.DataFrame], BasketStore]
+
+
+def _basket_blocks(data: CooccurrenceSource) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Offsets, productos e items por canasta (contando cantidades) de cada bloque de la fuente"""
+    if isinstance(data, BasketStore):
+        yield data.offsets, data.productos, data.num_productos
+        return
+    for frame in ([data] if isinstance(data, pd.DataFrame) else data):
+        offsets, productos = product_arrays(frame)
+        if QUANTITIES_COLUMN in frame.columns:
+            n_items = basket_sizes(offsets, basket_arrays(frame)[2])
+        else:
+            # productos_list trae los repetidos: el largo de cada lista es su número de items
+            n_items = np.diff(offsets)
+        yield offsets, productos, n_items
+
+
+def _basket_matrix(
+    data: CooccurrenceSource,
+    dictionary: Optional[ProductDictionary] = None
+) -> Tuple[sp.csr_matrix, np.ndarray, np.ndarray]:
+    """basket_matrix más los items de cada canasta contando cantidades"""
+    blocks = list(_basket_blocks(data))
+    if len(blocks) == 1:
+        offsets, productos, n_items = blocks[0]
+    else:
+        sizes = [np.diff(block_offsets) for block_offsets, _, _ in blocks]
+        offsets = np.zeros(sum(len(s) for s in sizes) + 1, dtype=np.int64)
+        if len(offsets) > 1:
+            np.cumsum(np.concatenate(sizes), out=offsets[1:])
+        productos = np.concatenate([block[1] for block in blocks]) if blocks else np.empty(0, dtype=np.int32)
+        n_items = np.concatenate([block[2] for block in blocks]) if blocks else np.empty(0, dtype=np.int64)
+
+    if dictionary is not None:
+        codes = dictionary.encode(productos)
+        product_ids = dictionary.product_ids
+    else:
+        product_ids, codes = dense_codes(productos)
+
+    matrix = sp.csr_matrix(
+        (np.ones(len(codes), dtype=np.int32), np.asarray(codes), np.asarray(offsets, dtype=np.int64)),
+        shape=(len(offsets) - 1, len(product_ids))
+    )
+    if not matrix.has_canonical_format:
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+    return matrix, np.asarray(product_ids, dtype=np.int64), np.asarray(n_items, dtype=np.int64)
+
+
+def basket_matrix(
+    data: CooccurrenceSource,
+    dictionary: Optional[ProductDictionary] = None
+) -> Tuple[sp.csr_matrix, np.ndarray]:
+    """
+    Matriz binaria canasta×producto en formato CSR
+
+    Los offsets de las canastas son directamente el indptr de la matriz; los
+    productos repetidos en una canasta (productos_list) cuentan una vez.
+
+    Args:
+        data: DataFrame transformado (canónico o con productos_list),
+            iterable de bloques transformados o BasketStore
+        dictionary: Diccionario de productos (None = columnas para los IDs
+            presentes, en orden creciente)
+
+    Returns:
+        Tupla (matriz int32 de n_canastas × n_productos, IDs de producto de
+        cada columna)
+    """
+    matrix, product_ids, _ = _basket_matrix(data, dictionary)
+    return matrix, product_ids
+
+
+class CooccurrenceMatrix:
+    """
+    Co-ocurrencia simétrica producto×producto
+
+    Atributos:
+        matrix: CSR int32; la celda (i, j) es el número de canastas con los
+            productos i y j, y la diagonal el número de canastas con i
+        product_ids: int64 con el ID de producto de cada fila/columna
+        n_transacciones: Canastas analizadas (incluidas las vacías)
+        n_con_productos: Canastas con al menos un producto
+        n_multiproducto: Canastas con 2+ items contando las cantidades
+            (num_productos >= 2; base de porcentaje y soporte)
+    """
+
+    def __init__(
+        self,
+        matrix: sp.csr_matrix,
+        product_ids: np.ndarray,
+        n_transacciones: int,
+        n_con_productos: int,
+        n_multiproducto: int
+    ):
+        self.matrix = matrix
+        self.product_ids = np.asarray(product_ids, dtype=np.int64)
+        self.n_transacciones = int(n_transacciones)
+        self.n_con_productos = int(n_con_productos)
+        self.n_multiproducto = int(n_multiproducto)
+        self._index = pd.Index(self.product_ids)
+
+    def __repr__(self) -> str:
+        return f"CooccurrenceMatrix(productos={len(self.product_ids):,}, pares={self.n_pairs:,})"
+
+    @property
+    def item_counts(self) -> np.ndarray:
+        """Canastas que contienen cada producto (la diagonal)"""
+        return self.matrix.diagonal()
+
+    @property
+    def n_pairs(self) -> int:
+        """Pares distintos de productos que aparecen juntos al menos una vez"""
+        return int((self.matrix.nnz - np.count_nonzero(self.item_counts)) // 2)
+
+    def _upper(self, min_count: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Filas, columnas y conteos del triángulo superior sin la diagonal"""
+        matrix = self.matrix
+        rows = np.repeat(np.arange(matrix.shape[0], dtype=np.int64), np.diff(matrix.indptr))
+        mask = (matrix.indices > rows) & (matrix.data >= min_count)
+        return rows[mask], matrix.indices[mask], matrix.data[mask]
+
+    def _pairs_frame(self, rows: np.ndarray, cols: np.ndarray, counts: np.ndarray) -> pd.DataFrame:
+        """Tabla de pares ordenada por frecuencia descendente y por IDs"""
+        # IDs como texto y cada par en orden lexicográfico, como los producía
+        # la versión original a partir de productos_list
+        producto_1 = self.product_ids[rows].astype(str)
+        producto_2 = self.product_ids[cols].astype(str)
+        swap = producto_1 > producto_2
+        producto_1, producto_2 = np.where(swap, producto_2, producto_1), np.where(swap, producto_1, producto_2)
+        order = np.lexsort((producto_2, producto_1, -counts.astype(np.int64)))
+        counts = counts[order].astype(np.int64)
+        return pd.DataFrame({
+            'producto_1': producto_1[order],
+            'producto_2': producto_2[order],
+            'frecuencia': counts,
+            'porcentaje': (counts / max(self.n_multiproducto, 1) * 100).round(2),
+        })
+
+    def pairs(self, min_count: int = 1) -> pd.DataFrame:
+        """
+        Tabla completa de pares
+
+        Args:
+            min_count: Canastas mínimas para incluir un par
+
+        Returns:
+            DataFrame con producto_1 < producto_2 (IDs como texto, en orden
+            lexicográfico), frecuencia y porcentaje (sobre las canastas con
+            2+ items)
+        """
+        return self._pairs_frame(*self._upper(min_count))
+
+    def top_pairs(self, k: int) -> pd.DataFrame:
+        """
+        Los k pares más frecuentes (mismas columnas que pairs)
+
+        Solo se ordenan los candidatos que alcanzan la k-ésima frecuencia.
+        """
+        rows, cols, counts = self._upper()
+        if k < len(counts):
+            kth = np.partition(counts, len(counts) - k)[len(counts) - k]
+            keep = counts >= kth
+            rows, cols, counts = rows[keep], cols[keep], counts[keep]
+        return self._pairs_frame(rows, cols, counts).head(k)
+
+    def neighbors(self, product_id: int, top_n: Optional[int] = None) -> pd.DataFrame:
+        """
+        Productos que se compran junto con product_id
+
+        Args:
+            product_id: ID del producto
+            top_n: Vecinos a devolver (None = todos)
+
+        Returns:
+            DataFrame con producto_id, frecuencia, soporte (sobre las
+            canastas con 2+ items, como el porcentaje de pairs), confianza
+            (P(vecino | producto)) y lift (sobre las canastas con productos,
+            la base de los conteos por producto), ordenado por frecuencia
+            descendente; vacío si el producto no aparece
+        """
+        code = self._index.get_indexer([product_id])[0]
+        columns = ['producto_id', 'frecuencia', 'soporte', 'confianza', 'lift']
+        if code < 0:
+            return pd.DataFrame(columns=columns)
+
+        start, end = self.matrix.indptr[code], self.matrix.indptr[code + 1]
+        cols = self.matrix.indices[start:end]
+        counts = self.matrix.data[start:end].astype(np.int64)
+        mask = cols != code
+        cols, counts = cols[mask], counts[mask]
+
+        order = np.lexsort((self.product_ids[cols], -counts))
+        if top_n is not None:
+            order = order[:top_n]
+        cols, counts = cols[order], counts[order]
+
+        item_counts = self.item_counts.astype(np.int64)
+        n = max(self.n_con_productos, 1)
+        return pd.DataFrame({
+            'producto_id': self.product_ids[cols],
+            'frecuencia': counts,
+            'soporte': (counts / max(self.n_multiproducto, 1)).round(4),
+            'confianza': (counts / item_counts[code]).round(4),
+            'lift': (counts * n / (item_counts[code] * item_counts[cols])).round(2),
+        }, columns=columns)
+
+    def save(self, cache_dir: Path = CACHE_DIR) -> Path:
+        """
+        Guardar la matriz como .npz en el directorio de caché
+
+        Las claves format/shape/data/indices/indptr son las de
+        scipy.sparse.save_npz, así que el archivo también se puede abrir con
+        scipy.sparse.load_npz (o solo con numpy, como hace el backend).
+
+        Args:
+            cache_dir: Directorio de caché
+
+        Returns:
+            Ruta del archivo escrito
+        """
+        path = Path(cache_dir) / COOCCURRENCE_FILENAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.npz.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                format=np.array(b'csr'),
+                shape=np.array(self.matrix.shape),
+                data=self.matrix.data,
+                indices=self.matrix.indices,
+                indptr=self.matrix.indptr,
+                product_ids=self.product_ids,
+                counts=np.array([self.n_transacciones, self.n_con_productos, self.n_multiproducto]),
+                version=np.array(COOCCURRENCE_VERSION),
+            )
+        os.replace(tmp_path, path)
+        return path
+
+
+def build_cooccurrence(
+    data: CooccurrenceSource,
+    dictionary: Optional[ProductDictionary] = None,
+    n_shards: Optional[int] = None,
+    n_workers: Optional[int] = None
+) -> CooccurrenceMatrix:
+    """
+    Calcular la co-ocurrencia de productos como Xᵀ·X sobre la matriz de canastas
+
+    Args:
+        data: DataFrame transformado (canónico o con productos_list),
+            iterable de bloques transformados o BasketStore
+        dictionary: Diccionario de productos (None = IDs presentes, ordenados)
+        n_shards: Shards de canastas cuyas matrices parciales se suman en un
+            pool de procesos (None = MINING_SHARDS, 1 = sin shards)
+        n_workers: Procesos para contar los shards (None = MINING_WORKERS)
+
+    Returns:
+        CooccurrenceMatrix
+    """
+    baskets, product_ids, n_items = _basket_matrix(data, dictionary)
+    if (MINING_SHARDS if n_shards is None else n_shards) > 1:
+        matrix = sharded_cooccurrence(baskets, n_shards=n_shards, n_workers=n_workers)
+    else:
+        matrix = (baskets.T.tocsr() @ baskets).tocsr()
+    matrix.sort_indices()
+    return CooccurrenceMatrix(
+        matrix,
+        product_ids,
+        n_transacciones=baskets.shape[0],
+        n_con_productos=int(np.count_nonzero(np.diff(baskets.indptr))),
+        n_multiproducto=int(np.count_nonzero(n_items >= 2)),
+    )
+
+
+def load_cooccurrence(cache_dir: Path = CACHE_DIR) -> CooccurrenceMatrix:
+    """
+    Leer la matriz de co-ocurrencia persistida
+
+    Args:
+        cache_dir: Directorio de caché
+
+    Returns:
+        CooccurrenceMatrix
+
+    Raises:
+        FileNotFoundError: si no existe la matriz
+        ValueError: si la versión del archivo no es la actual
+    """
+    path = Path(cache_dir) / COOCCURRENCE_FILENAME
+    if not path.exists():
+        raise FileNotFoundError(f"No existe la matriz de co-ocurrencia en {path}")
+
+    with np.load(path) as f:
+        if int(f['version']) != COOCCURRENCE_VERSION:
+            raise ValueError(f"Versión de co-ocurrencia no soportada: {int(f['version'])}")
+        matrix = sp.csr_matrix((f['data'], f['indices'], f['indptr']), shape=tuple(f['shape']))
+        n_transacciones, n_con_productos, n_multiproducto = f['counts'].tolist()
+        return CooccurrenceMatrix(matrix, f['product_ids'], n_transacciones, n_con_productos, n_multiproducto)
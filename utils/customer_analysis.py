@@ -5,15 +5,31 @@ Análisis de frecuencia, tiempo entre compras y segmentación
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
 
+from .basket_store import BasketStore, as_frame
 
-def analyze_customer_frequency(df: pd.DataFrame) -> pd.DataFrame:
+# Columnas que usan los análisis de clientes (las que se leen de un BasketStore
+# o del parquet transformado)
+CUSTOMER_COLUMNS = ['fecha', 'persona_id', 'num_productos', 'tiene_productos']
+
+
+def analyze_customer_frequency(
+    df: Union[pd.DataFrame, BasketStore, Path],
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
     """
     Analiza la frecuencia de compra por cliente
 
     Args:
-        df: DataFrame transformado con persona_id
+        df: DataFrame transformado con persona_id, BasketStore o ruta del
+            parquet transformado
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a incluir (None = todos)
 
     Returns:
         DataFrame con estadísticas de frecuencia por cliente
@@ -22,7 +38,7 @@ def analyze_customer_frequency(df: pd.DataFrame) -> pd.DataFrame:
     print("=" * 70)
 
     # Preparar datos temporales
-    df_temp = df.copy()
+    df_temp = as_frame(df, CUSTOMER_COLUMNS, fecha_desde, fecha_hasta, tipos).copy()
     df_temp['fecha'] = pd.to_datetime(df_temp['fecha'])
 
     # Agrupar por cliente
@@ -70,12 +86,21 @@ def analyze_customer_frequency(df: pd.DataFrame) -> pd.DataFrame:
     return frecuencia_clientes
 
 
-def analyze_time_between_purchases(df: pd.DataFrame) -> pd.DataFrame:
+def analyze_time_between_purchases(
+    df: Union[pd.DataFrame, BasketStore, Path],
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
     """
     Analiza el tiempo promedio entre compras por cliente
 
     Args:
-        df: DataFrame transformado con persona_id y fecha
+        df: DataFrame transformado con persona_id y fecha, BasketStore o
+            ruta del parquet transformado
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a incluir (None = todos)
 
     Returns:
         DataFrame con estadísticas de tiempo entre compras
@@ -84,7 +109,7 @@ def analyze_time_between_purchases(df: pd.DataFrame) -> pd.DataFrame:
     print("=" * 70)
 
     # Preparar datos
-    df_temp = df.copy()
+    df_temp = as_frame(df, CUSTOMER_COLUMNS, fecha_desde, fecha_hasta, tipos).copy()
     df_temp['fecha'] = pd.to_datetime(df_temp['fecha'])
 
     # Ordenar por cliente y fecha
@@ -140,7 +165,14 @@ def analyze_time_between_purchases(df: pd.DataFrame) -> pd.DataFrame:
     return tiempo_entre_compras
 
 
-def segment_customers(df: pd.DataFrame, frecuencia: pd.DataFrame, tiempo_compras: pd.DataFrame) -> pd.DataFrame:
+def segment_customers(
+    df: Union[pd.DataFrame, BasketStore, Path],
+    frecuencia: pd.DataFrame,
+    tiempo_compras: pd.DataFrame,
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
     """
     Segmenta clientes usando RFM simplificado y otros criterios
 
@@ -149,9 +181,13 @@ def segment_customers(df: pd.DataFrame, frecuencia: pd.DataFrame, tiempo_compras
     M = Monetary (valor monetario - en este caso, productos comprados)
 
     Args:
-        df: DataFrame transformado original
+        df: DataFrame transformado original, BasketStore o ruta del parquet
+            transformado
         frecuencia: DataFrame con frecuencia de compra por cliente
         tiempo_compras: DataFrame con tiempo entre compras
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a incluir (None = todos)
 
     Returns:
         DataFrame con segmentación de clientes
@@ -160,7 +196,7 @@ def segment_customers(df: pd.DataFrame, frecuencia: pd.DataFrame, tiempo_compras
     print("=" * 70)
 
     # Preparar datos
-    df_temp = df.copy()
+    df_temp = as_frame(df, CUSTOMER_COLUMNS, fecha_desde, fecha_hasta, tipos).copy()
     df_temp['fecha'] = pd.to_datetime(df_temp['fecha'])
 
     # Calcular recency (días desde última compra)
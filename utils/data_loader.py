@@ -3,10 +3,48 @@ Módulo para carga de datos
 Funciones para cargar y preparar datasets
 """
 
+import io
+import time
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
+from functools import partial
 from pathlib import Path
-from typing import Optional, List
-from .config import SEPARATOR, ENCODING
+from typing import Iterator, Optional, List, Sequence, Tuple, Union
+from .config import (
+    SEPARATOR,
+    ENCODING,
+    LOAD_WORKERS,
+    LOAD_EXECUTOR,
+    LOAD_ENGINE,
+    SLOWEST_FILES_TO_REPORT,
+    TRANSACTION_FILE_PATTERNS,
+    CATEGORIES_SCHEMA,
+    PRODUCT_CATEGORY_SCHEMA,
+    TRANSACTION_DATE_DTYPE,
+    TRANSACTION_GROUP_DTYPES,
+)
+
+LOAD_ENGINES = ('pandas', 'pyarrow')
+
+
+def apply_schema(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    """
+    Convertir las columnas presentes de un DataFrame a los dtypes del registro
+    
+    Args:
+        df: DataFrame a convertir
+        schema: Diccionario {columna: dtype} (ver SCHEMAS en config)
+        
+    Returns:
+        DataFrame con los dtypes compactos (las columnas ausentes se ignoran)
+    """
+    dtypes = {col: dtype for col, dtype in schema.items() if col in df.columns}
+    for col, dtype in dtypes.items():
+        if dtype.startswith('datetime64') and df[col].dtype != dtype:
+            df[col] = pd.to_datetime(df[col])
+    return df.astype(dtypes, copy=False)
 
 
 def load_categories(file_path: Path) -> pd.DataFrame:
@@ -24,7 +62,8 @@ def load_categories(file_path: Path) -> pd.DataFrame:
     df = pd.read_csv(
         file_path, 
         sep=SEPARATOR, 
-        names=['CategoryID', 'CategoryName'],
+        names=list(CATEGORIES_SCHEMA),
+        dtype=CATEGORIES_SCHEMA,
         encoding=ENCODING
     )
     
@@ -47,7 +86,7 @@ def load_product_category(file_path: Path) -> pd.DataFrame:
     """
     print("CARGANDO PRODUCTO-CATEGORÍA")
     
-    df = pd.read_csv(file_path, sep=SEPARATOR)
+    df = pd.read_csv(file_path, sep=SEPARATOR, dtype=PRODUCT_CATEGORY_SCHEMA, encoding=ENCODING)
     
     print(f"Productos cargados: {len(df)} registros")
     print(f"\nColumnas: {list(df.columns)}")
@@ -57,10 +96,338 @@ def load_product_category(file_path: Path) -> pd.DataFrame:
     return df
 
 
+def list_transaction_files(
+    transactions_dir: Path,
+    file_pattern: Union[str, Sequence[str], None] = None,
+    sample_size: Optional[int] = None
+) -> List[Path]:
+    """
+    Listar archivos de transacciones, planos o comprimidos, en orden de nombre
+    
+    Args:
+        transactions_dir: Directorio con archivos de transacciones
+        file_pattern: Patrón o lista de patrones (None = TRANSACTION_FILE_PATTERNS)
+        sample_size: Número de archivos a devolver (None = todos)
+        
+    Returns:
+        Lista ordenada de rutas
+    """
+    if file_pattern is None:
+        file_pattern = TRANSACTION_FILE_PATTERNS
+    patterns = [file_pattern] if isinstance(file_pattern, str) else list(file_pattern)
+    
+    files = set()
+    for pattern in patterns:
+        files.update(Path(transactions_dir).glob(pattern))
+    transaction_files = sorted(files)
+    
+    if sample_size:
+        transaction_files = transaction_files[:sample_size]
+    return transaction_files
+
+
+def _dedupe_column_names(names: List[str]) -> List[str]:
+    """Renombrar columnas repetidas igual que pandas ('x', 'x.1', 'x.2', ...)"""
+    seen = {}
+    result = []
+    for name in names:
+        if name in seen:
+            seen[name] += 1
+            result.append(f"{name}.{seen[name]}")
+        else:
+            seen[name] = 0
+            result.append(name)
+    return result
+
+
+def transaction_dtypes(column_names: List[str]) -> dict:
+    """
+    Dtypes de pandas de un archivo de transacciones según TRANSACTION_GROUP_DTYPES
+    
+    El tipo de cada columna se decide por su posición, no por su nombre,
+    porque la cabecera de cada archivo es su primera fila. La fecha (primera
+    columna) no se incluye: se parsea aparte como TRANSACTION_DATE_DTYPE.
+    
+    Args:
+        column_names: Nombres de columna del archivo
+        
+    Returns:
+        Diccionario {columna: dtype}
+    """
+    return {
+        name: TRANSACTION_GROUP_DTYPES[(i - 1) % 3]
+        for i, name in enumerate(column_names) if i > 0
+    }
+
+
+def _transaction_arrow_types(column_names: List[str]) -> dict:
+    """
+    Esquema de pyarrow equivalente a transaction_dtypes
+    
+    Args:
+        column_names: Nombres de columna del archivo
+        
+    Returns:
+        Diccionario {columna: tipo de pyarrow}
+    """
+    import pyarrow as pa
+    
+    arrow_types = {'Int16': pa.int16(), 'Int32': pa.int32(), 'object': pa.string()}
+    column_types = {column_names[0]: pa.from_numpy_dtype(np.dtype(TRANSACTION_DATE_DTYPE))}
+    for name, dtype in transaction_dtypes(column_names).items():
+        column_types[name] = arrow_types[dtype]
+    return column_types
+
+
+def _arrow_types_mapper(arrow_type):
+    """Convertir enteros de Arrow a los enteros nulables de TRANSACTION_GROUP_DTYPES"""
+    import pyarrow as pa
+    
+    return {pa.int16(): pd.Int16Dtype(), pa.int32(): pd.Int32Dtype()}.get(arrow_type)
+
+
+def _read_header(file: Path) -> List[str]:
+    """
+    Leer los nombres de columna (primera línea) de un archivo de transacciones
+    
+    Args:
+        file: Ruta al archivo, plano o comprimido
+        
+    Returns:
+        Nombres de columna, con repetidos renombrados como en pandas
+    """
+    import pyarrow as pa
+    
+    # input_stream descomprime al vuelo según la extensión (.gz, .bz2, .zst)
+    with io.TextIOWrapper(pa.input_stream(str(file), compression='detect'), encoding=ENCODING) as f:
+        header = f.readline().rstrip('\r\n')
+    return _dedupe_column_names(header.split(SEPARATOR))
+
+
+def _read_csv_pandas(file: Path, **kwargs):
+    """
+    Leer un archivo de transacciones con pandas aplicando el registro de esquemas
+    
+    Args:
+        file: Ruta al archivo de transacciones
+        **kwargs: Argumentos adicionales para pd.read_csv (p. ej. chunksize)
+        
+    Returns:
+        DataFrame (o lector por bloques si se pasa chunksize)
+    """
+    column_names = _read_header(file)
+    return pd.read_csv(
+        file,
+        sep=SEPARATOR,
+        encoding=ENCODING,
+        dtype=transaction_dtypes(column_names),
+        parse_dates=[column_names[0]],
+        **kwargs
+    )
+
+
+def _read_csv_text(file: Path) -> pd.DataFrame:
+    """
+    Leer un archivo de transacciones con todas las columnas como texto
+    
+    Se usa cuando el esquema declarado no se puede aplicar (fechas o IDs
+    mal formados): la transformación valida cada grupo y manda los
+    inválidos a cuarentena en lugar de perder el archivo completo.
+    
+    Args:
+        file: Ruta al archivo de transacciones
+        
+    Returns:
+        DataFrame con columnas object
+    """
+    return pd.read_csv(file, sep=SEPARATOR, encoding=ENCODING, dtype=str)
+
+
+def _iter_csv_text(file: Path, batch_rows: int, skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Leer un archivo como texto en bloques de filas (ver _read_csv_text)
+    
+    Args:
+        file: Ruta al archivo de transacciones
+        batch_rows: Máximo de filas por bloque
+        skip_rows: Filas de datos ya entregadas que se saltan (la cabecera se conserva)
+        
+    Returns:
+        Iterador de DataFrames con columnas object
+    """
+    with pd.read_csv(
+        file, sep=SEPARATOR, encoding=ENCODING, dtype=str,
+        skiprows=range(1, skip_rows + 1), chunksize=batch_rows
+    ) as reader:
+        yield from reader
+
+
+def _pyarrow_csv_options(file: Path) -> Tuple:
+    """
+    Opciones del lector CSV de pyarrow para un archivo de transacciones
+    
+    Args:
+        file: Ruta al archivo de transacciones
+        
+    Returns:
+        Tupla (ReadOptions, ParseOptions, ConvertOptions)
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    
+    column_names = _read_header(file)
+    
+    read_options = pa_csv.ReadOptions(
+        use_threads=True,
+        column_names=column_names,
+        skip_rows=1,
+        encoding=ENCODING
+    )
+    parse_options = pa_csv.ParseOptions(delimiter=SEPARATOR)
+    convert_options = pa_csv.ConvertOptions(
+        column_types=_transaction_arrow_types(column_names),
+        timestamp_parsers=[pa_csv.ISO8601, '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y'],
+        strings_can_be_null=True
+    )
+    return read_options, parse_options, convert_options
+
+
+def _read_csv_pyarrow(file: Path) -> pd.DataFrame:
+    """
+    Leer un archivo de transacciones con el lector CSV multihilo de pyarrow
+    
+    Usa un esquema declarado (fecha, tipo int16, id int32, productos texto) en
+    lugar de inferir tipos, y convierte a pandas sin copias intermedias
+    cuando el tipo lo permite.
+    
+    Args:
+        file: Ruta al archivo de transacciones
+        
+    Returns:
+        DataFrame con la misma forma que pd.read_csv(file, sep=SEPARATOR)
+    """
+    import pyarrow.csv as pa_csv
+    
+    read_options, parse_options, convert_options = _pyarrow_csv_options(file)
+    table = pa_csv.read_csv(
+        str(file),
+        read_options=read_options,
+        parse_options=parse_options,
+        convert_options=convert_options
+    )
+    # split_blocks + self_destruct liberan cada columna de Arrow al convertirla
+    return table.to_pandas(split_blocks=True, self_destruct=True, types_mapper=_arrow_types_mapper)
+
+
+def _iter_csv_pyarrow(file: Path, batch_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Leer un archivo con el lector incremental de pyarrow en bloques de filas
+    
+    Args:
+        file: Ruta al archivo de transacciones
+        batch_rows: Máximo de filas por bloque
+        
+    Returns:
+        Iterador de DataFrames de como mucho batch_rows filas
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    
+    read_options, parse_options, convert_options = _pyarrow_csv_options(file)
+    reader = pa_csv.open_csv(
+        str(file),
+        read_options=read_options,
+        parse_options=parse_options,
+        convert_options=convert_options
+    )
+    
+    pending = []
+    pending_rows = 0
+    for record_batch in reader:
+        pending.append(record_batch)
+        pending_rows += record_batch.num_rows
+        while pending_rows >= batch_rows:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, batch_rows).to_pandas(split_blocks=True, types_mapper=_arrow_types_mapper)
+            rest = table.slice(batch_rows)
+            pending = rest.to_batches()
+            pending_rows = rest.num_rows
+    
+    if pending_rows > 0:
+        yield pa.Table.from_batches(pending).to_pandas(split_blocks=True, types_mapper=_arrow_types_mapper)
+
+
+def _read_transaction_file(
+    file: Path, 
+    engine: str = 'pandas'
+) -> Tuple[Optional[pd.DataFrame], Optional[str], float]:
+    """
+    Leer un archivo de transacciones midiendo el tiempo de lectura
+    
+    Se define a nivel de módulo para poder enviarse a un pool de procesos.
+    
+    Args:
+        file: Ruta al archivo de transacciones
+        engine: 'pandas' (parser C con inferencia) o 'pyarrow' (esquema explícito)
+        
+    Returns:
+        Tupla (DataFrame o None, mensaje de error o None, segundos empleados)
+    """
+    start = time.perf_counter()
+    try:
+        try:
+            if engine == 'pyarrow':
+                df = _read_csv_pyarrow(file)
+            else:
+                df = _read_csv_pandas(file)
+        except ValueError:
+            # Valores que no cumplen el esquema: se leen como texto y la
+            # transformación los deja en cuarentena
+            df = _read_csv_text(file)
+        error = None
+    except Exception as e:
+        df = None
+        error = str(e)
+    return df, error, time.perf_counter() - start
+
+
+def _iter_read_results(
+    files: List[Path], 
+    n_workers: int, 
+    executor: str,
+    engine: str = 'pandas'
+) -> Iterator[Tuple[Optional[pd.DataFrame], Optional[str], float]]:
+    """
+    Leer archivos en secuencia o con un pool, conservando el orden de entrada
+    
+    Args:
+        files: Archivos a leer (ya ordenados)
+        n_workers: Número de workers (1 = secuencial)
+        executor: 'thread' o 'process'
+        engine: Motor de lectura ('pandas' o 'pyarrow')
+        
+    Returns:
+        Iterador con el resultado de _read_transaction_file por archivo
+    """
+    read_file = partial(_read_transaction_file, engine=engine)
+    
+    if n_workers <= 1 or len(files) <= 1:
+        yield from map(read_file, files)
+        return
+    
+    pool_cls = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool_cls(max_workers=n_workers) as pool:
+        # Executor.map devuelve los resultados en el orden de los archivos
+        yield from pool.map(read_file, files)
+
+
 def load_transactions(
     transactions_dir: Path, 
     sample_size: Optional[int] = None,
-    file_pattern: str = '*.csv'
+    file_pattern: Union[str, Sequence[str], None] = None,
+    n_workers: Optional[int] = None,
+    executor: Optional[str] = None,
+    engine: Optional[str] = None
 ) -> pd.DataFrame:
     """
     Cargar todos los archivos de transacciones
@@ -68,31 +435,48 @@ def load_transactions(
     Args:
         transactions_dir: Directorio con archivos de transacciones
         sample_size: Número de archivos a cargar (None = todos)
-        file_pattern: Patrón de archivos a buscar
+        file_pattern: Patrón o patrones de archivos (None = CSV planos y .gz/.zst/.bz2)
+        n_workers: Archivos leídos en paralelo (None = LOAD_WORKERS, 1 = secuencial)
+        executor: Tipo de pool, 'thread' o 'process' (None = LOAD_EXECUTOR)
+        engine: Motor de lectura, 'pandas' o 'pyarrow' (None = LOAD_ENGINE)
         
     Returns:
-        DataFrame con todas las transacciones
+        DataFrame con todas las transacciones. Los tiempos de lectura por
+        archivo quedan en ``df.attrs['file_timings']``
     """
     print("CARGANDO TRANSACCIONES")
     
-    transaction_files = sorted(Path(transactions_dir).glob(file_pattern))
+    if n_workers is None:
+        n_workers = LOAD_WORKERS
+    if executor is None:
+        executor = LOAD_EXECUTOR
+    if engine is None:
+        engine = LOAD_ENGINE
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"Executor '{executor}' no válido. Opciones: ['thread', 'process']")
+    if engine not in LOAD_ENGINES:
+        raise ValueError(f"Engine '{engine}' no válido. Opciones: {list(LOAD_ENGINES)}")
     
-    if sample_size:
-        transaction_files = transaction_files[:sample_size]
+    transaction_files = list_transaction_files(transactions_dir, file_pattern, sample_size)
     
     print(f"Archivos encontrados: {len(transaction_files)}")
+    print(f"Motor de lectura: {engine}")
+    if n_workers > 1:
+        print(f"Lectura paralela: {n_workers} workers ({executor})")
     
     dfs = []
     errors = []
+    timings = {}
     
-    for i, file in enumerate(transaction_files, 1):
-        try:
-            df = pd.read_csv(file, sep=SEPARATOR)
+    results = _iter_read_results(transaction_files, n_workers, executor, engine)
+    for i, (file, (df, error, elapsed)) in enumerate(zip(transaction_files, results), 1):
+        timings[file.name] = round(elapsed, 4)
+        if error is None:
             dfs.append(df)
             if i % 50 == 0:
                 print(f"  Procesados: {i}/{len(transaction_files)}")
-        except Exception as e:
-            error_msg = f"Error en {file.name}: {e}"
+        else:
+            error_msg = f"Error en {file.name}: {error}"
             errors.append(error_msg)
             print(f"  {error_msg}")
     
@@ -100,6 +484,7 @@ def load_transactions(
         raise ValueError("No se pudieron cargar transacciones")
     
     result = pd.concat(dfs, ignore_index=True)
+    result.attrs['file_timings'] = timings
     
     print(f"\nTotal transacciones cargadas: {len(result):,}")
     print(f"Columnas: {list(result.columns)}")
@@ -107,9 +492,69 @@ def load_transactions(
     if errors:
         print(f"\nArchivos con errores: {len(errors)}")
     
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)
+    print(f"\nTiempo acumulado de lectura: {sum(timings.values()):.2f}s")
+    print(f"Archivos más lentos:")
+    for name, seconds in slowest[:SLOWEST_FILES_TO_REPORT]:
+        print(f"  • {name}: {seconds:.2f}s")
+    
     return result
 
 
+def iter_transaction_batches(
+    transactions_dir: Path,
+    batch_rows: int = 100_000,
+    sample_size: Optional[int] = None,
+    file_pattern: Union[str, Sequence[str], None] = None,
+    engine: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Leer las transacciones como un flujo de bloques de tamaño acotado
+    
+    A diferencia de load_transactions, nunca materializa el histórico
+    completo: la memoria usada depende de batch_rows y no del número de
+    archivos. Un bloque nunca mezcla filas de archivos distintos.
+    
+    Args:
+        transactions_dir: Directorio con archivos de transacciones
+        batch_rows: Máximo de filas por bloque
+        sample_size: Número de archivos a leer (None = todos)
+        file_pattern: Patrón o patrones de archivos (None = CSV planos y .gz/.zst/.bz2)
+        engine: Motor de lectura, 'pandas' o 'pyarrow' (None = LOAD_ENGINE)
+        
+    Returns:
+        Iterador de DataFrames con el mismo formato que load_transactions
+    """
+    if engine is None:
+        engine = LOAD_ENGINE
+    if engine not in LOAD_ENGINES:
+        raise ValueError(f"Engine '{engine}' no válido. Opciones: {list(LOAD_ENGINES)}")
+    if batch_rows <= 0:
+        raise ValueError("batch_rows debe ser mayor que 0")
+    
+    transaction_files = list_transaction_files(transactions_dir, file_pattern, sample_size)
+    
+    for file in transaction_files:
+        # Filas ya entregadas del archivo, por si hay que releerlo como texto
+        yielded = 0
+        try:
+            try:
+                if engine == 'pyarrow':
+                    batches = _iter_csv_pyarrow(file, batch_rows)
+                else:
+                    batches = _read_csv_pandas(file, chunksize=batch_rows)
+                with closing(batches):
+                    for batch in batches:
+                        yielded += len(batch)
+                        yield batch
+            except ValueError:
+                # Igual que _read_transaction_file: el resto del archivo se lee
+                # como texto y la transformación deja los inválidos en cuarentena
+                yield from _iter_csv_text(file, batch_rows, skip_rows=yielded)
+        except Exception as e:
+            print(f"  Error en {file.name}: {e}")
+
+
 def load_all_data(
     categories_path: Path,
     product_category_path: Path,
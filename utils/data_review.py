@@ -79,7 +79,9 @@ def get_data_summary(df: pd.DataFrame) -> dict:
         'n_nulls': df.isnull().sum().sum(),
         'pct_nulls': (df.isnull().sum().sum() / (len(df) * len(df.columns)) * 100),
         'columns': list(df.columns),
-        'dtypes': df.dtypes.to_dict()
+        # Nombre del tipo ('category', 'int16'...): el repr de un
+        # CategoricalDtype incluye todas sus categorías
+        'dtypes': {col: dtype.name for col, dtype in df.dtypes.items()}
     }
 
 
@@ -3,29 +3,71 @@ Módulo para transformar datos de transacciones al formato correcto
 Extrae métricas reales desde las columnas de productos
 """
 
+import hashlib
+import json
+import os
+import shutil
 import pandas as pd
 import numpy as np
-from typing import List
-
-
-def extract_transaction_features(df: pd.DataFrame) -> pd.DataFrame:
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .config import CACHE_DIR, TRANSFORMED_SCHEMA, TRANSFORM_WORKERS, TRANSFORM_ROWS_PER_SHARD
+from .data_loader import apply_schema
+from .ingestion_cache import load_manifest
+from .basket_store import BasketStore, baskets_to_frame
+from .basket_parser import parse_transaction_file
+from .product_frequency import product_frequency, report_pareto
+from .transaction_validation import QUARANTINE_REASONS, group_reasons, quarantine_counts, report_quarantine
+from .transformed_store import (
+    month_bounds,
+    read_transformed,
+    transformed_partitions,
+    write_transformed,
+    write_transformed_partitions,
+)
+
+
+# Manifiesto de particiones transformadas; los lectores de parquet ignoran
+# los archivos que empiezan por '_'
+PARTITIONS_MANIFEST_FILENAME = '_manifest.json'
+# Subir al cambiar la transformación o el esquema canónico
+# (2: particiones hive, 3: canastas canónicas con cantidades, 4: cuarentena,
+# 5: productos fuera de rango, 6: un archivo compactado por partición)
+PARTITIONS_VERSION = 6
+# Transformación de cada archivo fuente, de la que se compactan las
+# particiones (oculta al dataset por empezar por '_'), y nombre del único
+# archivo de cada partición
+STAGING_DIRNAME = '_fuentes'
+PARTITION_BASENAME = 'part'
+
+# Los rechazados de cada archivo fuente (ver QUARANTINE_REASONS) se guardan
+# en QUARANTINE_DIRNAME, que el dataset transformado ignora por empezar por '_'
+QUARANTINE_DIRNAME = '_cuarentena'
+
+TRANSFORMED_COLUMNS = [
+    "fecha",
+    "tipo_transaccion",
+    "persona_id",
+    "productos_str",
+    "productos_list",
+    "num_productos",
+    "tiene_productos",
+]
+
+
+def _transform_wide_frame_iterrows(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Extrae características reales de las transacciones
+    Convierte un DataFrame ancho [fecha|tipo|id|productos|...] al formato largo
+    recorriendo fila a fila (implementación de referencia para validate_transform)
 
     Args:
-        df: DataFrame con estructura:
-           [fecha|tipo1|id1|productos1|tipo2|id2|productos2|...]
+        df: DataFrame (o bloque) con la estructura cruda de transacciones
 
     Returns:
-        DataFrame transformado con métricas calculadas
+        DataFrame con una fila por transacción
     """
-    print("TRANSFORMANDO DATOS DE TRANSACCIONES")
-    print("=" * 70)
-
-    # Identificar estructura
-    print(f"\nColumnas originales: {len(df.columns)}")
-    print(f"Primeras columnas: {list(df.columns[:5])}")
-
     # Las columnas impares (después de fecha) son IDs
     # Las columnas pares son listas de productos
 
@@ -69,7 +111,635 @@ def extract_transaction_features(df: pd.DataFrame) -> pd.DataFrame:
                 }
             )
 
-    df_transformed = pd.DataFrame(transactions)
+    return apply_schema(pd.DataFrame(transactions), TRANSFORMED_SCHEMA)
+
+
+def _numeric_block(block: pd.DataFrame) -> np.ndarray:
+    """Matriz float64 de un bloque de columnas; los valores no numéricos pasan a NaN"""
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in block.dtypes):
+        return block.to_numpy(dtype="float64", na_value=np.nan)
+    return block.apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _wide_groups(df: pd.DataFrame, catalog: Optional[np.ndarray] = None) -> Dict[str, object]:
+    """
+    Aplanar y validar los grupos tipo|id|productos de un DataFrame ancho
+
+    Los grupos se toman como cortes de columnas con paso 3 y se aplanan en
+    orden de fila (fila 0 grupo 0, 1, ...). Cada grupo presente recibe el
+    primer motivo de QUARANTINE_REASONS que incumple; los grupos
+    completamente vacíos son relleno de filas más cortas y no se validan.
+
+    Args:
+        df: DataFrame (o bloque) con la estructura cruda de transacciones
+        catalog: IDs de producto conocidos; None = no se comprueba el catálogo
+
+    Returns:
+        Diccionario con n_groups, los bloques crudos tipo_block e id_block,
+        los arreglos aplanados fechas, tipos, ids y productos_str, la máscara
+        present y reason (índice en QUARANTINE_REASONS, -1 = válido)
+    """
+    import pyarrow as pa
+
+    # Número de grupos completos tipo|id|productos después de la fecha
+    n_groups = max((len(df.columns) - 1) // 3, 0)
+    end = 1 + 3 * n_groups
+
+    # Matrices (filas x grupos) aplanadas en orden de fila: fila 0 grupo 0, 1, ...
+    tipo_block = df.iloc[:, 1:end:3]
+    id_block = df.iloc[:, 2:end:3]
+    tipos = _numeric_block(tipo_block).ravel()
+    ids = _numeric_block(id_block).ravel()
+    productos_str = df.iloc[:, 3:end:3].to_numpy(dtype=object).ravel()
+
+    fecha_col = df.iloc[:, 0]
+    if not pd.api.types.is_datetime64_any_dtype(fecha_col):
+        fecha_col = pd.to_datetime(fecha_col, errors="coerce")
+    fechas = np.repeat(fecha_col.to_numpy(), n_groups)
+
+    tipo_present = tipo_block.notna().to_numpy().ravel()
+    id_present = id_block.notna().to_numpy().ravel()
+    has_products = pd.notna(productos_str)
+    present = tipo_present | id_present | has_products
+
+    # Motivo de rechazo por grupo (-1 = válido); gana el primero que falla
+    productos_arrow = pa.array(productos_str, type=pa.string(), from_pandas=True)
+    reason = group_reasons(~pd.isna(fechas), tipo_present, id_present, tipos, ids, productos_arrow, catalog)
+
+    return {
+        "n_groups": n_groups,
+        "tipo_block": tipo_block,
+        "id_block": id_block,
+        "fechas": fechas,
+        "tipos": tipos,
+        "ids": ids,
+        "productos_str": productos_str,
+        "present": present,
+        "reason": reason,
+    }
+
+
+def _transform_wide_frame(
+    df: pd.DataFrame,
+    catalog: Optional[np.ndarray] = None,
+    return_quarantine: bool = False
+) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Convierte un DataFrame ancho [fecha|tipo|id|productos|...] al formato largo
+
+    Aplana y valida los grupos tipo|id|productos con operaciones de arreglos
+    (ver _wide_groups); los productos se separan en bloque con el accesor
+    .str. Sobre datos válidos produce el mismo resultado que
+    _transform_wide_frame_iterrows.
+
+    Los grupos que fallan la validación van a cuarentena con su motivo (los
+    grupos completamente vacíos se descartan sin más). Las transacciones
+    resultantes tienen fecha válida, tipo y persona enteros y productos
+    numéricos dentro del rango de int32 (y del catálogo si se indica).
+
+    Args:
+        df: DataFrame (o bloque) con la estructura cruda de transacciones
+        catalog: IDs de producto conocidos (ProductCategory.csv); None = no
+            se comprueba el catálogo
+        return_quarantine: Si True devuelve también los grupos rechazados
+
+    Returns:
+        DataFrame con una fila por transacción, o tupla (transacciones,
+        cuarentena) si return_quarantine=True
+    """
+    groups = _wide_groups(df, catalog)
+    n_groups, fechas, reason = groups["n_groups"], groups["fechas"], groups["reason"]
+    productos_str, present = groups["productos_str"], groups["present"]
+    tipos, ids = groups["tipos"], groups["ids"]
+    tipo_block, id_block = groups["tipo_block"], groups["id_block"]
+
+    valid = present & (reason < 0)
+    productos_valid = productos_str[valid]
+
+    # Separar productos en bloque; los grupos sin productos quedan con lista vacía
+    has_valid_products = pd.notna(productos_valid)
+    split = pd.Series(productos_valid[has_valid_products], dtype=object).str.split()
+    productos_list = np.empty(len(productos_valid), dtype=object)
+    productos_list[has_valid_products] = split.to_numpy()
+    for i in np.flatnonzero(~has_valid_products):
+        productos_list[i] = []
+
+    num_productos = np.zeros(len(productos_valid), dtype=np.int64)
+    num_productos[has_valid_products] = split.str.len().to_numpy()
+
+    result = pd.DataFrame({
+        "fecha": fechas[valid],
+        "tipo_transaccion": tipos[valid].astype(np.int64),
+        "persona_id": ids[valid].astype(np.int64),
+        "productos_str": productos_valid,
+        "productos_list": productos_list,
+        "num_productos": num_productos,
+        "tiene_productos": num_productos > 0,
+    }, columns=TRANSFORMED_COLUMNS)
+    result = apply_schema(result, TRANSFORMED_SCHEMA)
+
+    if not return_quarantine:
+        return result
+
+    # Valores crudos como texto para poder inspeccionarlos tal cual llegaron
+    rejected = present & (reason >= 0)
+    raw_fechas = np.repeat(df.iloc[:, 0].to_numpy(dtype=object), n_groups)
+    quarantine = pd.DataFrame({
+        "fecha": raw_fechas[rejected],
+        "tipo_transaccion": tipo_block.to_numpy(dtype=object).ravel()[rejected],
+        "persona_id": id_block.to_numpy(dtype=object).ravel()[rejected],
+        "productos": productos_str[rejected],
+    }).astype("string")
+    quarantine["motivo"] = pd.Categorical.from_codes(reason[rejected], categories=list(QUARANTINE_REASONS))
+    return result, quarantine
+
+
+def _transform_shard(
+    shard: Union[str, pd.DataFrame],
+    catalog: Optional[np.ndarray] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Transformar un shard crudo (ruta parquet o bloque de filas)
+
+    Se define a nivel de módulo para poder enviarse a un pool de procesos;
+    con rutas, cada worker lee su shard de disco en lugar de recibirlo
+    serializado.
+
+    Returns:
+        Tupla (transacciones, cuarentena)
+    """
+    if not isinstance(shard, pd.DataFrame):
+        shard = pd.read_parquet(shard)
+    return _transform_wide_frame(shard, catalog=catalog, return_quarantine=True)
+
+
+def transform_transactions_sharded(
+    data: Union[pd.DataFrame, Sequence[Path]],
+    n_workers: Optional[int] = None,
+    rows_per_shard: Optional[int] = None,
+    catalog: Optional[np.ndarray] = None,
+    quarantine_path: Optional[Path] = None
+) -> pd.DataFrame:
+    """
+    Transformar las transacciones por shards en un pool de procesos
+
+    Args:
+        data: Lista de shards parquet crudos (p. ej. list_shard_paths, uno por
+            archivo fuente) o DataFrame crudo, que se parte en rangos de filas
+        n_workers: Procesos en paralelo (None = TRANSFORM_WORKERS, 1 = secuencial)
+        rows_per_shard: Filas por shard si data es un DataFrame
+            (None = TRANSFORM_ROWS_PER_SHARD)
+        catalog: IDs de producto conocidos (None = no se comprueba el catálogo)
+        quarantine_path: Parquet donde guardar los registros rechazados
+            (None = solo se informan los conteos)
+
+    Returns:
+        DataFrame transformado, en el mismo orden que los shards de entrada
+    """
+    n_workers = TRANSFORM_WORKERS if n_workers is None else n_workers
+    rows_per_shard = TRANSFORM_ROWS_PER_SHARD if rows_per_shard is None else rows_per_shard
+
+    print("TRANSFORMANDO DATOS DE TRANSACCIONES (POR SHARDS)")
+    print("=" * 70)
+
+    if isinstance(data, pd.DataFrame):
+        # Cada worker recibe solo su rango de filas, no el DataFrame completo
+        shards = [data.iloc[start:start + rows_per_shard] for start in range(0, len(data), rows_per_shard)]
+    else:
+        shards = [str(path) for path in data]
+
+    print(f"\nShards: {len(shards)}")
+
+    if n_workers <= 1 or len(shards) <= 1:
+        results = [_transform_shard(shard, catalog) for shard in shards]
+    else:
+        print(f"Transformación paralela: {n_workers} procesos")
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            # Executor.map conserva el orden de los shards
+            results = list(pool.map(_transform_shard, shards, [catalog] * len(shards)))
+
+    if not results:
+        return apply_schema(pd.DataFrame(columns=TRANSFORMED_COLUMNS), TRANSFORMED_SCHEMA)
+
+    df_transformed = pd.concat([transformed for transformed, _ in results], ignore_index=True)
+    quarantine = pd.concat([rejected for _, rejected in results], ignore_index=True)
+    report_quarantine(quarantine_counts(quarantine))
+    if quarantine_path is not None:
+        write_quarantine(quarantine, quarantine_path)
+
+    print(f"\n✓ Transacciones procesadas: {len(df_transformed):,}")
+    return df_transformed
+
+
+def write_quarantine(quarantine: pd.DataFrame, path: Path) -> Path:
+    """
+    Guardar los registros en cuarentena como parquet (escritura atómica)
+
+    Args:
+        quarantine: Grupos rechazados (ver _transform_wide_frame)
+        path: Ruta del parquet
+
+    Returns:
+        Ruta escrita
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name('.' + path.name + '.tmp')
+    quarantine.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def catalog_fingerprint(catalog: Optional[np.ndarray]) -> Optional[str]:
+    """Hash de un catálogo de productos (None si no hay catálogo)"""
+    if catalog is None:
+        return None
+    ids = np.unique(np.asarray(catalog, dtype=np.int64))
+    return hashlib.sha256(ids.tobytes()).hexdigest()
+
+
+def _transform_partition(
+    source_path: str,
+    raw_path: str,
+    transformed_dir: str,
+    name: str,
+    catalog: Optional[np.ndarray] = None
+) -> Tuple[int, List[str], Dict[str, int]]:
+    """
+    Transformar un archivo fuente y dejarlo en STAGING_DIRNAME/<archivo>.parquet
+
+    El archivo se parsea directamente a canastas (parse_transaction_file),
+    sin construir el DataFrame ancho; si ya no está en la fuente se
+    transforma su shard crudo de la ingesta. Se ejecuta en el pool de
+    procesos: el worker escribe su transformación y su archivo de cuarentena
+    en lugar de devolver los DataFrames serializados.
+
+    Returns:
+        Tupla (número de transacciones, directorios de partición que ocupa,
+        registros en cuarentena por motivo)
+    """
+    transformed_dir = Path(transformed_dir)
+    if Path(source_path).exists():
+        baskets, quarantine = parse_transaction_file(Path(source_path), catalog=catalog, return_quarantine=True)
+        transformed = baskets_to_frame(baskets)
+    else:
+        transformed, quarantine = _transform_wide_frame(
+            pd.read_parquet(raw_path), catalog=catalog, return_quarantine=True
+        )
+    quarantine_path = transformed_dir / QUARANTINE_DIRNAME / f"{name}.parquet"
+    if len(quarantine):
+        quarantine.insert(0, 'archivo', name)
+        write_quarantine(quarantine, quarantine_path)
+    else:
+        quarantine_path.unlink(missing_ok=True)
+
+    transformed = transformed.sort_values('fecha', kind='stable')
+    write_transformed(transformed, transformed_dir / STAGING_DIRNAME / f"{name}.parquet")
+    return len(transformed), transformed_partitions(transformed), quarantine_counts(quarantine)
+
+
+def _compact_month(transformed_dir: str, month: str, names: List[str]) -> List[str]:
+    """
+    Reescribir las particiones de un mes con un archivo por tipo
+
+    Reúne las filas del mes de cada archivo fuente (en el orden de names) y
+    escribe año_mes=<month>/tipo_transaccion=N/PARTITION_BASENAME.parquet.
+
+    Returns:
+        Rutas escritas, relativas a transformed_dir
+    """
+    transformed_dir = Path(transformed_dir)
+    month_dir = transformed_dir / f"año_mes={month}"
+    if month_dir.exists():
+        shutil.rmtree(month_dir)
+    if not names:
+        return []
+
+    desde, hasta = month_bounds(month)
+    month_df = read_transformed(
+        [transformed_dir / STAGING_DIRNAME / f"{name}.parquet" for name in names],
+        fecha_desde=desde,
+        fecha_hasta=hasta
+    )
+    return write_transformed_partitions(month_df, transformed_dir, PARTITION_BASENAME)
+
+
+def _partition_month(partition: str) -> str:
+    """Mes AAAA-MM de un directorio año_mes=AAAA-MM/tipo_transaccion=N"""
+    return Path(partition).parts[0].split('=', 1)[1]
+
+
+def _load_partitions_manifest(transformed_dir: Path) -> Dict:
+    """Manifiesto de particiones (vacío si no existe o es de otra versión)"""
+    manifest_path = transformed_dir / PARTITIONS_MANIFEST_FILENAME
+    if manifest_path.exists():
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == PARTITIONS_VERSION:
+            return manifest
+    return {'version': PARTITIONS_VERSION, 'files': {}}
+
+
+def _remove_source_files(transformed_dir: Path, name: str):
+    """Borrar la transformación y la cuarentena de un archivo fuente"""
+    (transformed_dir / QUARANTINE_DIRNAME / f"{name}.parquet").unlink(missing_ok=True)
+    (transformed_dir / STAGING_DIRNAME / f"{name}.parquet").unlink(missing_ok=True)
+
+
+def refresh_transformed_partitions(
+    transformed_dir: Path,
+    cache_dir: Path = CACHE_DIR,
+    n_workers: Optional[int] = None,
+    catalog: Optional[np.ndarray] = None
+) -> Dict:
+    """
+    Transformar solo los archivos fuente nuevos o modificados
+
+    El dataset se particiona por año_mes y tipo_transaccion (ver
+    write_transformed_partitions) con un solo archivo por partición. Cada
+    archivo fuente del manifiesto de ingesta se parsea directamente a
+    canastas (ver _transform_partition) y se escribe en
+    STAGING_DIRNAME/<archivo>.parquet cuando su hash cambió (y se borra si
+    salió de la ingesta); luego solo se compactan los meses que tocan las
+    fuentes nuevas, modificadas o eliminadas. El directorio se lee como un
+    único dataset con read_transformed.
+
+    Los registros que no pasan la validación quedan fuera del dataset, en
+    QUARANTINE_DIRNAME/<archivo>.parquet (ver read_quarantine). Si cambia el
+    catálogo se vuelve a transformar todo.
+
+    Args:
+        transformed_dir: Directorio raíz del dataset transformado
+        cache_dir: Directorio de caché con el manifiesto de ingesta
+        n_workers: Procesos en paralelo (None = TRANSFORM_WORKERS, 1 = secuencial)
+        catalog: IDs de producto conocidos (None = no se comprueba el catálogo)
+
+    Returns:
+        Diccionario con:
+            - 'partitions': rutas de los archivos del dataset
+            - 'changed': nombres de archivos transformados en esta ejecución
+            - 'removed': nombres de archivos cuyas particiones se eliminaron
+            - 'months': meses AAAA-MM compactados en esta ejecución
+            - 'quarantined': registros en cuarentena por motivo
+
+    Raises:
+        ValueError: si no hay shards de ingesta (load_transactions_incremental)
+    """
+    print("TRANSFORMANDO DATOS DE TRANSACCIONES (INCREMENTAL)")
+    print("=" * 70)
+
+    n_workers = TRANSFORM_WORKERS if n_workers is None else n_workers
+    cache_dir = Path(cache_dir)
+    transformed_dir = Path(transformed_dir)
+
+    raw_entries = load_manifest(cache_dir)['files']
+    if not raw_entries:
+        raise ValueError("No hay shards de ingesta; ejecute load_transactions_incremental primero")
+
+    manifest = _load_partitions_manifest(transformed_dir)
+    fingerprint = catalog_fingerprint(catalog)
+    if manifest.get('catalog') != fingerprint:
+        manifest = {'version': PARTITIONS_VERSION, 'files': {}}
+    manifest['catalog'] = fingerprint
+    entries = manifest['files']
+
+    # Sin manifiesto válido se reconstruye todo (versiones anteriores
+    # escribían un único archivo o particiones con otro esquema)
+    if not entries and transformed_dir.exists():
+        if transformed_dir.is_file():
+            transformed_dir.unlink()
+        else:
+            shutil.rmtree(transformed_dir)
+    transformed_dir.mkdir(parents=True, exist_ok=True)
+
+    names = sorted(raw_entries)
+    to_transform = [
+        name for name in names
+        if name not in entries
+        or entries[name]['sha256'] != raw_entries[name]['sha256']
+        or not (transformed_dir / STAGING_DIRNAME / f"{name}.parquet").exists()
+    ]
+
+    # Meses a compactar: los de las fuentes que cambian (antes y después) y
+    # los que perdieron algún archivo de partición
+    months = {
+        _partition_month(partition)
+        for name in entries if name in to_transform or name not in raw_entries
+        for partition in entries[name]['partitions']
+    }
+    months.update(
+        _partition_month(partition)
+        for name in entries
+        for partition in entries[name]['partitions']
+        if not (transformed_dir / partition / f"{PARTITION_BASENAME}.parquet").exists()
+    )
+
+    removed = sorted(set(entries) - set(raw_entries))
+    for name in removed + to_transform:
+        if name in entries:
+            _remove_source_files(transformed_dir, name)
+            del entries[name]
+
+    print(f"\nArchivos fuente: {len(names)}")
+    print(f"Archivos a transformar: {len(to_transform)}")
+    if removed:
+        print(f"Archivos eliminados del dataset: {len(removed)}")
+
+    jobs = [
+        (raw_entries[name]['path'], str(cache_dir / raw_entries[name]['shard']), str(transformed_dir), name, catalog)
+        for name in to_transform
+    ]
+    if n_workers <= 1 or len(jobs) <= 1:
+        results = [_transform_partition(*job) for job in jobs]
+    else:
+        print(f"Transformación paralela: {n_workers} procesos")
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_transform_partition, *zip(*jobs)))
+
+    for name, (n_rows, partitions, rejected) in zip(to_transform, results):
+        entries[name] = {
+            'sha256': raw_entries[name]['sha256'],
+            'partitions': partitions,
+            'rows': n_rows,
+            'quarantined': rejected,
+        }
+        months.update(_partition_month(partition) for partition in partitions)
+
+    months = sorted(months)
+    print(f"Meses a compactar: {len(months)}")
+    compact_jobs = [
+        (str(transformed_dir), month, [
+            name for name in names
+            if any(_partition_month(partition) == month for partition in entries[name]['partitions'])
+        ])
+        for month in months
+    ]
+    if n_workers <= 1 or len(compact_jobs) <= 1:
+        for job in compact_jobs:
+            _compact_month(*job)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            list(pool.map(_compact_month, *zip(*compact_jobs)))
+
+    manifest_path = transformed_dir / PARTITIONS_MANIFEST_FILENAME
+    tmp_path = manifest_path.with_name('_' + manifest_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+    quarantined = {}
+    for motivo in QUARANTINE_REASONS:
+        count = sum(entries[name]['quarantined'].get(motivo, 0) for name in names)
+        if count:
+            quarantined[motivo] = count
+    report_quarantine(quarantined)
+
+    total = sum(entries[name]['rows'] for name in names)
+    print(f"\n✓ Transacciones en el dataset: {total:,}")
+    print(f"Archivos reutilizados: {len(names) - len(to_transform)}")
+
+    return {
+        'partitions': sorted({
+            transformed_dir / partition / f"{PARTITION_BASENAME}.parquet"
+            for name in names for partition in entries[name]['partitions']
+        }),
+        'changed': to_transform,
+        'removed': removed,
+        'months': months,
+        'quarantined': quarantined,
+    }
+
+
+def read_quarantine(transformed_dir: Path) -> pd.DataFrame:
+    """
+    Leer los registros en cuarentena del dataset transformado
+
+    Args:
+        transformed_dir: Directorio raíz del dataset transformado
+
+    Returns:
+        DataFrame con archivo, los valores crudos (texto) y el motivo de
+        cada grupo rechazado (vacío si no hay)
+    """
+    paths = sorted((Path(transformed_dir) / QUARANTINE_DIRNAME).glob('*.parquet'))
+    if not paths:
+        columns = ['archivo', 'fecha', 'tipo_transaccion', 'persona_id', 'productos']
+        quarantine = pd.DataFrame(columns=columns, dtype='string')
+        quarantine['motivo'] = pd.Categorical([], categories=list(QUARANTINE_REASONS))
+        return quarantine
+    return pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+
+
+def quarantine_summary(transformed_dir: Path) -> pd.DataFrame:
+    """
+    Resumen de la cuarentena por archivo fuente y motivo
+
+    Usa los conteos del manifiesto de particiones, sin leer los registros.
+
+    Args:
+        transformed_dir: Directorio raíz del dataset transformado
+
+    Returns:
+        DataFrame con columnas archivo, motivo y registros
+    """
+    entries = _load_partitions_manifest(Path(transformed_dir))['files']
+    rows = [
+        (name, motivo, entries[name]['quarantined'][motivo])
+        for name in sorted(entries)
+        for motivo in QUARANTINE_REASONS if motivo in entries[name]['quarantined']
+    ]
+    return pd.DataFrame(rows, columns=['archivo', 'motivo', 'registros'])
+
+
+def validate_transform(df: pd.DataFrame) -> bool:
+    """
+    Comparar la transformación vectorizada con la de referencia fila a fila
+
+    La referencia no valida los datos, así que solo se comparan los grupos
+    que la transformación vectorizada acepta: los que irían a cuarentena se
+    vacían en la entrada de la referencia.
+
+    Args:
+        df: DataFrame crudo de transacciones (una muestra basta)
+
+    Returns:
+        True si ambas producen el mismo DataFrame
+    """
+    result = _transform_wide_frame(df)
+
+    groups = _wide_groups(df)
+    rejected = (groups["present"] & (groups["reason"] >= 0)).reshape(len(df), groups["n_groups"])
+    clean = df.astype(object)
+    for group in np.flatnonzero(rejected.any(axis=0)):
+        columns = list(range(1 + 3 * group, 4 + 3 * group))
+        clean.iloc[np.flatnonzero(rejected[:, group]), columns] = None
+    expected = _transform_wide_frame_iterrows(clean)
+
+    if len(expected) == 0:
+        return len(result) == 0
+
+    try:
+        pd.testing.assert_frame_equal(result, expected, check_dtype=True)
+    except AssertionError as e:
+        print(f"⚠ La transformación vectorizada difiere de la referencia:\n{e}")
+        return False
+
+    n_rejected = int(rejected.sum())
+    excluded = f", {n_rejected:,} grupos en cuarentena excluidos" if n_rejected else ""
+    print(f"✓ Transformación vectorizada validada ({len(result):,} transacciones{excluded})")
+    return True
+
+
+def _iter_transformed_batches(batches: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Transforma un flujo de bloques crudos sin acumularlos en memoria
+
+    Args:
+        batches: Iterable de DataFrames crudos (p. ej. iter_transaction_batches)
+
+    Returns:
+        Iterador de DataFrames transformados, uno por bloque de entrada
+    """
+    total = 0
+    quarantined = {}
+    for batch in batches:
+        transformed, quarantine = _transform_wide_frame(batch, return_quarantine=True)
+        for motivo, count in quarantine_counts(quarantine).items():
+            quarantined[motivo] = quarantined.get(motivo, 0) + count
+        total += len(transformed)
+        yield transformed
+
+    report_quarantine({motivo: quarantined[motivo] for motivo in QUARANTINE_REASONS if motivo in quarantined})
+    print(f"\n✓ Transacciones procesadas (por bloques): {total:,}")
+
+
+def extract_transaction_features(
+    df: Union[pd.DataFrame, Iterable[pd.DataFrame]]
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Extrae características reales de las transacciones
+
+    Args:
+        df: DataFrame con estructura:
+           [fecha|tipo1|id1|productos1|tipo2|id2|productos2|...]
+           o un iterable de bloques con esa estructura (iter_transaction_batches)
+
+    Returns:
+        DataFrame transformado con métricas calculadas. Si la entrada es un
+        iterable de bloques, devuelve un iterador de bloques transformados
+    """
+    if not isinstance(df, pd.DataFrame):
+        return _iter_transformed_batches(df)
+
+    print("TRANSFORMANDO DATOS DE TRANSACCIONES")
+    print("=" * 70)
+
+    # Identificar estructura
+    print(f"\nColumnas originales: {len(df.columns)}")
+    print(f"Primeras columnas: {list(df.columns[:5])}")
+
+    df_transformed, quarantine = _transform_wide_frame(df, return_quarantine=True)
+    report_quarantine(quarantine_counts(quarantine))
 
     print(f"\n✓ Transacciones procesadas: {len(df_transformed):,}")
     print(f"\nColumnas transformadas:")
@@ -80,43 +750,30 @@ def extract_transaction_features(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def get_product_frequency(
-    df_transformed: pd.DataFrame, top_n: int = 20
+    df_transformed: Union[pd.DataFrame, BasketStore], top_n: int = 20, by: Optional[str] = None
 ) -> pd.DataFrame:
     """
     Calcula frecuencia de productos
 
     Args:
-        df_transformed: DataFrame transformado con columna 'productos_list'
-        top_n: Número de productos top a retornar
+        df_transformed: DataFrame transformado con la columna canónica
+            'productos' o con 'productos_list', o BasketStore
+        top_n: Número de productos top a mostrar
+        by: None, 'tipo_transaccion' o 'mes' para contar por grupo
 
     Returns:
-        DataFrame con productos y sus frecuencias
+        DataFrame con productos y sus frecuencias (ver product_frequency)
     """
     print(f"\nCALCULANDO FRECUENCIA DE PRODUCTOS (Top {top_n})")
     print("=" * 70)
 
-    # Expandir listas de productos
-    all_products = []
-    for productos_list in df_transformed["productos_list"]:
-        if productos_list:
-            all_products.extend(productos_list)
-
-    # Contar frecuencias
-    product_counts = pd.Series(all_products).value_counts()
-
-    # Crear DataFrame
-    freq_df = pd.DataFrame(
-        {
-            "producto_id": product_counts.index,
-            "frecuencia": product_counts.values,
-            "porcentaje": (product_counts.values / product_counts.sum() * 100).round(2),
-        }
-    )
+    freq_df, pareto = product_frequency(df_transformed, by=by)
 
-    print(f"\n✓ Productos únicos encontrados: {len(freq_df):,}")
-    print(f"✓ Total de items vendidos: {product_counts.sum():,}")
+    print(f"\n✓ Productos únicos encontrados: {freq_df['producto_id'].nunique():,}")
+    print(f"✓ Total de items vendidos: {int(pareto['items'].sum()):,}")
+    report_pareto(pareto, by)
     print(f"\nTop {top_n} productos más vendidos:")
-    print(freq_df.head(top_n).to_string(index=False))
+    print(freq_df[freq_df['ranking'] <= top_n].to_string(index=False))
 
     return freq_df
 
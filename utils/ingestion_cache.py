@@ -0,0 +1,298 @@
+"""
+Módulo para ingesta incremental de transacciones
+Mantiene un manifiesto de archivos fuente y una caché parquet por archivo
+"""
+
+import hashlib
+import json
+import os
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from .config import CACHE_DIR, LOAD_WORKERS, LOAD_EXECUTOR, LOAD_ENGINE
+from .data_loader import LOAD_ENGINES, _iter_read_results, list_transaction_files
+
+MANIFEST_FILENAME = 'ingestion_manifest.json'
+SHARDS_DIRNAME = 'raw_shards'
+MANIFEST_VERSION = 2  # 2: shards con los dtypes del registro de esquemas
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calcular el hash SHA-256 del contenido de un archivo
+
+    Args:
+        path: Ruta al archivo
+        chunk_size: Tamaño de bloque de lectura en bytes
+
+    Returns:
+        Hash hexadecimal del contenido
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(cache_dir: Path = CACHE_DIR) -> Dict:
+    """
+    Leer el manifiesto de ingesta (vacío si no existe o es de otra versión)
+
+    Args:
+        cache_dir: Directorio de caché
+
+    Returns:
+        Diccionario {'version': int, 'files': {nombre: entrada}}
+    """
+    manifest_path = Path(cache_dir) / MANIFEST_FILENAME
+    if manifest_path.exists():
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    return {'version': MANIFEST_VERSION, 'files': {}}
+
+
+def save_manifest(manifest: Dict, cache_dir: Path = CACHE_DIR):
+    """
+    Guardar el manifiesto de ingesta de forma atómica
+
+    Args:
+        manifest: Manifiesto a guardar
+        cache_dir: Directorio de caché
+    """
+    manifest_path = Path(cache_dir) / MANIFEST_FILENAME
+    tmp_path = manifest_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _shard_path(cache_dir: Path, file_name: str) -> Path:
+    """Ruta del shard parquet de un archivo fuente"""
+    return Path(cache_dir) / SHARDS_DIRNAME / f"{file_name}.parquet"
+
+
+def _is_unchanged(file: Path, entry: Optional[Dict], shard_path: Path) -> bool:
+    """
+    Determinar si un archivo fuente coincide con su entrada del manifiesto
+
+    Si tamaño y mtime coinciden no se vuelve a leer el archivo. Si solo cambia
+    el mtime (p. ej. el archivo se copió de nuevo) se compara el hash y se
+    actualiza la entrada sin volver a parsearlo.
+
+    Args:
+        file: Archivo fuente
+        entry: Entrada del manifiesto (None si es nuevo)
+        shard_path: Ruta del shard parquet asociado
+
+    Returns:
+        True si el shard en caché sigue siendo válido
+    """
+    if entry is None or not shard_path.exists():
+        return False
+
+    stat = file.stat()
+    if stat.st_size != entry['size']:
+        return False
+    if stat.st_mtime_ns == entry['mtime_ns']:
+        return True
+
+    if file_sha256(file) == entry['sha256']:
+        entry['mtime_ns'] = stat.st_mtime_ns
+        return True
+    return False
+
+
+def refresh_transaction_shards(
+    transactions_dir: Path,
+    cache_dir: Path = CACHE_DIR,
+    sample_size: Optional[int] = None,
+    file_pattern: Union[str, Sequence[str], None] = None,
+    n_workers: Optional[int] = None,
+    executor: Optional[str] = None,
+    engine: Optional[str] = None
+) -> Dict:
+    """
+    Actualizar la caché de shards parseando solo archivos nuevos o modificados
+
+    Args:
+        transactions_dir: Directorio con archivos de transacciones
+        cache_dir: Directorio donde viven el manifiesto y los shards
+        sample_size: Número de archivos a considerar (None = todos)
+        file_pattern: Patrón o patrones de archivos (None = CSV planos y .gz/.zst/.bz2)
+        n_workers: Archivos parseados en paralelo (None = LOAD_WORKERS)
+        executor: Tipo de pool, 'thread' o 'process' (None = LOAD_EXECUTOR)
+        engine: Motor de lectura, 'pandas' o 'pyarrow' (None = LOAD_ENGINE)
+
+    Returns:
+        Diccionario con:
+            - 'files': entradas del manifiesto en orden de archivo
+            - 'changed': nombres de archivos parseados en esta ejecución
+            - 'removed': nombres de archivos que ya no existen en la fuente
+            - 'errors': mensajes de error por archivo
+    """
+    print("ACTUALIZANDO CACHÉ DE INGESTA")
+
+    n_workers = LOAD_WORKERS if n_workers is None else n_workers
+    executor = LOAD_EXECUTOR if executor is None else executor
+    engine = LOAD_ENGINE if engine is None else engine
+    if engine not in LOAD_ENGINES:
+        raise ValueError(f"Engine '{engine}' no válido. Opciones: {list(LOAD_ENGINES)}")
+
+    cache_dir = Path(cache_dir)
+    (cache_dir / SHARDS_DIRNAME).mkdir(parents=True, exist_ok=True)
+
+    transaction_files = list_transaction_files(transactions_dir, file_pattern, sample_size)
+
+    manifest = load_manifest(cache_dir)
+    entries = manifest['files']
+
+    to_parse = [
+        file for file in transaction_files
+        if not _is_unchanged(file, entries.get(file.name), _shard_path(cache_dir, file.name))
+    ]
+
+    print(f"Archivos encontrados: {len(transaction_files)}")
+    print(f"Archivos nuevos o modificados: {len(to_parse)}")
+
+    changed = []
+    errors = []
+    results = _iter_read_results(to_parse, n_workers, executor, engine)
+    for file, (df, error, elapsed) in zip(to_parse, results):
+        if error is not None:
+            errors.append(f"Error en {file.name}: {error}")
+            print(f"  {errors[-1]}")
+            # El shard anterior ya no corresponde al archivo: fuera del dataset
+            entries.pop(file.name, None)
+            _shard_path(cache_dir, file.name).unlink(missing_ok=True)
+            continue
+
+        shard_path = _shard_path(cache_dir, file.name)
+        tmp_path = shard_path.with_suffix('.parquet.tmp')
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, shard_path)
+
+        stat = file.stat()
+        entries[file.name] = {
+            'path': str(file),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(file),
+            'shard': str(shard_path.relative_to(cache_dir)),
+            'rows': len(df),
+            'parse_seconds': round(elapsed, 4),
+        }
+        changed.append(file.name)
+
+    # Los archivos que desaparecieron de la fuente salen del dataset
+    removed = []
+    if not sample_size:
+        current = {file.name for file in transaction_files}
+        for name in sorted(set(entries) - current):
+            _shard_path(cache_dir, name).unlink(missing_ok=True)
+            entries.pop(name)
+            removed.append(name)
+        if removed:
+            print(f"Archivos eliminados de la fuente: {len(removed)}")
+
+    save_manifest(manifest, cache_dir)
+
+    files = [entries[file.name] for file in transaction_files if file.name in entries]
+    return {'files': files, 'changed': changed, 'removed': removed, 'errors': errors}
+
+
+def load_transactions_incremental(
+    transactions_dir: Path,
+    cache_dir: Path = CACHE_DIR,
+    sample_size: Optional[int] = None,
+    file_pattern: Union[str, Sequence[str], None] = None,
+    n_workers: Optional[int] = None,
+    executor: Optional[str] = None,
+    engine: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Cargar transacciones reutilizando los shards parquet en caché
+
+    Equivalente a load_transactions, pero solo parsea los archivos nuevos o
+    modificados desde la última ejecución y ensambla el resto desde caché.
+
+    Args:
+        transactions_dir: Directorio con archivos de transacciones
+        cache_dir: Directorio donde viven el manifiesto y los shards
+        sample_size: Número de archivos a cargar (None = todos)
+        file_pattern: Patrón o patrones de archivos (None = CSV planos y .gz/.zst/.bz2)
+        n_workers: Archivos parseados en paralelo (None = LOAD_WORKERS)
+        executor: Tipo de pool, 'thread' o 'process' (None = LOAD_EXECUTOR)
+        engine: Motor de lectura, 'pandas' o 'pyarrow' (None = LOAD_ENGINE)
+
+    Returns:
+        DataFrame con todas las transacciones, en orden de archivo
+    """
+    refreshed = refresh_transaction_shards(
+        transactions_dir,
+        cache_dir,
+        sample_size=sample_size,
+        file_pattern=file_pattern,
+        n_workers=n_workers,
+        executor=executor,
+        engine=engine
+    )
+
+    if not refreshed['files']:
+        raise ValueError("No se pudieron cargar transacciones")
+
+    result = _read_shards(cache_dir, refreshed['files'])
+
+    print(f"\nTotal transacciones cargadas: {len(result):,}")
+    print(f"Shards reutilizados: {len(refreshed['files']) - len(refreshed['changed'])}")
+
+    if refreshed['errors']:
+        print(f"\nArchivos con errores: {len(refreshed['errors'])}")
+
+    return result
+
+
+def _read_shards(cache_dir: Path, entries: List[Dict]) -> pd.DataFrame:
+    """Concatenar los shards de las entradas del manifiesto, en ese orden"""
+    dfs = [pd.read_parquet(Path(cache_dir) / entry['shard']) for entry in entries]
+    return pd.concat(dfs, ignore_index=True)
+
+
+def read_transaction_shards(cache_dir: Path = CACHE_DIR) -> pd.DataFrame:
+    """
+    Leer las transacciones crudas directamente de los shards de ingesta
+
+    Sustituye al parquet completo de transacciones: las tareas que necesitan
+    los datos crudos los ensamblan desde la caché que mantiene
+    refresh_transaction_shards, sin materializar otra copia.
+
+    Args:
+        cache_dir: Directorio de caché
+
+    Returns:
+        DataFrame con todas las transacciones, en orden de archivo
+
+    Raises:
+        ValueError: si no hay shards registrados en el manifiesto
+    """
+    entries = load_manifest(cache_dir)['files']
+    if not entries:
+        raise ValueError("No hay shards de ingesta; ejecute refresh_transaction_shards primero")
+    return _read_shards(cache_dir, [entries[name] for name in sorted(entries)])
+
+
+def list_shard_paths(cache_dir: Path = CACHE_DIR) -> List[Path]:
+    """
+    Rutas de los shards registrados en el manifiesto, en orden de archivo
+
+    Args:
+        cache_dir: Directorio de caché
+
+    Returns:
+        Lista de rutas parquet
+    """
+    entries = load_manifest(cache_dir)['files']
+    return [Path(cache_dir) / entries[name]['shard'] for name in sorted(entries)]
@@ -0,0 +1,197 @@
+"""
+Módulo para la minería vertical de itemsets frecuentes (estilo Eclat)
+Cada producto frecuente se representa con un bitset empaquetado de sus
+transacciones (numpy uint64); el soporte de un itemset es el popcount del
+AND de los bitsets de sus items y los candidatos se extienden en
+profundidad, solo a partir de itemsets frecuentes. Los pares se cuentan de
+una vez con el producto disperso Xᵀ·X (igual que la co-ocurrencia), de modo
+que los bitsets solo se combinan para extender pares ya frecuentes
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from typing import Dict, Optional, Tuple
+
+# Bits en 1 de cada byte, para contar sin np.bitwise_count (numpy < 2.0)
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# Filas por bloque al contar con la tabla (acota la copia uint8 intermedia)
+POPCOUNT_CHUNK_BYTES = 32 * 1024 * 1024
+
+
+def popcount_rows(bits: np.ndarray) -> np.ndarray:
+    """
+    Bits en 1 de cada fila de una matriz de bitsets
+
+    Args:
+        bits: Arreglo uint64 de forma (m, n_palabras)
+
+    Returns:
+        Arreglo int64 de largo m
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bits).sum(axis=1, dtype=np.int64)
+
+    counts = np.empty(len(bits), dtype=np.int64)
+    rows_per_chunk = max(1, POPCOUNT_CHUNK_BYTES // max(bits.shape[1] * 8, 1))
+    for start in range(0, len(bits), rows_per_chunk):
+        chunk = np.ascontiguousarray(bits[start:start + rows_per_chunk])
+        counts[start:start + rows_per_chunk] = POPCOUNT_TABLE[chunk.view(np.uint8)].sum(axis=1, dtype=np.int64)
+    return counts
+
+
+def transaction_bitsets(offsets: np.ndarray, codes: np.ndarray, items: np.ndarray) -> np.ndarray:
+    """
+    Bitsets de transacciones de los items pedidos
+
+    Args:
+        offsets: Offsets int64 de largo n+1 (la transacción t es codes[offsets[t]:offsets[t + 1]])
+        codes: Códigos de item concatenados (los repetidos en una transacción no importan)
+        items: Códigos de los items a representar
+
+    Returns:
+        Arreglo uint64 de forma (len(items), ceil(n / 64)); el bit t de la
+        fila r indica si la transacción t contiene items[r]
+    """
+    n_transactions = len(offsets) - 1
+    n_words = (n_transactions + 63) // 64
+    bits = np.zeros((len(items), n_words), dtype=np.uint64)
+    if len(items) == 0 or len(codes) == 0:
+        return bits
+
+    rows = np.full(int(max(codes.max(), items.max())) + 1, -1, dtype=np.int64)
+    rows[items] = np.arange(len(items))
+    tids = np.repeat(np.arange(n_transactions, dtype=np.int64), np.diff(offsets))
+    item_rows = rows[codes]
+    selected = item_rows >= 0
+    tids, item_rows = tids[selected], item_rows[selected]
+    if len(tids) == 0:
+        # Ninguna transacción contiene los items pedidos
+        return bits
+
+    # OR de los bits de cada palabra: ordenar por palabra y reducir por grupos
+    keys = item_rows * n_words + (tids >> 6)
+    values = np.left_shift(np.uint64(1), (tids & 63).astype(np.uint64))
+    order = np.argsort(keys, kind='stable')
+    keys, values = keys[order], values[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    bits.reshape(-1)[keys[starts]] = np.bitwise_or.reduceat(values, starts)
+    return bits
+
+
+def eclat(
+    bits: np.ndarray,
+    counts: np.ndarray,
+    min_count: int,
+    max_len: Optional[int] = None,
+    pair_counts: Optional[sp.csr_matrix] = None
+) -> Dict[Tuple[int, ...], int]:
+    """
+    Itemsets frecuentes por extensión en profundidad de bitsets
+
+    Args:
+        bits: Bitsets de transacciones de los items frecuentes (ver
+            transaction_bitsets), una fila por item
+        counts: Soporte (conteo) de cada fila
+        min_count: Conteo mínimo (al menos 1)
+        max_len: Tamaño máximo de itemset (None = sin límite)
+        pair_counts: Conteos de pares entre filas (CSR con índices
+            ordenados); si se pasa, el primer nivel no hace AND de todos
+            los pares de bitsets
+
+    Returns:
+        Diccionario {tupla creciente de filas: conteo}, incluidos los items individuales
+    """
+    min_count = max(int(min_count), 1)
+    itemsets = {(row,): int(count) for row, count in enumerate(np.asarray(counts).tolist())}
+
+    def extend(prefix: Tuple[int, ...], items: np.ndarray, tidsets: np.ndarray):
+        # Clase de equivalencia: todos los items comparten el prefijo
+        for pos in range(len(items) - 1):
+            joined = tidsets[pos + 1:] & tidsets[pos]
+            supports = popcount_rows(joined)
+            frequent = supports >= min_count
+            if not frequent.any():
+                continue
+            new_prefix = prefix + (int(items[pos]),)
+            new_items = items[pos + 1:][frequent]
+            for item, support in zip(new_items.tolist(), supports[frequent].tolist()):
+                itemsets[new_prefix + (item,)] = support
+            if len(new_items) > 1 and (max_len is None or len(new_prefix) + 2 <= max_len):
+                extend(new_prefix, new_items, joined[frequent])
+
+    if max_len is not None and max_len < 2:
+        return itemsets
+    if pair_counts is None:
+        extend((), np.arange(len(bits)), bits)
+        return itemsets
+
+    for row in range(len(bits)):
+        start, end = pair_counts.indptr[row], pair_counts.indptr[row + 1]
+        cols = pair_counts.indices[start:end]
+        supports = pair_counts.data[start:end]
+        frequent = (cols > row) & (supports >= min_count)
+        new_items, supports = cols[frequent].astype(np.int64), supports[frequent]
+        for item, support in zip(new_items.tolist(), supports.tolist()):
+            itemsets[(row, item)] = int(support)
+        if len(new_items) > 1 and (max_len is None or max_len >= 3):
+            extend((row,), new_items, bits[new_items] & bits[row])
+    return itemsets
+
+
+def mine_frequent_itemsets(
+    offsets: np.ndarray,
+    codes: np.ndarray,
+    min_count: int,
+    max_len: Optional[int] = None,
+    canonical: bool = False
+) -> Dict[Tuple[int, ...], int]:
+    """
+    Itemsets frecuentes de transacciones codificadas como enteros no negativos
+
+    Args:
+        offsets: Offsets int64 de largo n+1
+        codes: Códigos de item concatenados
+        min_count: Conteo mínimo (al menos 1)
+        max_len: Tamaño máximo de itemset (None = sin límite)
+        canonical: Si True, cada transacción ya viene sin repetidos
+
+    Returns:
+        Diccionario {tupla creciente de códigos: conteo}
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    codes = np.asarray(codes, dtype=np.int64)
+    if len(codes) == 0:
+        return {}
+
+    n_codes = int(codes.max()) + 1
+    if canonical:
+        counts = np.bincount(codes, minlength=n_codes)
+    else:
+        # Un item repetido en una transacción cuenta una vez
+        tids = np.repeat(np.arange(len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+        counts = np.bincount(np.unique(tids * n_codes + codes) % n_codes, minlength=n_codes)
+
+    frequent = np.flatnonzero(counts >= max(int(min_count), 1))
+    bits = transaction_bitsets(offsets, codes, frequent)
+
+    pair_counts = None
+    if max_len is None or max_len >= 2:
+        # Pares de items frecuentes con el producto disperso Xᵀ·X
+        rows = np.full(n_codes, -1, dtype=np.int64)
+        rows[frequent] = np.arange(len(frequent))
+        item_rows = rows[codes]
+        tids = np.repeat(np.arange(len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+        selected = item_rows >= 0
+        baskets = sp.csr_matrix(
+            (np.ones(int(selected.sum()), dtype=np.int32), (tids[selected], item_rows[selected])),
+            shape=(len(offsets) - 1, len(frequent))
+        )
+        baskets.data[:] = 1  # los repetidos se suman al convertir desde COO
+        pair_counts = (baskets.T.tocsr() @ baskets).tocsr()
+        pair_counts.sort_indices()
+
+    return {
+        tuple(int(frequent[row]) for row in rows): count
+        for rows, count in eclat(bits, counts[frequent], min_count, max_len, pair_counts).items()
+    }
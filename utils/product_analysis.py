@@ -5,125 +5,319 @@ Incluye análisis de productos más vendidos y reglas de asociación (market bas
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
-from collections import Counter
-from itertools import combinations
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+from .basket_parser import canonical_baskets, is_canonical
+from .basket_store import BasketStore
+from .cooccurrence import CooccurrenceMatrix, build_cooccurrence
+from .config import MINING_SHARDS
+from .itemset_mining import mine_frequent_itemsets
+from .product_dictionary import ProductDictionary
+from .product_frequency import product_frequency, report_pareto
+from .sharded_counting import sharded_frequent_itemsets
+from .transformed_store import PRODUCTS_COLUMN, product_arrays
 
-def analyze_top_products(df: pd.DataFrame, top_n: int = 50) -> pd.DataFrame:
+# Entradas aceptadas por los contadores: DataFrame transformado, flujo de
+# bloques transformados o almacén de canastas mapeado en memoria
+BasketSource = Union[pd.DataFrame, Iterable[pd.DataFrame], BasketStore]
+
+
+def _iter_frames(data: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Iterator[pd.DataFrame]:
+    """
+    Normaliza la entrada de los contadores a un iterador de DataFrames
+
+    Args:
+        data: DataFrame transformado o iterable de bloques transformados
+
+    Returns:
+        Iterador de DataFrames (uno solo si la entrada ya es un DataFrame)
+    """
+    if isinstance(data, pd.DataFrame):
+        yield data
+    else:
+        yield from data
+
+
+def iter_product_lists(data: BasketSource) -> Iterator[List[str]]:
+    """
+    Recorre las listas de productos de un DataFrame, un flujo de bloques o un almacén
+
+    Del almacén y de la columna canónica salen los productos únicos y
+    ordenados de cada canasta; de productos_list, las listas tal cual.
+
+    Args:
+        data: DataFrame transformado, iterable de bloques transformados o BasketStore
+
+    Returns:
+        Iterador con la lista de productos de cada transacción
+    """
+    if isinstance(data, BasketStore):
+        for basket in data.iter_baskets():
+            yield basket.tolist()
+        return
+
+    for frame in _iter_frames(data):
+        if PRODUCTS_COLUMN in frame.columns:
+            offsets, productos = product_arrays(frame)
+            productos = productos.tolist()
+            for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+                yield productos[start:end]
+        else:
+            yield from frame["productos_list"]
+
+
+def _encoded_blocks(data: BasketSource, dictionary: ProductDictionary) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Offsets y códigos densos de cada bloque, sin repetidos y ordenados por canasta"""
+    def blocks():
+        if isinstance(data, BasketStore):
+            yield data.offsets, dictionary.encode(data.productos)
+            return
+        for frame in _iter_frames(data):
+            if PRODUCTS_COLUMN in frame.columns:
+                offsets, productos = product_arrays(frame)
+                yield offsets, dictionary.encode(productos)
+            else:
+                yield dictionary.encode_lists(frame["productos_list"])
+
+    for offsets, codes in blocks():
+        if not is_canonical(offsets, codes):
+            offsets, codes, _ = canonical_baskets(offsets, codes)
+        yield offsets, codes
+
+
+def iter_encoded_baskets(data: BasketSource, dictionary: ProductDictionary) -> Iterator[List[int]]:
+    """
+    Recorre las canastas como listas de códigos densos del diccionario
+
+    Los productos se codifican bloque a bloque en una sola llamada, de modo
+    que los conteos posteriores hashean enteros pequeños en lugar de cadenas.
+    Cada canasta sale sin repetidos y con los códigos en orden creciente
+    (solo se reordena en bloque si hace falta, p. ej. con productos_list o
+    con códigos agregados fuera de orden), así que los contadores pueden
+    generar combinaciones directamente. Para minar itemsets conviene
+    encoded_basket_arrays, que no arma una lista por canasta.
+
+    Args:
+        data: DataFrame transformado, iterable de bloques transformados o BasketStore
+        dictionary: Diccionario de productos (los IDs nuevos se agregan al final)
+
+    Returns:
+        Iterador con la lista ordenada de códigos únicos de cada transacción
+    """
+    for offsets, codes in _encoded_blocks(data, dictionary):
+        codes = codes.tolist()
+        for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+            yield codes[start:end]
+
+
+def encoded_basket_arrays(
+    data: BasketSource,
+    dictionary: ProductDictionary,
+    with_products_only: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Canastas como offsets y códigos densos del diccionario, sin listas de Python
+
+    Mismas canastas que iter_encoded_baskets (sin repetidos y con los códigos
+    en orden creciente), concatenadas en dos arreglos; con un BasketStore o
+    un DataFrame canónico los offsets se toman tal cual.
+
+    Args:
+        data: DataFrame transformado, iterable de bloques transformados o BasketStore
+        dictionary: Diccionario de productos (los IDs nuevos se agregan al final)
+        with_products_only: Si True se omiten las canastas vacías
+
+    Returns:
+        Tupla (offsets int64 de largo n+1, códigos int64); la canasta i es
+        codes[offsets[i]:offsets[i + 1]]
+    """
+    blocks = list(_encoded_blocks(data, dictionary))
+    if len(blocks) == 1:
+        offsets, codes = blocks[0]
+        offsets = np.asarray(offsets, dtype=np.int64)
+    else:
+        sizes = np.concatenate([np.diff(block_offsets) for block_offsets, _ in blocks]) if blocks else np.empty(0, dtype=np.int64)
+        offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        codes = np.concatenate([block_codes for _, block_codes in blocks]) if blocks else np.empty(0, dtype=np.int64)
+
+    if with_products_only:
+        # Las canastas vacías no aportan códigos: basta con quitar sus offsets
+        offsets = np.concatenate(([0], offsets[1:][np.diff(offsets) > 0]))
+    return offsets, np.asarray(codes, dtype=np.int64)
+
+
+def _decode_itemset(codes: Tuple[int, ...], dictionary: ProductDictionary) -> Tuple[str, ...]:
+    """Convertir una tupla de códigos a IDs de producto (texto) en orden creciente"""
+    return tuple(sorted(str(product) for product in dictionary.decode(list(codes))))
+
+
+def analyze_top_products(df: BasketSource, top_n: int = 50, by: Optional[str] = None) -> pd.DataFrame:
     """
     Analiza los productos más vendidos
 
     Args:
-        df: DataFrame transformado con productos_list
+        df: DataFrame transformado (canónico o con productos_list), iterable
+            de bloques transformados o BasketStore
         top_n: Número de productos top a analizar
+        by: None, 'tipo_transaccion' o 'mes' para contar por grupo
 
     Returns:
-        DataFrame con estadísticas de productos
+        DataFrame con estadísticas de productos (ver product_frequency)
     """
     print(f"\nANÁLISIS DE PRODUCTOS MÁS VENDIDOS (Top {top_n})")
     print("=" * 70)
 
-    # Expandir lista de productos
-    all_products = []
-    for products in df["productos_list"]:
-        if products:
-            all_products.extend(products)
-
-    # Contar frecuencias
-    product_freq = pd.Series(all_products).value_counts()
-    product_freq_df = pd.DataFrame({
-        "producto_id": product_freq.index,
-        "frecuencia": product_freq.values,
-        "porcentaje": (product_freq.values / product_freq.sum() * 100).round(2),
-    })
-
-    # Calcular porcentaje acumulado
-    product_freq_df['porcentaje_acumulado'] = product_freq_df['porcentaje'].cumsum()
+    product_freq_df, pareto = product_frequency(df, by=by)
 
     # Estadísticas generales
-    total_productos_unicos = len(product_freq_df)
-    total_items_vendidos = len(all_products)
-    promedio_ventas = product_freq_df['frecuencia'].mean()
+    total_productos_unicos = product_freq_df['producto_id'].nunique()
+    total_items_vendidos = int(pareto['items'].sum())
+    promedio_ventas = total_items_vendidos / max(total_productos_unicos, 1)
 
     print(f"\nEstadísticas generales:")
     print(f"  • Total de productos únicos: {total_productos_unicos:,}")
     print(f"  • Total de items vendidos: {total_items_vendidos:,}")
     print(f"  • Promedio de ventas por producto: {promedio_ventas:.2f}")
-    print(f"  • Mediana de ventas por producto: {product_freq_df['frecuencia'].median():.2f}")
+    if by is None:
+        print(f"  • Mediana de ventas por producto: {product_freq_df['frecuencia'].median():.2f}")
 
     # Análisis de concentración (Pareto)
-    top_20_pct_productos = int(total_productos_unicos * 0.2)
-    ventas_top_20_pct = product_freq_df.head(top_20_pct_productos)['frecuencia'].sum()
-    porcentaje_ventas_top_20 = (ventas_top_20_pct / total_items_vendidos * 100)
-
     print(f"\nAnálisis de concentración (Principio de Pareto):")
-    print(f"  • Top 20% de productos ({top_20_pct_productos} productos)")
-    print(f"  • Representan {porcentaje_ventas_top_20:.2f}% de las ventas totales")
+    for _, row in pareto.iterrows():
+        label = f"[{by} {row[by]}] " if by else ""
+        print(f"  • {label}Top 20% de productos ({int(row['productos'] * 0.2)} productos)")
+        print(f"    Representan {row['ventas_top_20_pct']:.2f}% de las ventas totales")
+    report_pareto(pareto, by)
 
     # Mostrar top productos
+    top = product_freq_df[product_freq_df['ranking'] <= top_n]
     print(f"\nTop {min(top_n, len(product_freq_df))} productos más vendidos:")
-    print(product_freq_df.head(top_n).to_string(index=False))
+    print(top.to_string(index=False))
 
     return product_freq_df
 
 
-def find_frequent_itemsets(transactions: List[List[str]], min_support: float = 0.01) -> Dict:
+def find_frequent_itemsets_arrays(
+    offsets: np.ndarray,
+    codes: np.ndarray,
+    min_support: float = 0.01,
+    canonical: bool = False,
+    max_len: Optional[int] = 3,
+    n_shards: Optional[int] = None,
+    n_workers: Optional[int] = None
+) -> Dict:
     """
-    Encuentra conjuntos de items frecuentes usando un enfoque simplificado
+    Encuentra conjuntos de items frecuentes sobre canastas en arreglos
+
+    Los offsets y códigos (p. ej. encoded_basket_arrays, o los de un
+    BasketStore) van directo a los bitsets verticales (Eclat, ver
+    utils.itemset_mining): se arma un bitset uint64 de transacciones por item
+    frecuente y el soporte de cada candidato es el popcount del AND de los
+    bitsets.
 
     Args:
-        transactions: Lista de listas, donde cada lista es una transacción con productos
+        offsets: Offsets int64 de largo n+1
+        codes: Códigos enteros no negativos de los items, concatenados
         min_support: Soporte mínimo (porcentaje de transacciones)
+        canonical: Si True, cada canasta ya viene sin repetidos y no se deduplica
+        max_len: Tamaño máximo de itemset (None = sin límite)
+        n_shards: Shards de canastas contados por separado y combinados en
+            dos fases (None = MINING_SHARDS, 1 = sin shards; ver
+            utils.sharded_counting)
+        n_workers: Procesos para contar los shards (None = MINING_WORKERS)
 
     Returns:
-        Diccionario con itemsets frecuentes por tamaño
+        Diccionario con n_transactions, min_support, min_count y los
+        itemsets frecuentes por tamaño ('1-itemsets' con códigos sueltos y
+        '2-itemsets', '3-itemsets', ... con tuplas crecientes de códigos)
     """
-    n_transactions = len(transactions)
+    n_transactions = len(offsets) - 1
     min_count = int(min_support * n_transactions)
 
-    # Items individuales (1-itemsets)
-    items_count = Counter()
-    for transaction in transactions:
-        for item in set(transaction):  # set para evitar contar duplicados en la misma transacción
-            items_count[item] += 1
-
-    # Filtrar por soporte mínimo
-    frequent_1_itemsets = {item: count for item, count in items_count.items() if count >= min_count}
+    if (MINING_SHARDS if n_shards is None else n_shards) > 1:
+        itemsets = sharded_frequent_itemsets(
+            offsets, codes, min_count, max_len=max_len, canonical=canonical,
+            n_shards=n_shards, n_workers=n_workers
+        )
+    else:
+        itemsets = mine_frequent_itemsets(offsets, codes, min_count, max_len=max_len, canonical=canonical)
 
-    # Pares de items (2-itemsets)
-    pairs_count = Counter()
-    for transaction in transactions:
-        if len(transaction) >= 2:
-            for pair in combinations(sorted(set(transaction)), 2):
-                # Solo considerar pares donde ambos items son frecuentes individualmente
-                if pair[0] in frequent_1_itemsets and pair[1] in frequent_1_itemsets:
-                    pairs_count[pair] += 1
-
-    frequent_2_itemsets = {pair: count for pair, count in pairs_count.items() if count >= min_count}
-
-    # Triples de items (3-itemsets)
-    triples_count = Counter()
-    for transaction in transactions:
-        if len(transaction) >= 3:
-            for triple in combinations(sorted(set(transaction)), 3):
-                # Solo considerar triples donde todos los items son frecuentes
-                if all(item in frequent_1_itemsets for item in triple):
-                    # Y donde todos los pares son frecuentes
-                    pairs = list(combinations(triple, 2))
-                    if all(pair in frequent_2_itemsets for pair in pairs):
-                        triples_count[triple] += 1
-
-    frequent_3_itemsets = {triple: count for triple, count in triples_count.items() if count >= min_count}
-
-    return {
+    result = {
         'n_transactions': n_transactions,
         'min_support': min_support,
         'min_count': min_count,
-        '1-itemsets': frequent_1_itemsets,
-        '2-itemsets': frequent_2_itemsets,
-        '3-itemsets': frequent_3_itemsets
+        '1-itemsets': {},
+        '2-itemsets': {},
+        '3-itemsets': {},
     }
+    for itemset, count in itemsets.items():
+        key = f"{len(itemset)}-itemsets"
+        if len(itemset) == 1:
+            result[key][itemset[0]] = count
+        else:
+            result.setdefault(key, {})[itemset] = count
+    return result
+
+
+def find_frequent_itemsets(
+    transactions: Union[List[List[str]], Callable[[], Iterable[List[str]]]],
+    min_support: float = 0.01,
+    canonical: bool = False,
+    max_len: Optional[int] = 3,
+    n_shards: Optional[int] = None,
+    n_workers: Optional[int] = None
+) -> Dict:
+    """
+    Encuentra conjuntos de items frecuentes a partir de listas de transacciones
+
+    Se mantiene por compatibilidad: aplana las listas, codifica los items en
+    su orden natural y delega en find_frequent_itemsets_arrays, que es la
+    entrada a usar cuando las canastas ya están en arreglos.
+
+    Args:
+        transactions: Lista de listas, donde cada lista es una transacción con productos.
+            También acepta una función sin argumentos que devuelva un iterable
+            nuevo de transacciones (se recorre una sola vez),
+            p. ej. ``lambda: iter_product_lists(bloques())``
+        min_support: Soporte mínimo (porcentaje de transacciones)
+        canonical: Si True, cada transacción ya viene sin repetidos (p. ej.
+            iter_encoded_baskets) y no se deduplica
+        max_len: Tamaño máximo de itemset (None = sin límite)
+        n_shards: Shards de canastas (ver find_frequent_itemsets_arrays)
+        n_workers: Procesos para contar los shards (None = MINING_WORKERS)
+
+    Returns:
+        Diccionario con n_transactions, min_support, min_count y los
+        itemsets frecuentes por tamaño ('1-itemsets' con items sueltos y
+        '2-itemsets', '3-itemsets', ... con tuplas ordenadas)
+    """
+    if callable(transactions):
+        transactions = transactions()
+
+    # Una pasada para aplanar las transacciones
+    lengths = []
+    flat = []
+    for transaction in transactions:
+        lengths.append(len(transaction))
+        flat.extend(transaction)
+
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    # np.unique ordena los items como sorted(), así las tuplas salen en el mismo orden
+    items, codes = np.unique(np.asarray(flat), return_inverse=True) if flat else (np.empty(0), np.empty(0, dtype=np.int64))
+    items = items.tolist()
+
+    result = find_frequent_itemsets_arrays(
+        offsets, codes, min_support, canonical=canonical, max_len=max_len,
+        n_shards=n_shards, n_workers=n_workers
+    )
+    for key in result:
+        if key == '1-itemsets':
+            result[key] = {items[code]: count for code, count in result[key].items()}
+        elif key.endswith('-itemsets'):
+            result[key] = {tuple(items[code] for code in itemset): count for itemset, count in result[key].items()}
+    return result
 
 
 def calculate_association_rules(frequent_itemsets: Dict, min_confidence: float = 0.3) -> pd.DataFrame:
@@ -217,15 +411,55 @@ def calculate_association_rules(frequent_itemsets: Dict, min_confidence: float =
     return rules_df
 
 
-def analyze_association_rules(df: pd.DataFrame, min_support: float = 0.01, min_confidence: float = 0.3, top_n: int = 50) -> Tuple[pd.DataFrame, Dict]:
+def decode_frequent_itemsets(frequent_itemsets: Dict, dictionary: ProductDictionary) -> Dict:
+    """
+    Traducir los itemsets frecuentes de códigos densos a IDs de producto
+
+    Args:
+        frequent_itemsets: Resultado de find_frequent_itemsets sobre códigos
+        dictionary: Diccionario usado para codificar las transacciones
+
+    Returns:
+        Mismo diccionario con items y tuplas expresados como IDs (texto)
+    """
+    decoded = dict(frequent_itemsets)
+    decoded['1-itemsets'] = {
+        _decode_itemset((code,), dictionary)[0]: count
+        for code, count in frequent_itemsets['1-itemsets'].items()
+    }
+    for key in frequent_itemsets:
+        if not key.endswith('-itemsets') or key == '1-itemsets':
+            continue
+        decoded[key] = {
+            _decode_itemset(itemset, dictionary): count
+            for itemset, count in frequent_itemsets[key].items()
+        }
+    return decoded
+
+
+def analyze_association_rules(
+    df: Union[pd.DataFrame, BasketStore],
+    min_support: float = 0.01,
+    min_confidence: float = 0.3,
+    top_n: int = 50,
+    dictionary: Optional[ProductDictionary] = None,
+    max_len: Optional[int] = 3,
+    n_shards: Optional[int] = None,
+    n_workers: Optional[int] = None
+) -> Tuple[pd.DataFrame, Dict]:
     """
     Análisis completo de reglas de asociación (Market Basket Analysis)
 
     Args:
-        df: DataFrame transformado con productos_list
+        df: DataFrame transformado con productos_list, o BasketStore
         min_support: Soporte mínimo (porcentaje de transacciones)
         min_confidence: Confianza mínima para las reglas
         top_n: Número de reglas top a mostrar
+        dictionary: Diccionario de productos para codificar las canastas
+            (None = códigos asignados en orden de aparición)
+        max_len: Tamaño máximo de itemset (las reglas usan pares y triples)
+        n_shards: Shards para contar los itemsets (ver find_frequent_itemsets_arrays)
+        n_workers: Procesos para contar los shards
 
     Returns:
         Tupla con (DataFrame de reglas, Diccionario de estadísticas)
@@ -236,30 +470,35 @@ def analyze_association_rules(df: pd.DataFrame, min_support: float = 0.01, min_c
     print(f"  • Soporte mínimo: {min_support*100:.1f}%")
     print(f"  • Confianza mínima: {min_confidence*100:.1f}%")
 
-    # Filtrar solo transacciones con productos
-    df_with_products = df[df['tiene_productos']].copy()
+    # Preparar transacciones (solo las que tienen productos) como arreglos de códigos densos
+    if dictionary is None:
+        dictionary = ProductDictionary([])
+    offsets, codes = encoded_basket_arrays(df, dictionary, with_products_only=True)
 
-    print(f"\nTotal de transacciones con productos: {len(df_with_products):,}")
-
-    # Preparar transacciones
-    transactions = df_with_products['productos_list'].tolist()
+    print(f"\nTotal de transacciones con productos: {len(offsets) - 1:,}")
 
     # Calcular estadísticas de transacciones
-    transaction_sizes = [len(t) for t in transactions]
+    transaction_sizes = np.diff(offsets)
     print(f"\nEstadísticas de tamaño de transacciones:")
     print(f"  • Promedio de productos por transacción: {np.mean(transaction_sizes):.2f}")
     print(f"  • Mediana: {np.median(transaction_sizes):.2f}")
-    print(f"  • Máximo: {max(transaction_sizes)}")
-    print(f"  • Mínimo: {min(transaction_sizes)}")
+    print(f"  • Máximo: {transaction_sizes.max()}")
+    print(f"  • Mínimo: {transaction_sizes.min()}")
 
     # Encontrar itemsets frecuentes
     print(f"\nBuscando itemsets frecuentes...")
-    frequent_itemsets = find_frequent_itemsets(transactions, min_support)
+    frequent_itemsets = decode_frequent_itemsets(find_frequent_itemsets_arrays(
+        offsets, codes, min_support, canonical=True, max_len=max_len, n_shards=n_shards, n_workers=n_workers
+    ), dictionary)
 
     print(f"\nItemsets frecuentes encontrados:")
     print(f"  • Items individuales: {len(frequent_itemsets['1-itemsets']):,}")
     print(f"  • Pares de items: {len(frequent_itemsets['2-itemsets']):,}")
     print(f"  • Triples de items: {len(frequent_itemsets['3-itemsets']):,}")
+    size = 4
+    while f"{size}-itemsets" in frequent_itemsets:
+        print(f"  • Itemsets de {size} items: {len(frequent_itemsets[f'{size}-itemsets']):,}")
+        size += 1
 
     # Calcular reglas de asociación
     print(f"\nCalculando reglas de asociación...")
@@ -311,13 +550,25 @@ def analyze_association_rules(df: pd.DataFrame, min_support: float = 0.01, min_c
     return rules_df, stats
 
 
-def analyze_product_cooccurrence(df: pd.DataFrame, top_n: int = 30) -> pd.DataFrame:
+def analyze_product_cooccurrence(
+    df: Union[BasketSource, CooccurrenceMatrix],
+    top_n: int = 30,
+    dictionary: Optional[ProductDictionary] = None,
+    n_shards: Optional[int] = None,
+    n_workers: Optional[int] = None
+) -> pd.DataFrame:
     """
     Analiza co-ocurrencia simple de productos (qué productos se compran juntos)
 
     Args:
-        df: DataFrame transformado con productos_list
+        df: DataFrame transformado con productos_list, iterable de bloques
+            transformados, BasketStore o una CooccurrenceMatrix ya calculada
         top_n: Número de pares top a mostrar
+        dictionary: Diccionario de productos para codificar las canastas
+            (None = IDs presentes, en orden creciente)
+        n_shards: Shards de canastas cuyas co-ocurrencias parciales se suman
+            (None = MINING_SHARDS, 1 = sin shards)
+        n_workers: Procesos para contar los shards (None = MINING_WORKERS)
 
     Returns:
         DataFrame con pares de productos y su frecuencia
@@ -325,34 +576,20 @@ def analyze_product_cooccurrence(df: pd.DataFrame, top_n: int = 30) -> pd.DataFr
     print(f"\nANÁLISIS DE CO-OCURRENCIA DE PRODUCTOS")
     print("=" * 70)
 
-    # Filtrar transacciones con al menos 2 productos
-    df_with_products = df[df['num_productos'] >= 2].copy()
-
-    print(f"\nTransacciones con 2+ productos: {len(df_with_products):,}")
-
-    # Contar pares de productos
-    pairs_count = Counter()
-    for products in df_with_products['productos_list']:
-        if len(products) >= 2:
-            for pair in combinations(sorted(set(products)), 2):
-                pairs_count[pair] += 1
-
-    # Crear DataFrame
-    pairs_df = pd.DataFrame([
-        {
-            'producto_1': pair[0],
-            'producto_2': pair[1],
-            'frecuencia': count,
-            'porcentaje': round(count / len(df_with_products) * 100, 2)
-        }
-        for pair, count in pairs_count.most_common(top_n * 2)
-    ])
+    # Co-ocurrencia como producto disperso Xᵀ·X de la matriz canasta×producto
+    cooc = df if isinstance(df, CooccurrenceMatrix) else build_cooccurrence(
+        df, dictionary, n_shards=n_shards, n_workers=n_workers
+    )
+
+    print(f"\nTransacciones con 2+ productos: {cooc.n_multiproducto:,}")
+
+    pairs_df = cooc.top_pairs(top_n * 2)
 
     if len(pairs_df) == 0:
         print("\nNo se encontraron pares de productos.")
         return pairs_df
 
-    print(f"\nTotal de pares únicos encontrados: {len(pairs_count):,}")
+    print(f"\nTotal de pares únicos encontrados: {cooc.n_pairs:,}")
     print(f"\nTop {min(top_n, len(pairs_df))} pares de productos más frecuentes:")
     print(pairs_df.head(top_n).to_string(index=False))
 
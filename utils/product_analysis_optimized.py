@@ -6,7 +6,9 @@ Mucho más rápido para datasets grandes
 import pandas as pd
 import numpy as np
 from mlxtend.frequent_patterns import fpgrowth, association_rules as mlxtend_rules
-from mlxtend.preprocessing import TransactionEncoder
+from typing import Optional
+
+from .cooccurrence import CooccurrenceMatrix, basket_matrix
 
 
 def analyze_association_rules_optimized(
@@ -14,17 +16,21 @@ def analyze_association_rules_optimized(
     min_support: float = 0.01,
     min_confidence: float = 0.3,
     use_fpgrowth: bool = True,
-    max_len: int = 3
+    max_len: int = 3,
+    cooccurrence: Optional[CooccurrenceMatrix] = None
 ) -> pd.DataFrame:
     """
     Análisis de reglas de asociación OPTIMIZADO usando mlxtend
 
     Args:
-        df: DataFrame transformado con productos_list
+        df: DataFrame transformado (columna canónica 'productos' o productos_list)
         min_support: Soporte mínimo (0.01 = 1%)
         min_confidence: Confianza mínima
         use_fpgrowth: Si True usa FP-Growth (rápido), si False usa Apriori
         max_len: Longitud máxima de itemsets (3 = triples máximo)
+        cooccurrence: Matriz de co-ocurrencia de las mismas transacciones
+            (ver build_cooccurrence); si se pasa, su diagonal da el soporte
+            de cada producto sin recorrer la matriz de canastas
 
     Returns:
         DataFrame con reglas de asociación
@@ -38,27 +44,48 @@ def analyze_association_rules_optimized(
     print(f"  • Max longitud itemsets: {max_len}")
 
     # 1. Filtrar transacciones con productos
-    df_with_products = df[df['tiene_productos']].copy()
+    df_with_products = df[df['tiene_productos']]
     n_transactions = len(df_with_products)
     print(f"\nTransacciones con productos: {n_transactions:,}")
 
-    # 2. Preparar transacciones como lista
-    transactions = df_with_products['productos_list'].tolist()
+    # 2. Matriz dispersa canasta×producto (CSR), sin listas ni one-hot denso
+    baskets, product_ids = basket_matrix(df_with_products)
 
     # Estadísticas
-    sizes = [len(t) for t in transactions]
+    sizes = np.diff(baskets.indptr)
     print(f"\nEstadísticas de transacciones:")
     print(f"  • Productos/transacción (promedio): {np.mean(sizes):.2f}")
     print(f"  • Productos/transacción (mediana): {np.median(sizes):.0f}")
 
-    # 3. Convertir a formato one-hot (matriz binaria)
-    print(f"\nConvirtiendo a formato one-hot...")
-    te = TransactionEncoder()
-    te_ary = te.fit(transactions).transform(transactions)
-    df_encoded = pd.DataFrame(te_ary, columns=te.columns_)
-
-    print(f"  • Productos únicos encontrados: {len(te.columns_):,}")
-    print(f"  • Matriz de transacciones: {df_encoded.shape}")
+    # 3. Soporte de cada producto: ningún itemset frecuente contiene un
+    # producto sin soporte mínimo, así que esas columnas se descartan antes
+    # de pasar la matriz a mlxtend
+    item_counts = None
+    if cooccurrence is not None:
+        if cooccurrence.n_con_productos == n_transactions:
+            # La diagonal de la co-ocurrencia ya es el soporte de cada producto
+            item_counts = pd.Series(cooccurrence.item_counts, index=cooccurrence.product_ids)
+            item_counts = item_counts.reindex(product_ids, fill_value=0).to_numpy()
+        else:
+            print(f"\n⚠️  La matriz de co-ocurrencia no corresponde a estas transacciones; se ignora")
+    if item_counts is None:
+        item_counts = np.bincount(baskets.indices, minlength=len(product_ids))
+    frequent = item_counts / max(n_transactions, 1) >= min_support
+
+    print(f"\nConstruyendo matriz dispersa...")
+    baskets = baskets[:, np.flatnonzero(frequent)].astype(np.int8)
+    # mlxtend exige nombres de columna de texto con entradas dispersas
+    df_encoded = pd.DataFrame.sparse.from_spmatrix(
+        baskets, columns=product_ids[frequent].astype(str).tolist()
+    ).astype(pd.SparseDtype(bool, False))
+
+    print(f"  • Productos únicos encontrados: {len(product_ids):,}")
+    print(f"  • Productos con soporte mínimo: {int(frequent.sum()):,}")
+    print(f"  • Matriz de transacciones: {df_encoded.shape} (dispersa, {baskets.nnz:,} celdas con valor)")
+
+    if baskets.nnz == 0:
+        print("\n⚠️  No se encontraron itemsets frecuentes con estos parámetros")
+        return pd.DataFrame()
 
     # 4. Encontrar itemsets frecuentes (FP-Growth o Apriori)
     print(f"\nBuscando itemsets frecuentes con {'FP-Growth' if use_fpgrowth else 'Apriori'}...")
@@ -110,8 +137,8 @@ def analyze_association_rules_optimized(
 
     # 6. Formatear resultados (nombres en español para compatibilidad)
     rules_formatted = pd.DataFrame({
-        'antecedente': rules['antecedents'].apply(lambda x: ', '.join(sorted(list(x)))),
-        'consecuente': rules['consequents'].apply(lambda x: ', '.join(sorted(list(x)))),
+        'antecedente': rules['antecedents'].apply(lambda x: ', '.join(sorted(str(item) for item in x))),
+        'consecuente': rules['consequents'].apply(lambda x: ', '.join(sorted(str(item) for item in x))),
         'soporte': rules['support'].round(4),
         'confianza': rules['confidence'].round(4),
         'lift': rules['lift'].round(2),
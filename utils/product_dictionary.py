@@ -0,0 +1,179 @@
+"""
+Módulo para el diccionario de productos
+Asigna a cada producto de ProductCategory.csv un código denso int32 (0..n-1)
+para que contadores y minería de reglas trabajen sobre arreglos de enteros
+pequeños en lugar de cadenas
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from .config import CACHE_DIR, PRODUCTS_DIR, FILES_CONFIG, SEPARATOR
+
+DICTIONARY_FILENAME = 'product_dictionary.parquet'
+PRODUCT_ID_COLUMN = 'v.Code_pr'
+
+
+class ProductDictionary:
+    """
+    Correspondencia entre IDs de producto y códigos densos
+
+    El código de un producto es su posición en product_ids. Los productos del
+    catálogo ocupan los primeros códigos (ordenados por ID); los IDs que no
+    están en el catálogo se agregan al final al codificarlos.
+    """
+
+    def __init__(self, product_ids: Iterable[int], n_catalog: Optional[int] = None):
+        self.product_ids = np.asarray(product_ids, dtype=np.int64)
+        self.n_catalog = len(self.product_ids) if n_catalog is None else n_catalog
+        self._index = pd.Index(self.product_ids)
+        if not self._index.is_unique:
+            raise ValueError("El diccionario de productos contiene IDs duplicados")
+
+    def __len__(self) -> int:
+        return len(self.product_ids)
+
+    def __repr__(self) -> str:
+        return f"ProductDictionary(productos={len(self):,}, fuera_de_catalogo={self.n_unseen:,})"
+
+    @property
+    def catalog_ids(self) -> np.ndarray:
+        """IDs de producto del catálogo (ordenados), sin los agregados después"""
+        return self.product_ids[:self.n_catalog]
+
+    @property
+    def n_unseen(self) -> int:
+        """Productos agregados que no estaban en el catálogo"""
+        return len(self) - self.n_catalog
+
+    def encode(self, product_ids, add_unseen: bool = True) -> np.ndarray:
+        """
+        Convertir IDs de producto (enteros o texto) a códigos densos
+
+        Args:
+            product_ids: Arreglo o lista de IDs
+            add_unseen: Si True, los IDs desconocidos reciben códigos nuevos al
+                final del diccionario; si False se codifican como -1
+
+        Returns:
+            Arreglo int32 de códigos
+        """
+        ids = np.asarray(product_ids)
+        if ids.dtype.kind in 'OUS':
+            ids = ids.astype(np.int64)
+        codes = self._index.get_indexer(ids)
+
+        unseen = codes < 0
+        if add_unseen and unseen.any():
+            new_ids = pd.unique(ids[unseen])
+            self.product_ids = np.concatenate([self.product_ids, new_ids.astype(np.int64)])
+            self._index = pd.Index(self.product_ids)
+            codes[unseen] = self._index.get_indexer(ids[unseen])
+
+        return codes.astype(np.int32)
+
+    def decode(self, codes) -> np.ndarray:
+        """
+        Convertir códigos densos a IDs de producto
+
+        Args:
+            codes: Arreglo de códigos
+
+        Returns:
+            Arreglo int64 de IDs de producto
+        """
+        return self.product_ids[np.asarray(codes, dtype=np.int64)]
+
+    def encode_lists(self, product_lists: Iterable[List], add_unseen: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Codificar listas de productos (p. ej. productos_list) en una sola pasada
+
+        Args:
+            product_lists: Iterable con la lista de productos de cada transacción
+            add_unseen: Ver encode
+
+        Returns:
+            Tupla (offsets int64 de largo n+1, códigos int32 concatenados); la
+            canasta i es codes[offsets[i]:offsets[i + 1]]
+        """
+        lengths = []
+        flat = []
+        for products in product_lists:
+            lengths.append(len(products))
+            flat.extend(products)
+
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        codes = self.encode(flat, add_unseen) if flat else np.empty(0, dtype=np.int32)
+        return offsets, codes
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame con codigo, producto_id y en_catalogo"""
+        return pd.DataFrame({
+            'codigo': np.arange(len(self), dtype=np.int32),
+            'producto_id': self.product_ids,
+            'en_catalogo': np.arange(len(self)) < self.n_catalog,
+        })
+
+    def save(self, cache_dir: Path = CACHE_DIR) -> Path:
+        """
+        Guardar el diccionario como parquet en el directorio de caché
+
+        Args:
+            cache_dir: Directorio de caché
+
+        Returns:
+            Ruta del archivo escrito
+        """
+        path = Path(cache_dir) / DICTIONARY_FILENAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.parquet.tmp')
+        self.to_frame().to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return path
+
+
+def build_product_dictionary(file_path: Optional[Path] = None) -> ProductDictionary:
+    """
+    Construir el diccionario a partir de ProductCategory.csv
+
+    Args:
+        file_path: Ruta al archivo de producto-categoría (None = ruta por defecto)
+
+    Returns:
+        ProductDictionary con un código por producto del catálogo
+    """
+    if file_path is None:
+        file_path = PRODUCTS_DIR / FILES_CONFIG['product_category']
+
+    product_category = pd.read_csv(file_path, sep=SEPARATOR, usecols=[PRODUCT_ID_COLUMN])
+    product_ids = np.sort(product_category[PRODUCT_ID_COLUMN].dropna().astype(np.int64).unique())
+    return ProductDictionary(product_ids)
+
+
+def load_product_dictionary(
+    cache_dir: Path = CACHE_DIR,
+    file_path: Optional[Path] = None
+) -> ProductDictionary:
+    """
+    Leer el diccionario persistido o construirlo y guardarlo si no existe
+
+    Args:
+        cache_dir: Directorio de caché
+        file_path: Ruta a ProductCategory.csv para construirlo (None = ruta por defecto)
+
+    Returns:
+        ProductDictionary
+    """
+    path = Path(cache_dir) / DICTIONARY_FILENAME
+    if path.exists():
+        df = pd.read_parquet(path)
+        return ProductDictionary(df['producto_id'].to_numpy(), int(df['en_catalogo'].sum()))
+
+    dictionary = build_product_dictionary(file_path)
+    dictionary.save(cache_dir)
+    print(f"✓ Diccionario de productos creado: {len(dictionary):,} productos")
+    return dictionary
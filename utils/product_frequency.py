@@ -0,0 +1,197 @@
+"""
+Módulo para el conteo de frecuencias de productos sobre arreglos
+Cuenta los productos de todas las canastas con np.bincount sobre los IDs
+enteros aplanados (sin listas ni cadenas de Python) y calcula en la misma
+pasada porcentajes, participación acumulada y cortes de Pareto, opcionalmente
+por tipo de transacción o por mes
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional, Tuple, Union
+
+from .basket_store import BasketStore
+from .transformed_store import QUANTITIES_COLUMN, basket_arrays, product_arrays
+
+# Participaciones de las ventas para las que se informa cuántos productos hacen falta
+PARETO_BREAKPOINTS = (0.5, 0.8, 0.9, 0.95)
+
+# Agrupaciones soportadas por product_frequency
+FREQUENCY_GROUPS = ('tipo_transaccion', 'mes')
+
+FrequencySource = Union[pd.DataFrame, Iterable[pd.DataFrame], BasketStore]
+
+
+def _frame_arrays(frame: pd.DataFrame, by: Optional[str]) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """Productos, pesos y clave de grupo por item de un DataFrame transformado"""
+    if QUANTITIES_COLUMN in frame.columns:
+        offsets, productos, cantidades = basket_arrays(frame)
+    else:
+        # productos_list trae los repetidos: cada aparición pesa 1
+        offsets, productos = product_arrays(frame)
+        cantidades = np.ones(len(productos), dtype=np.int16)
+
+    keys = None
+    if by == 'tipo_transaccion':
+        keys = frame['tipo_transaccion'].to_numpy()
+    elif by == 'mes':
+        keys = pd.to_datetime(frame['fecha']).to_numpy(dtype='datetime64[ns]')
+    if keys is not None:
+        keys = np.repeat(keys, np.diff(offsets))
+    return productos, cantidades, keys
+
+
+def _item_arrays(data: FrequencySource, by: Optional[str]) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Arreglos planos (productos, pesos, clave de grupo) de cualquier fuente
+
+    Con un flujo de bloques solo se acumulan los arreglos enteros de cada
+    bloque, no los DataFrames.
+    """
+    if isinstance(data, BasketStore):
+        keys = None
+        if by is not None:
+            keys = np.repeat(data.tipo_transaccion if by == 'tipo_transaccion' else data.fecha, np.diff(data.offsets))
+        return data.productos, data.cantidades, keys
+
+    frames = [data] if isinstance(data, pd.DataFrame) else data
+    parts = [_frame_arrays(frame, by) for frame in frames]
+    if not parts:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, (None if by is None else empty)
+    if len(parts) == 1:
+        return parts[0]
+    return (
+        np.concatenate([part[0] for part in parts]),
+        np.concatenate([part[1] for part in parts]),
+        None if by is None else np.concatenate([part[2] for part in parts]),
+    )
+
+
+def dense_codes(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Códigos densos 0..k-1 de un arreglo de enteros no negativos
+
+    Si el rango de valores es comparable al tamaño del arreglo se usa una
+    tabla de búsqueda (lineal); si no, np.unique.
+
+    Args:
+        values: Arreglo de enteros
+
+    Returns:
+        Tupla (valores únicos ordenados, código de cada elemento)
+    """
+    values = np.asarray(values)
+    if len(values) == 0:
+        return values[:0].astype(np.int64), np.empty(0, dtype=np.int64)
+    low, high = int(values.min()), int(values.max())
+    if low >= 0 and high < 4 * len(values) + (1 << 20):
+        present = np.bincount(values, minlength=high + 1) > 0
+        lookup = np.cumsum(present) - 1
+        return np.flatnonzero(present), lookup[values]
+    return np.unique(values, return_inverse=True)
+
+
+def product_frequency(
+    data: FrequencySource,
+    by: Optional[str] = None,
+    breakpoints: Tuple[float, ...] = PARETO_BREAKPOINTS
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Frecuencias de productos y cortes de Pareto en una sola pasada
+
+    Cada producto pesa su cantidad en la canasta (o cada aparición en
+    productos_list). Los empates de frecuencia se ordenan por producto_id.
+
+    Args:
+        data: DataFrame transformado (canónico o con productos_list),
+            iterable de bloques transformados o BasketStore
+        by: None, 'tipo_transaccion' o 'mes' (AAAA-MM de la fecha)
+        breakpoints: Participaciones de las ventas para los cortes de Pareto
+
+    Returns:
+        Tupla (frecuencias, pareto):
+            - frecuencias: [by,] producto_id, frecuencia, porcentaje,
+              porcentaje_acumulado y ranking, ordenado por grupo y
+              frecuencia descendente
+            - pareto: [by,] productos, items, ventas_top_20_pct (porcentaje
+              de las ventas del 20 % de productos más vendidos) y
+              productos_<p> (productos necesarios para llegar al p % de las
+              ventas) por grupo
+
+    Raises:
+        ValueError: si by no es una agrupación soportada
+    """
+    if by is not None and by not in FREQUENCY_GROUPS:
+        raise ValueError(f"Agrupación '{by}' no válida. Opciones: {list(FREQUENCY_GROUPS)}")
+
+    productos, cantidades, keys = _item_arrays(data, by)
+    ids, product_codes = dense_codes(productos)
+    n_products = len(ids)
+
+    if by is None:
+        group_values, group_codes = np.zeros(1, dtype=np.int64), None
+    elif by == 'mes':
+        group_values, group_codes = np.unique(keys.astype('datetime64[M]'), return_inverse=True)
+    else:
+        group_values, group_codes = np.unique(keys, return_inverse=True)
+    n_groups = len(group_values)
+
+    # Un único bincount sobre la clave (grupo, producto)
+    flat_keys = product_codes if group_codes is None else group_codes * n_products + product_codes
+    counts = np.bincount(flat_keys, weights=cantidades, minlength=n_groups * n_products)
+    counts = counts.astype(np.int64).reshape(n_groups, n_products)
+
+    group_idx, product_idx = np.nonzero(counts)
+    frecuencia = counts[group_idx, product_idx]
+    order = np.lexsort((product_idx, -frecuencia, group_idx))
+    group_idx, product_idx, frecuencia = group_idx[order], product_idx[order], frecuencia[order]
+
+    totals = counts.sum(axis=1)
+    sizes = np.bincount(group_idx, minlength=n_groups)
+    starts = np.cumsum(sizes) - sizes
+    cumulative = np.cumsum(frecuencia)
+    cumulative -= np.repeat(cumulative[starts] - frecuencia[starts], sizes) if len(frecuencia) else 0
+    group_totals = np.repeat(totals, sizes)
+
+    freq_df = pd.DataFrame({
+        'producto_id': ids[product_idx],
+        'frecuencia': frecuencia,
+        'porcentaje': (frecuencia / group_totals * 100).round(2),
+        'porcentaje_acumulado': (cumulative / group_totals * 100).round(2),
+        'ranking': np.arange(len(frecuencia)) - np.repeat(starts, sizes) + 1,
+    })
+
+    pareto = {
+        'productos': sizes,
+        'items': totals,
+        'ventas_top_20_pct': np.zeros(n_groups),
+    }
+    for breakpoint in breakpoints:
+        pareto[f"productos_{breakpoint * 100:g}"] = np.zeros(n_groups, dtype=np.int64)
+    for g in range(n_groups):
+        if sizes[g] == 0:
+            continue
+        share = cumulative[starts[g]:starts[g] + sizes[g]] / totals[g]
+        top_20 = int(sizes[g] * 0.2)
+        pareto['ventas_top_20_pct'][g] = round(share[top_20 - 1] * 100, 2) if top_20 else 0.0
+        for breakpoint in breakpoints:
+            # Primer producto con el que la participación acumulada alcanza el corte
+            pareto[f"productos_{breakpoint * 100:g}"][g] = int(np.searchsorted(share, breakpoint - 1e-12)) + 1
+    pareto_df = pd.DataFrame(pareto)
+
+    if by is not None:
+        labels = group_values.astype(str) if by == 'mes' else group_values
+        freq_df.insert(0, by, labels[group_idx])
+        pareto_df.insert(0, by, labels)
+
+    return freq_df, pareto_df
+
+
+def report_pareto(pareto: pd.DataFrame, by: Optional[str] = None):
+    """Imprimir los cortes de Pareto de product_frequency (una línea por grupo)"""
+    columns = [col for col in pareto.columns if col.startswith('productos_')]
+    for _, row in pareto.iterrows():
+        label = f"  [{by} {row[by]}]" if by else " "
+        cuts = ', '.join(f"{col.split('_', 1)[1]}% → {int(row[col]):,}" for col in columns)
+        print(f"{label} Productos para llegar a cada % de las ventas: {cuts}")
@@ -0,0 +1,239 @@
+"""
+Módulo para el conteo de itemsets y co-ocurrencia por shards (map-reduce)
+Las canastas se parten en shards que se cuentan en un pool de procesos.
+Los itemsets frecuentes siguen un protocolo de dos fases (SON):
+
+1. Cada shard mina sus itemsets localmente frecuentes con el umbral
+   proporcional c_i * n >= min_count * n_i; todo itemset globalmente
+   frecuente es localmente frecuente en al menos un shard.
+2. Cada shard cuenta exactamente la unión de candidatos y los conteos
+   parciales se suman; se conservan los que alcanzan min_count.
+
+Las funciones de cada fase reciben y devuelven solo arreglos numpy y tuplas
+de enteros (códigos globales), de modo que los shards se pueden contar en
+otros hosts y combinar aquí con merge_candidate_counts
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .config import MINING_SHARDS, MINING_WORKERS
+from .itemset_mining import mine_frequent_itemsets, popcount_rows, transaction_bitsets
+
+# Un shard: (offsets int64 de largo n_i+1, códigos concatenados)
+Shard = Tuple[np.ndarray, np.ndarray]
+
+# Tamaño máximo de los bitsets combinados por bloque al contar candidatos
+CANDIDATE_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def split_shards(offsets: np.ndarray, codes: np.ndarray, n_shards: int) -> List[Shard]:
+    """
+    Partir canastas contiguas en shards con una cantidad similar de items
+
+    Args:
+        offsets: Offsets int64 de largo n+1
+        codes: Códigos de item concatenados
+        n_shards: Número de shards deseado
+
+    Returns:
+        Lista de shards (offsets relativos al shard, códigos del shard)
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_transactions = len(offsets) - 1
+    targets = np.linspace(0, offsets[-1], max(n_shards, 1) + 1)[1:-1]
+    bounds = np.unique(np.concatenate(([0], np.searchsorted(offsets, targets), [n_transactions])))
+    return [
+        (offsets[start:end + 1] - offsets[start], codes[offsets[start]:offsets[end]])
+        for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+    ]
+
+
+@contextmanager
+def _shard_map(n_workers: int) -> Iterator[Callable]:
+    """map secuencial o sobre un pool de procesos que dura las dos fases"""
+    if n_workers <= 1:
+        yield lambda fn, items: list(map(fn, items))
+        return
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        yield lambda fn, items: list(pool.map(fn, items))
+
+
+def local_candidates(
+    shard: Shard,
+    min_count: int,
+    n_transactions: int,
+    max_len: Optional[int] = None,
+    canonical: bool = False
+) -> List[Tuple[int, ...]]:
+    """
+    Fase 1: itemsets localmente frecuentes de un shard
+
+    Args:
+        shard: (offsets, códigos) del shard
+        min_count: Conteo mínimo global
+        n_transactions: Transacciones totales (todos los shards)
+        max_len: Tamaño máximo de itemset (None = sin límite)
+        canonical: Si True, cada canasta ya viene sin repetidos
+
+    Returns:
+        Lista de tuplas crecientes de códigos con c_i * n >= min_count * n_i
+    """
+    offsets, codes = shard
+    n_local = len(offsets) - 1
+    # ceil(min_count * n_i / n) sin pasar por punto flotante
+    local_min_count = -(-int(min_count) * n_local // max(int(n_transactions), 1))
+    return list(mine_frequent_itemsets(offsets, codes, max(local_min_count, 1), max_len, canonical))
+
+
+def count_candidates(shard: Shard, candidates: Sequence[Tuple[int, ...]]) -> np.ndarray:
+    """
+    Fase 2: conteo exacto de los candidatos en un shard
+
+    Args:
+        shard: (offsets, códigos) del shard
+        candidates: Tuplas de códigos (unión de los candidatos de todos los shards)
+
+    Returns:
+        Arreglo int64 con el conteo de cada candidato en el shard
+    """
+    offsets, codes = shard
+    counts = np.zeros(len(candidates), dtype=np.int64)
+    if len(candidates) == 0 or len(codes) == 0:
+        return counts
+
+    items = np.unique(np.fromiter(chain.from_iterable(candidates), dtype=np.int64))
+    codes = np.asarray(codes, dtype=np.int64)
+    if not np.isin(codes, items).any():
+        # El shard no contiene ningún item candidato: todos los conteos son 0
+        return counts
+
+    bits = transaction_bitsets(np.asarray(offsets, dtype=np.int64), codes, items)
+    rows_per_chunk = max(1, CANDIDATE_CHUNK_BYTES // max(bits.shape[1] * 8, 1))
+
+    sizes = np.fromiter((len(candidate) for candidate in candidates), dtype=np.int64, count=len(candidates))
+    for size in np.unique(sizes).tolist():
+        index = np.flatnonzero(sizes == size)
+        rows = np.searchsorted(items, np.array([candidates[i] for i in index], dtype=np.int64).reshape(-1, size))
+        for start in range(0, len(index), rows_per_chunk):
+            chunk = rows[start:start + rows_per_chunk]
+            joined = bits[chunk[:, 0]]
+            for col in range(1, size):
+                joined &= bits[chunk[:, col]]
+            counts[index[start:start + rows_per_chunk]] = popcount_rows(joined)
+    return counts
+
+
+def merge_candidate_counts(
+    candidates: Sequence[Tuple[int, ...]],
+    partial_counts: Iterable[np.ndarray],
+    min_count: int
+) -> Dict[Tuple[int, ...], int]:
+    """
+    Sumar los conteos parciales de la fase 2 y filtrar por el conteo mínimo
+
+    Args:
+        candidates: Candidatos en el mismo orden que los conteos parciales
+        partial_counts: Conteos de cada shard (count_candidates)
+        min_count: Conteo mínimo global
+
+    Returns:
+        Diccionario {tupla de códigos: conteo} de los itemsets frecuentes
+    """
+    totals = np.zeros(len(candidates), dtype=np.int64)
+    for counts in partial_counts:
+        totals += counts
+    threshold = max(int(min_count), 1)
+    return {
+        candidate: int(total)
+        for candidate, total in zip(candidates, totals.tolist())
+        if total >= threshold
+    }
+
+
+def sharded_frequent_itemsets(
+    offsets: np.ndarray,
+    codes: np.ndarray,
+    min_count: int,
+    max_len: Optional[int] = None,
+    canonical: bool = False,
+    n_shards: Optional[int] = None,
+    n_workers: Optional[int] = None
+) -> Dict[Tuple[int, ...], int]:
+    """
+    Itemsets frecuentes con el protocolo de dos fases sobre shards
+
+    Devuelve exactamente lo mismo que mine_frequent_itemsets sobre todas
+    las canastas.
+
+    Args:
+        offsets: Offsets int64 de largo n+1
+        codes: Códigos de item concatenados (no negativos)
+        min_count: Conteo mínimo global
+        max_len: Tamaño máximo de itemset (None = sin límite)
+        canonical: Si True, cada canasta ya viene sin repetidos
+        n_shards: Número de shards (None = MINING_SHARDS)
+        n_workers: Procesos del pool (None = MINING_WORKERS, 1 = secuencial)
+
+    Returns:
+        Diccionario {tupla creciente de códigos: conteo}
+    """
+    n_shards = MINING_SHARDS if n_shards is None else n_shards
+    n_workers = MINING_WORKERS if n_workers is None else n_workers
+    shards = split_shards(offsets, codes, n_shards)
+    n_transactions = len(offsets) - 1
+
+    with _shard_map(min(n_workers, len(shards))) as shard_map:
+        local = shard_map(
+            partial(local_candidates, min_count=min_count, n_transactions=n_transactions,
+                    max_len=max_len, canonical=canonical),
+            shards
+        )
+        candidates = sorted(set(chain.from_iterable(local)))
+        partial_counts = shard_map(partial(count_candidates, candidates=candidates), shards)
+
+    return merge_candidate_counts(candidates, partial_counts, min_count)
+
+
+def shard_cooccurrence(baskets: sp.csr_matrix) -> sp.csr_matrix:
+    """Co-ocurrencia parcial Xᵀ·X de las canastas de un shard"""
+    return (baskets.T.tocsr() @ baskets).tocsr()
+
+
+def sharded_cooccurrence(
+    baskets: sp.csr_matrix,
+    n_shards: Optional[int] = None,
+    n_workers: Optional[int] = None
+) -> sp.csr_matrix:
+    """
+    Co-ocurrencia producto×producto sumando las matrices parciales de cada shard
+
+    La co-ocurrencia necesita todos los pares (no hay umbral), así que la
+    reducción es la suma exacta de las matrices parciales.
+
+    Args:
+        baskets: Matriz binaria canasta×producto (ver basket_matrix)
+        n_shards: Número de shards (None = MINING_SHARDS)
+        n_workers: Procesos del pool (None = MINING_WORKERS, 1 = secuencial)
+
+    Returns:
+        Matriz CSR simétrica con los conteos de pares (diagonal = canastas por producto)
+    """
+    n_shards = MINING_SHARDS if n_shards is None else n_shards
+    n_workers = MINING_WORKERS if n_workers is None else n_workers
+    targets = np.linspace(0, baskets.nnz, max(n_shards, 1) + 1)[1:-1]
+    bounds = np.unique(np.concatenate(([0], np.searchsorted(baskets.indptr, targets), [baskets.shape[0]])))
+    shards = [baskets[start:end] for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+
+    with _shard_map(min(n_workers, len(shards))) as shard_map:
+        partials = shard_map(shard_cooccurrence, shards)
+
+    matrix = sp.csr_matrix((baskets.shape[1], baskets.shape[1]), dtype=baskets.dtype)
+    for partial_matrix in partials:
+        matrix = matrix + partial_matrix
+    return matrix.tocsr()
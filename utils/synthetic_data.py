@@ -0,0 +1,292 @@
+"""
+Módulo para generar transacciones sintéticas
+Escribe archivos diarios con el formato crudo fecha|tipo|id|productos|...
+que lee load_transactions, para medir el pipeline a
+distintas escalas sin el dataset privado. Las distribuciones se calibran con
+las estadísticas del README y la generación es determinista por semilla
+"""
+
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+from .config import (
+    SEPARATOR,
+    ENCODING,
+    SYNTHETIC_BASKET_MAX,
+    SYNTHETIC_BASKET_MEAN,
+    SYNTHETIC_CUSTOMERS,
+    SYNTHETIC_DAYS,
+    SYNTHETIC_SEED,
+    SYNTHETIC_START_DATE,
+    SYNTHETIC_TIPO_WEIGHTS,
+    SYNTHETIC_TRANSACTIONS,
+    SYNTHETIC_ZIPF_EXPONENT,
+)
+from .product_dictionary import build_product_dictionary
+
+# Peso relativo de cada día de la semana (lunes = 0); el sábado es el más activo
+WEEKDAY_WEIGHTS = np.array([0.95, 0.92, 0.95, 1.0, 1.08, 1.25, 0.85])
+
+# Peso relativo de cada hora del día (tiendas abiertas de 7 a 22 con picos
+# a media mañana y a la salida del trabajo)
+HOUR_WEIGHTS = np.array([
+    0, 0, 0, 0, 0, 0, 0, 2, 5, 8, 10, 11,
+    10, 8, 7, 7, 8, 10, 11, 10, 7, 4, 2, 0,
+], dtype=np.float64)
+
+# Forma de la distribución gamma de actividad por cliente: con 0.5 la
+# mayoría compra pocas veces y unos pocos clientes acumulan cientos de compras
+CUSTOMER_ACTIVITY_SHAPE = 0.5
+
+# Extensión de los archivos por compresión (las que reconoce list_transaction_files)
+COMPRESSION_EXTENSIONS = {None: '.csv', 'gzip': '.csv.gz', 'zstd': '.csv.zst', 'bz2': '.csv.bz2'}
+
+# Tablas de muestreo compartidas por los workers (ver _init_tables)
+_TABLES: Dict[str, np.ndarray] = {}
+
+
+def zipf_cdf(n: int, exponent: float) -> np.ndarray:
+    """
+    Distribución acumulada de una ley de Zipf sobre n rangos
+
+    Args:
+        n: Número de elementos
+        exponent: Exponente s (el rango k tiene peso 1 / k**s)
+
+    Returns:
+        Arreglo float64 creciente que termina en 1.0
+    """
+    cdf = np.cumsum(np.arange(1, n + 1, dtype=np.float64) ** -exponent)
+    return cdf / cdf[-1]
+
+
+def _init_tables(
+    product_ids: np.ndarray,
+    n_customers: int,
+    zipf_exponent: float,
+    seed: int
+):
+    """
+    Preparar las tablas de muestreo de productos y clientes
+
+    Se ejecuta una vez por proceso (initializer del pool) para no enviar las
+    tablas con cada día. La popularidad de cada producto sigue su rango de
+    Zipf, asignado con una permutación aleatoria del catálogo.
+    """
+    rng = np.random.default_rng([seed, 0])
+    _TABLES['product_ids'] = rng.permutation(np.asarray(product_ids, dtype=np.int64))
+    _TABLES['product_cdf'] = zipf_cdf(len(product_ids), zipf_exponent)
+    activity = rng.gamma(CUSTOMER_ACTIVITY_SHAPE, size=n_customers)
+    customer_cdf = np.cumsum(activity)
+    _TABLES['customer_cdf'] = customer_cdf / customer_cdf[-1]
+
+
+def _daily_counts(
+    start: np.datetime64,
+    n_days: int,
+    n_transactions: int,
+    seed: int
+) -> np.ndarray:
+    """Repartir las transacciones entre los días según WEEKDAY_WEIGHTS"""
+    days = start + np.arange(n_days)
+    # 1970-01-01 fue jueves: (días + 3) % 7 da el día de la semana con lunes = 0
+    weekday = (days.astype(np.int64) + 3) % 7
+    weights = WEEKDAY_WEIGHTS[weekday]
+    rng = np.random.default_rng([seed, 1])
+    return rng.multinomial(n_transactions, weights / weights.sum())
+
+
+def _generate_day(
+    day: np.datetime64,
+    day_index: int,
+    n_transactions: int,
+    output_path: str,
+    tipos: Sequence[int],
+    tipo_weights: Sequence[float],
+    basket_mean: float,
+    basket_max: int,
+    basket_dispersion: float,
+    groups_per_row: int,
+    compression: Optional[str],
+    seed: int
+) -> Dict[str, int]:
+    """
+    Generar y escribir las transacciones de un día
+
+    Cada día usa su propio generador (semilla, índice del día), de modo que
+    el resultado no depende del número de workers ni del orden de ejecución.
+
+    Returns:
+        Diccionario con transacciones, items y bytes escritos
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    rng = np.random.default_rng([seed, 2, day_index])
+    n = n_transactions
+
+    # Minuto del día según HOUR_WEIGHTS; el archivo queda en orden cronológico
+    hours = rng.choice(24, size=n, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    minutes = np.sort(hours * 60 + rng.integers(0, 60, size=n))
+    fechas = day.astype('datetime64[m]') + minutes
+
+    tipo = rng.choice(np.asarray(tipos, dtype=np.int64), size=n, p=tipo_weights)
+    persona = np.searchsorted(_TABLES['customer_cdf'], rng.random(n), side='right') + 1
+
+    # Tamaño de canasta 1 + binomial negativa con media basket_mean, cortada
+    # en basket_max (dispersión 1 = geométrica: moda 1 y cola larga)
+    p = basket_dispersion / (basket_dispersion + basket_mean - 1)
+    sizes = np.minimum(1 + rng.negative_binomial(basket_dispersion, p, size=n), basket_max)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    product_ranks = np.searchsorted(_TABLES['product_cdf'], rng.random(offsets[-1]), side='right')
+    productos = _TABLES['product_ids'][np.minimum(product_ranks, len(_TABLES['product_ids']) - 1)]
+
+    # Armar las líneas con kernels de texto de Arrow, sin bucles de Python
+    baskets = pa.LargeListArray.from_arrays(pa.array(offsets), pc.cast(pa.array(productos), pa.string()))
+    groups = pc.binary_join_element_wise(
+        pc.cast(pa.array(tipo), pa.string()),
+        pc.cast(pa.array(persona), pa.string()),
+        pc.binary_join(baskets, ' '),
+        SEPARATOR
+    )
+    row_starts = np.arange(0, n, groups_per_row)
+    if groups_per_row > 1:
+        # Varias transacciones por fila comparten la fecha de la primera
+        row_offsets = np.append(row_starts, n)
+        groups = pc.binary_join(pa.LargeListArray.from_arrays(pa.array(row_offsets), groups), SEPARATOR)
+    fecha_str = pc.strftime(pa.array(fechas[row_starts].astype('datetime64[s]')), format='%Y-%m-%d %H:%M:%S')
+    lines = pc.binary_join_element_wise(fecha_str, groups, SEPARATOR)
+    lines = pc.cast(pc.binary_join_element_wise(lines, '', '\n'), pa.large_string())
+
+    header = 'fecha' + f'{SEPARATOR}tipo{SEPARATOR}id{SEPARATOR}productos' * groups_per_row + '\n'
+    line_offsets = np.frombuffer(lines.buffers()[1], dtype=np.int64)[lines.offset:lines.offset + len(lines) + 1]
+    body = lines.buffers()[2][line_offsets[0]:line_offsets[-1]] if len(lines) else b''
+
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name('.' + output_path.name + '.tmp')
+    with pa.output_stream(str(tmp_path), compression=compression) as stream:
+        stream.write(header.encode(ENCODING))
+        stream.write(body)
+    os.replace(tmp_path, output_path)
+
+    return {
+        'transacciones': int(n),
+        'items': int(offsets[-1]),
+        'bytes': output_path.stat().st_size,
+    }
+
+
+def generate_transactions(
+    output_dir: Path,
+    n_days: int = SYNTHETIC_DAYS,
+    start_date: str = SYNTHETIC_START_DATE,
+    n_transactions: Optional[int] = None,
+    scale: float = 1.0,
+    n_customers: Optional[int] = None,
+    tipo_weights: Optional[Dict[int, float]] = None,
+    basket_mean: float = SYNTHETIC_BASKET_MEAN,
+    basket_max: int = SYNTHETIC_BASKET_MAX,
+    basket_dispersion: float = 1.0,
+    zipf_exponent: float = SYNTHETIC_ZIPF_EXPONENT,
+    groups_per_row: int = 1,
+    compression: Optional[str] = None,
+    product_ids: Optional[np.ndarray] = None,
+    seed: int = SYNTHETIC_SEED,
+    n_workers: int = 1
+) -> Dict:
+    """
+    Generar un directorio de transacciones sintéticas, un archivo por día
+
+    Args:
+        output_dir: Directorio destino (se usa como TRANSACTIONS_DIR)
+        n_days: Número de días (archivos)
+        start_date: Primer día, AAAA-MM-DD
+        n_transactions: Transacciones totales a escala 1 (None = SYNTHETIC_TRANSACTIONS)
+        scale: Multiplicador de transacciones y clientes (1, 10, 100...)
+        n_customers: Clientes distintos a escala 1 (None = SYNTHETIC_CUSTOMERS)
+        tipo_weights: Peso de cada tipo de transacción/tienda
+            (None = SYNTHETIC_TIPO_WEIGHTS)
+        basket_mean: Media de productos por canasta
+        basket_max: Máximo de productos por canasta
+        basket_dispersion: Parámetro r de la binomial negativa (menor = cola
+            más larga)
+        zipf_exponent: Exponente de popularidad de productos
+        groups_per_row: Transacciones por fila en formato ancho
+        compression: None, 'gzip', 'zstd' o 'bz2'
+        product_ids: Catálogo de productos (None = ProductCategory.csv)
+        seed: Semilla; la misma configuración produce los mismos archivos
+        n_workers: Días generados en paralelo (procesos)
+
+    Returns:
+        Diccionario con archivos, transacciones, items, bytes y segundos
+
+    Raises:
+        ValueError: si la compresión o los parámetros no son válidos
+    """
+    if compression not in COMPRESSION_EXTENSIONS:
+        raise ValueError(f"Compresión '{compression}' no válida. Opciones: {list(COMPRESSION_EXTENSIONS)}")
+    if basket_mean < 1 or basket_max < 1 or groups_per_row < 1 or n_days < 1:
+        raise ValueError("basket_mean, basket_max, groups_per_row y n_days deben ser >= 1")
+
+    tipo_weights = SYNTHETIC_TIPO_WEIGHTS if tipo_weights is None else tipo_weights
+    tipos = list(tipo_weights)
+    weights = np.asarray([tipo_weights[tipo] for tipo in tipos], dtype=np.float64)
+    weights = weights / weights.sum()
+
+    n_transactions = SYNTHETIC_TRANSACTIONS if n_transactions is None else n_transactions
+    n_customers = SYNTHETIC_CUSTOMERS if n_customers is None else n_customers
+    total = int(round(n_transactions * scale))
+    n_customers = max(int(round(n_customers * scale)), 1)
+    if product_ids is None:
+        product_ids = build_product_dictionary().catalog_ids
+
+    print("GENERANDO TRANSACCIONES SINTÉTICAS")
+    print("=" * 70)
+    print(f"Días: {n_days} desde {start_date}")
+    print(f"Transacciones: {total:,} (escala {scale:g})")
+    print(f"Clientes: {n_customers:,} | Productos en catálogo: {len(product_ids):,}")
+    print(f"Tipos: {', '.join(f'{tipo} ({weight:.1%})' for tipo, weight in zip(tipos, weights))}")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    start = np.datetime64(start_date, 'D')
+    counts = _daily_counts(start, n_days, total, seed)
+    extension = COMPRESSION_EXTENSIONS[compression]
+
+    jobs = [
+        (
+            start + i, i, int(counts[i]), str(output_dir / f"{start + i}{extension}"),
+            tipos, weights, basket_mean, basket_max, basket_dispersion,
+            groups_per_row, compression, seed
+        )
+        for i in range(n_days)
+    ]
+    table_args = (product_ids, n_customers, zipf_exponent, seed)
+
+    started = time.perf_counter()
+    if n_workers <= 1:
+        _init_tables(*table_args)
+        results = [_generate_day(*job) for job in jobs]
+    else:
+        print(f"Generación paralela: {n_workers} procesos")
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_tables, initargs=table_args) as pool:
+            results = list(pool.map(_generate_day, *zip(*jobs)))
+    elapsed = time.perf_counter() - started
+
+    summary = {
+        'archivos': len(results),
+        'transacciones': sum(r['transacciones'] for r in results),
+        'items': sum(r['items'] for r in results),
+        'bytes': sum(r['bytes'] for r in results),
+        'segundos': round(elapsed, 2),
+    }
+    print(f"\n✓ {summary['archivos']} archivos escritos en: {output_dir}")
+    print(f"  Transacciones: {summary['transacciones']:,}")
+    print(f"  Items: {summary['items']:,} ({summary['items'] / max(summary['transacciones'], 1):.2f} por canasta)")
+    print(f"  Tamaño: {summary['bytes'] / 1024 ** 2:,.1f} MB en {elapsed:.1f} s")
+    return summary
@@ -5,44 +5,66 @@ Análisis de ventas por tiempo, tendencias y estacionalidad
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
 
+from .basket_store import BasketStore, as_frame
+from .config import TIME_DIMENSIONS_SCHEMA
+from .transformed_store import add_time_dimensions
 
-def prepare_temporal_data(df: pd.DataFrame) -> pd.DataFrame:
+# Columnas que usan los análisis temporales (las que se leen de un BasketStore)
+TEMPORAL_COLUMNS = ['fecha', 'persona_id', 'num_productos', 'tiene_productos']
+
+DIAS_SEMANA = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def prepare_temporal_data(
+    df: Union[pd.DataFrame, BasketStore, Path],
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
     """
     Prepara datos para análisis temporal
 
+    Si el DataFrame ya trae las dimensiones de tiempo precalculadas (el
+    parquet transformado las guarda) se usan tal cual; si no, se derivan de
+    'fecha'.
+
     Args:
-        df: DataFrame con columna 'fecha'
+        df: DataFrame con columna 'fecha', BasketStore (solo se leen las
+            columnas de TEMPORAL_COLUMNS) o ruta del parquet transformado
+            (se leen TEMPORAL_COLUMNS y las dimensiones de tiempo)
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a incluir (None = todos)
 
     Returns:
-        DataFrame con columnas de tiempo adicionales
+        DataFrame con TEMPORAL_COLUMNS y las columnas de TIME_DIMENSIONS_SCHEMA
     """
-    df = df.copy()
-
-    # Convertir fecha a datetime
-    df['fecha'] = pd.to_datetime(df['fecha'])
-
-    # Extraer componentes temporales
-    df['año'] = df['fecha'].dt.year
-    df['mes'] = df['fecha'].dt.month
-    df['dia'] = df['fecha'].dt.day
-    df['dia_semana'] = df['fecha'].dt.dayofweek  # 0=Lunes, 6=Domingo
-    df['dia_semana_nombre'] = df['fecha'].dt.day_name()
-    df['hora'] = df['fecha'].dt.hour
-    df['fecha_solo'] = df['fecha'].dt.date
-    df['semana_año'] = df['fecha'].dt.isocalendar().week
-    df['año_mes'] = df['fecha'].dt.to_period('M')
-
-    return df
-
-
-def analyze_daily_sales(df: pd.DataFrame) -> pd.DataFrame:
+    columns = TEMPORAL_COLUMNS
+    if isinstance(df, (str, Path)):
+        columns = TEMPORAL_COLUMNS + list(TIME_DIMENSIONS_SCHEMA)
+    df = as_frame(df, columns, fecha_desde, fecha_hasta, tipos)
+    columns = TEMPORAL_COLUMNS + [col for col in TIME_DIMENSIONS_SCHEMA if col in df.columns]
+    return add_time_dimensions(df[columns].copy())
+
+
+def analyze_daily_sales(
+    df: Union[pd.DataFrame, BasketStore, Path],
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
     """
     Analiza ventas diarias
 
     Args:
-        df: DataFrame transformado con fecha
+        df: DataFrame transformado con fecha, BasketStore o ruta del
+            parquet transformado
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a incluir (None = todos)
 
     Returns:
         DataFrame con estadísticas de ventas diarias
@@ -50,7 +72,7 @@ def analyze_daily_sales(df: pd.DataFrame) -> pd.DataFrame:
     print("\nANÁLISIS DE VENTAS DIARIAS")
     print("=" * 70)
 
-    df_temp = prepare_temporal_data(df)
+    df_temp = prepare_temporal_data(df, fecha_desde, fecha_hasta, tipos)
 
     # Agrupar por fecha
     ventas_diarias = df_temp.groupby('fecha_solo').agg({
@@ -60,6 +82,7 @@ def analyze_daily_sales(df: pd.DataFrame) -> pd.DataFrame:
     }).reset_index()
 
     ventas_diarias.columns = ['fecha', 'total_transacciones', 'total_productos', 'transacciones_con_productos']
+    ventas_diarias['fecha'] = ventas_diarias['fecha'].dt.date
     ventas_diarias['promedio_productos_por_transaccion'] = (
         ventas_diarias['total_productos'] / ventas_diarias['total_transacciones']
     ).round(2)
@@ -84,12 +107,21 @@ def analyze_daily_sales(df: pd.DataFrame) -> pd.DataFrame:
     return ventas_diarias
 
 
-def analyze_weekly_sales(df: pd.DataFrame) -> pd.DataFrame:
+def analyze_weekly_sales(
+    df: Union[pd.DataFrame, BasketStore, Path],
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
     """
     Analiza ventas semanales
 
     Args:
-        df: DataFrame transformado con fecha
+        df: DataFrame transformado con fecha, BasketStore o ruta del
+            parquet transformado
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a incluir (None = todos)
 
     Returns:
         DataFrame con estadísticas de ventas semanales
@@ -97,7 +129,7 @@ def analyze_weekly_sales(df: pd.DataFrame) -> pd.DataFrame:
     print("\nANÁLISIS DE VENTAS SEMANALES")
     print("=" * 70)
 
-    df_temp = prepare_temporal_data(df)
+    df_temp = prepare_temporal_data(df, fecha_desde, fecha_hasta, tipos)
 
     # Agrupar por año y semana
     ventas_semanales = df_temp.groupby(['año', 'semana_año']).agg({
@@ -130,12 +162,21 @@ def analyze_weekly_sales(df: pd.DataFrame) -> pd.DataFrame:
     return ventas_semanales
 
 
-def analyze_monthly_sales(df: pd.DataFrame) -> pd.DataFrame:
+def analyze_monthly_sales(
+    df: Union[pd.DataFrame, BasketStore, Path],
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
     """
     Analiza ventas mensuales
 
     Args:
-        df: DataFrame transformado con fecha
+        df: DataFrame transformado con fecha, BasketStore o ruta del
+            parquet transformado
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a incluir (None = todos)
 
     Returns:
         DataFrame con estadísticas de ventas mensuales
@@ -143,7 +184,7 @@ def analyze_monthly_sales(df: pd.DataFrame) -> pd.DataFrame:
     print("\nANÁLISIS DE VENTAS MENSUALES")
     print("=" * 70)
 
-    df_temp = prepare_temporal_data(df)
+    df_temp = prepare_temporal_data(df, fecha_desde, fecha_hasta, tipos)
 
     # Agrupar por año y mes
     ventas_mensuales = df_temp.groupby(['año', 'mes']).agg({
@@ -181,12 +222,21 @@ def analyze_monthly_sales(df: pd.DataFrame) -> pd.DataFrame:
     return ventas_mensuales
 
 
-def analyze_day_of_week_patterns(df: pd.DataFrame) -> pd.DataFrame:
+def analyze_day_of_week_patterns(
+    df: Union[pd.DataFrame, BasketStore, Path],
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
     """
     Analiza patrones de ventas por día de la semana
 
     Args:
-        df: DataFrame transformado con fecha
+        df: DataFrame transformado con fecha, BasketStore o ruta del
+            parquet transformado
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a incluir (None = todos)
 
     Returns:
         DataFrame con estadísticas por día de la semana
@@ -194,16 +244,17 @@ def analyze_day_of_week_patterns(df: pd.DataFrame) -> pd.DataFrame:
     print("\nANÁLISIS DE PATRONES POR DÍA DE LA SEMANA")
     print("=" * 70)
 
-    df_temp = prepare_temporal_data(df)
+    df_temp = prepare_temporal_data(df, fecha_desde, fecha_hasta, tipos)
 
     # Agrupar por día de la semana
-    ventas_dia_semana = df_temp.groupby(['dia_semana', 'dia_semana_nombre']).agg({
+    ventas_dia_semana = df_temp.groupby('dia_semana').agg({
         'persona_id': 'count',
         'num_productos': 'sum',
         'tiene_productos': 'sum'
     }).reset_index()
 
-    ventas_dia_semana.columns = ['dia_semana_num', 'dia_semana', 'total_transacciones', 'total_productos', 'transacciones_con_productos']
+    ventas_dia_semana.columns = ['dia_semana_num', 'total_transacciones', 'total_productos', 'transacciones_con_productos']
+    ventas_dia_semana.insert(1, 'dia_semana', ventas_dia_semana['dia_semana_num'].map(dict(enumerate(DIAS_SEMANA))))
     ventas_dia_semana = ventas_dia_semana.sort_values('dia_semana_num')
 
     # Calcular porcentajes
@@ -231,12 +282,21 @@ def analyze_day_of_week_patterns(df: pd.DataFrame) -> pd.DataFrame:
     return ventas_dia_semana
 
 
-def analyze_hourly_patterns(df: pd.DataFrame) -> pd.DataFrame:
+def analyze_hourly_patterns(
+    df: Union[pd.DataFrame, BasketStore, Path],
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
     """
     Analiza patrones de ventas por hora del día
 
     Args:
-        df: DataFrame transformado con fecha
+        df: DataFrame transformado con fecha, BasketStore o ruta del
+            parquet transformado
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a incluir (None = todos)
 
     Returns:
         DataFrame con estadísticas por hora
@@ -244,7 +304,7 @@ def analyze_hourly_patterns(df: pd.DataFrame) -> pd.DataFrame:
     print("\nANÁLISIS DE PATRONES POR HORA DEL DÍA")
     print("=" * 70)
 
-    df_temp = prepare_temporal_data(df)
+    df_temp = prepare_temporal_data(df, fecha_desde, fecha_hasta, tipos)
 
     # Agrupar por hora
     ventas_hora = df_temp.groupby('hora').agg({
@@ -294,12 +354,21 @@ def analyze_hourly_patterns(df: pd.DataFrame) -> pd.DataFrame:
     return ventas_hora
 
 
-def analyze_trends_and_seasonality(df: pd.DataFrame) -> Dict:
+def analyze_trends_and_seasonality(
+    df: Union[pd.DataFrame, BasketStore, Path],
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> Dict:
     """
     Analiza tendencias y estacionalidad en las ventas
 
     Args:
-        df: DataFrame transformado con fecha
+        df: DataFrame transformado con fecha, BasketStore o ruta del
+            parquet transformado
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a incluir (None = todos)
 
     Returns:
         Diccionario con análisis de tendencias
@@ -307,13 +376,17 @@ def analyze_trends_and_seasonality(df: pd.DataFrame) -> Dict:
     print("\nANÁLISIS DE TENDENCIAS Y ESTACIONALIDAD")
     print("=" * 70)
 
-    df_temp = prepare_temporal_data(df)
+    df_temp = prepare_temporal_data(df, fecha_desde, fecha_hasta, tipos)
 
     # Ventas por mes para ver tendencia
-    ventas_mes = df_temp.groupby('año_mes').agg({
+    ventas_mes = df_temp.groupby(['año', 'mes']).agg({
         'persona_id': 'count',
         'num_productos': 'sum'
     }).reset_index()
+    ventas_mes.insert(0, 'año_mes', pd.to_datetime(
+        pd.DataFrame({'year': ventas_mes['año'], 'month': ventas_mes['mes'], 'day': 1})
+    ).dt.to_period('M'))
+    ventas_mes = ventas_mes.drop(columns=['año', 'mes'])
     ventas_mes.columns = ['mes', 'transacciones', 'productos']
 
     # Calcular tendencia (crecimiento promedio)
@@ -0,0 +1,131 @@
+"""
+Módulo con las reglas de validación de los grupos tipo|id|productos
+Las comparten la transformación del DataFrame ancho (data_transformer) y el
+parser directo a canastas (basket_parser), de modo que ambos caminos aceptan
+y ponen en cuarentena exactamente los mismos registros
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+# Motivos de cuarentena en orden de prioridad (un grupo recibe el primero que incumple)
+QUARANTINE_REASONS = (
+    "fecha_invalida",
+    "grupo_incompleto",
+    "tipo_invalido",
+    "persona_invalida",
+    "producto_no_numerico",
+    "producto_fuera_de_rango",
+    "producto_desconocido",
+)
+# Productos válidos: IDs numéricos separados por espacios (o ninguno)
+PRODUCTS_PATTERN = r'^[0-9\s]*$'
+# Dígitos que caben siempre en int64; los IDs además deben caber en int32
+MAX_PRODUCT_DIGITS = 18
+
+
+def is_integer(values: np.ndarray, dtype) -> np.ndarray:
+    """Máscara de valores enteros que caben en dtype"""
+    info = np.iinfo(dtype)
+    with np.errstate(invalid="ignore"):
+        return np.isfinite(values) & (values == np.floor(values)) & (values >= info.min) & (values <= info.max)
+
+
+def group_reasons(
+    fecha_valid: np.ndarray,
+    tipo_present: np.ndarray,
+    id_present: np.ndarray,
+    tipos: np.ndarray,
+    ids: np.ndarray,
+    productos,
+    catalog: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Motivo de cuarentena de cada grupo tipo|id|productos
+
+    Cada grupo recibe el primer motivo de QUARANTINE_REASONS que incumple.
+    Los productos se validan en bloque con kernels de Arrow.
+
+    Args:
+        fecha_valid: Máscara de grupos con fecha válida
+        tipo_present: Máscara de grupos con tipo
+        id_present: Máscara de grupos con id de persona
+        tipos: Tipos como float64 (NaN = ausente o no numérico)
+        ids: IDs de persona como float64 (NaN = ausente o no numérico)
+        productos: pyarrow.StringArray con los productos de cada grupo
+            (nulo = sin productos)
+        catalog: IDs de producto conocidos; None = no se comprueba el catálogo
+
+    Returns:
+        Arreglo int8 con el índice en QUARANTINE_REASONS de cada grupo (-1 = válido)
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    reason = np.full(len(fecha_valid), -1, dtype=np.int8)
+
+    def reject(mask, motivo):
+        reason[(reason < 0) & mask] = QUARANTINE_REASONS.index(motivo)
+
+    reject(~fecha_valid, "fecha_invalida")
+    reject(~(tipo_present & id_present), "grupo_incompleto")
+    reject(~is_integer(tipos, np.int16), "tipo_invalido")
+    reject(~is_integer(ids, np.int32), "persona_invalida")
+
+    with_products = np.flatnonzero(productos.is_valid().to_numpy(zero_copy_only=False))
+    if len(with_products) == 0:
+        return reason
+
+    in_group = np.zeros(len(reason), dtype=bool)
+    productos = productos.take(pa.array(with_products))
+    numeric = pc.match_substring_regex(productos, PRODUCTS_PATTERN).to_numpy(zero_copy_only=False)
+    in_group[with_products[~numeric]] = True
+    reject(in_group, "producto_no_numerico")
+    if not numeric.any():
+        return reason
+
+    tokens = pc.utf8_split_whitespace(productos.filter(pa.array(numeric)))
+    token_group = np.repeat(np.arange(len(tokens)), np.diff(tokens.offsets.to_numpy()))
+    numeric_groups = with_products[numeric]
+
+    # Los tokens de más de MAX_PRODUCT_DIGITS dígitos significativos no
+    # caben en int64: se cuentan como fuera de rango sin convertirlos
+    digits = pc.utf8_ltrim(tokens.values, characters="0")
+    too_long = pc.greater(pc.utf8_length(digits), MAX_PRODUCT_DIGITS)
+    product_ids = pc.cast(pc.if_else(too_long, "0", tokens.values), pa.int64()).to_numpy()
+    out_of_range = too_long.to_numpy(zero_copy_only=False) | (product_ids > np.iinfo(np.int32).max)
+    in_group[:] = False
+    in_group[numeric_groups[np.unique(token_group[out_of_range])]] = True
+    reject(in_group, "producto_fuera_de_rango")
+
+    if catalog is not None:
+        known = np.isin(product_ids, catalog) & ~out_of_range
+        in_group[:] = False
+        in_group[numeric_groups[np.unique(token_group[~known])]] = True
+        reject(in_group, "producto_desconocido")
+
+    return reason
+
+
+def quarantine_counts(quarantine: pd.DataFrame) -> Dict[str, int]:
+    """
+    Registros en cuarentena por motivo
+
+    Args:
+        quarantine: Grupos rechazados (columna 'motivo')
+
+    Returns:
+        Diccionario {motivo: registros} en el orden de QUARANTINE_REASONS,
+        solo con los motivos presentes
+    """
+    counts = quarantine['motivo'].value_counts(sort=False)
+    return {motivo: int(counts.get(motivo, 0)) for motivo in QUARANTINE_REASONS if counts.get(motivo, 0)}
+
+
+def report_quarantine(counts: Dict[str, int]):
+    """Imprimir los registros en cuarentena por motivo (nada si no hay)"""
+    if counts:
+        print(f"\n⚠ Registros en cuarentena: {sum(counts.values()):,}")
+        for motivo, count in counts.items():
+            print(f"  • {motivo}: {count:,}")
@@ -0,0 +1,511 @@
+"""
+Módulo para el parquet de transacciones transformadas
+Define el esquema canónico (una columna 'productos' de tipo list<int32>
+con los productos únicos y ordenados de cada canasta y otra 'cantidades'
+list<int16> con sus cantidades, en lugar de productos_str + productos_list)
+y las funciones
+para escribirlo (también particionado por mes y tipo), leerlo sin copias
+con filtros de fecha, tipo y columnas, y obtener la vista con las columnas
+antiguas cuando se necesite
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from .config import (
+    TRANSFORMED_SCHEMA,
+    TIME_DIMENSIONS_SCHEMA,
+    TRANSFORMED_PARTITION_COLUMNS,
+    TRANSFORMED_ROW_GROUP_SIZE,
+)
+from .basket_parser import canonical_baskets, expand_baskets
+from .data_loader import apply_schema
+
+PRODUCTS_COLUMN = 'productos'
+QUANTITIES_COLUMN = 'cantidades'
+LEGACY_PRODUCT_COLUMNS = ('productos_str', 'productos_list')
+
+
+def _list_types_mapper(arrow_type):
+    """Mantener las columnas de listas de Arrow como pd.ArrowDtype (sin copia)"""
+    import pyarrow as pa
+
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def _list_arrays(column: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Offsets (desde 0) y valores planos de una columna de listas de Arrow, sin copia"""
+    import pyarrow as pa
+
+    lists = pa.array(column)
+    if isinstance(lists, pa.ChunkedArray):
+        # Un dataset de varias particiones llega en varios bloques
+        lists = lists.combine_chunks()
+    offsets = lists.offsets.to_numpy().astype(np.int64)
+    values = lists.values.slice(offsets[0], offsets[-1] - offsets[0])
+    return offsets - offsets[0], values.to_numpy(zero_copy_only=values.null_count == 0)
+
+
+def product_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Canastas de un DataFrame transformado como offsets y productos planos
+
+    Con la columna canónica 'productos' no se copia nada (cada canasta tiene
+    sus productos únicos y ordenados; ver basket_arrays para las cantidades);
+    con la columna antigua productos_list (listas de texto) se aplanan tal
+    cual y se convierten a int32.
+
+    Args:
+        df: DataFrame transformado (canónico o con productos_list)
+
+    Returns:
+        Tupla (offsets int64 de largo n+1, productos int32); la canasta i es
+        productos[offsets[i]:offsets[i + 1]]
+
+    Raises:
+        ValueError: si algún producto no es un ID entero
+    """
+    import pyarrow as pa
+
+    if PRODUCTS_COLUMN in df.columns:
+        offsets, productos = _list_arrays(df[PRODUCTS_COLUMN])
+        return offsets, productos.astype(np.int32, copy=False)
+
+    lengths = np.fromiter(
+        (len(products) for products in df['productos_list']),
+        dtype=np.int64,
+        count=len(df)
+    )
+    offsets = np.zeros(len(df) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    flat = [product for products in df['productos_list'] for product in products]
+    try:
+        productos = np.asarray(flat, dtype=np.int64).astype(np.int32)
+    except ValueError as e:
+        raise ValueError(f"Producto con ID no numérico en productos_list: {e}")
+    return offsets, productos
+
+
+def basket_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Canastas canónicas de un DataFrame transformado
+
+    Args:
+        df: DataFrame transformado (canónico o con productos_list)
+
+    Returns:
+        Tupla (offsets int64, productos int32 únicos y ordenados por canasta,
+        cantidades int16); sin copia si df ya trae la columna 'cantidades'
+    """
+    offsets, productos = product_arrays(df)
+    if QUANTITIES_COLUMN in df.columns:
+        cantidades = _list_arrays(df[QUANTITIES_COLUMN])[1]
+        return offsets, productos, cantidades.astype(np.int16, copy=False)
+    return canonical_baskets(offsets, productos)
+
+
+def products_series(
+    offsets: np.ndarray,
+    productos: np.ndarray,
+    index=None,
+    name: str = PRODUCTS_COLUMN,
+    dtype: str = 'int32'
+) -> pd.Series:
+    """
+    Construir una columna de listas de Arrow a partir de offsets y valores
+
+    Args:
+        offsets: Offsets int64 de largo n+1
+        productos: Valores concatenados (IDs de producto o cantidades)
+        index: Índice de la serie resultante (None = RangeIndex)
+        name: Nombre de la serie
+        dtype: Tipo de los elementos ('int32' para productos, 'int16' para cantidades)
+
+    Returns:
+        Serie con dtype pd.ArrowDtype(list<dtype>)
+    """
+    import pyarrow as pa
+
+    value_type = pa.from_numpy_dtype(np.dtype(dtype))
+    lists = pa.LargeListArray.from_arrays(
+        pa.array(offsets, pa.int64()),
+        pa.array(productos, value_type)
+    ).cast(pa.list_(value_type))
+    return pd.Series(pd.arrays.ArrowExtensionArray(lists), index=index, name=name)
+
+
+def add_time_dimensions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agregar las columnas de TIME_DIMENSIONS_SCHEMA derivadas de 'fecha'
+
+    Solo se calculan las que faltan; el calendario ISO se obtiene una vez
+    para toda la columna.
+
+    Args:
+        df: DataFrame con columna 'fecha'
+
+    Returns:
+        El mismo DataFrame con fecha_solo, año, mes, semana_año, dia_semana
+        y hora (0=Lunes en dia_semana, semana ISO en semana_año)
+    """
+    missing = [col for col in TIME_DIMENSIONS_SCHEMA if col not in df.columns]
+    if not missing:
+        return df
+
+    fecha = pd.to_datetime(df['fecha']).dt
+    components = {
+        'fecha_solo': lambda: fecha.normalize(),
+        'año': lambda: fecha.year,
+        'mes': lambda: fecha.month,
+        'semana_año': lambda: fecha.isocalendar().week,
+        'dia_semana': lambda: fecha.dayofweek,
+        'hora': lambda: fecha.hour,
+    }
+    for col in missing:
+        df[col] = components[col]()
+    return apply_schema(df, {col: TIME_DIMENSIONS_SCHEMA[col] for col in missing})
+
+
+def to_canonical(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convertir un DataFrame transformado al esquema canónico
+
+    Sustituye productos_str y productos_list por las columnas 'productos'
+    (list<int32>, únicos y ordenados por canasta) y 'cantidades'
+    (list<int16>), agrega las dimensiones de tiempo que falten y aplica los
+    dtypes de TRANSFORMED_SCHEMA.
+
+    Args:
+        df: DataFrame transformado
+
+    Returns:
+        DataFrame canónico (el mismo si ya lo era)
+    """
+    if PRODUCTS_COLUMN in df.columns and QUANTITIES_COLUMN in df.columns:
+        return apply_schema(add_time_dimensions(df), TRANSFORMED_SCHEMA)
+
+    offsets, productos, cantidades = basket_arrays(df)
+    result = df.drop(columns=[col for col in LEGACY_PRODUCT_COLUMNS + (PRODUCTS_COLUMN,) if col in df.columns])
+    position = list(result.columns).index('persona_id') + 1 if 'persona_id' in result.columns else len(result.columns)
+    result.insert(position, PRODUCTS_COLUMN, products_series(offsets, productos, index=df.index))
+    result.insert(position + 1, QUANTITIES_COLUMN, products_series(
+        offsets, cantidades, index=df.index, name=QUANTITIES_COLUMN, dtype='int16'
+    ))
+    return apply_schema(add_time_dimensions(result), TRANSFORMED_SCHEMA)
+
+
+def legacy_view(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vista de compatibilidad con las columnas productos_str y productos_list
+
+    productos_list son listas de IDs como texto y productos_str los IDs
+    separados por espacios (NaN si la canasta está vacía), como los producía
+    la transformación original; los productos repetidos se reconstruyen a
+    partir de 'cantidades' (en orden creciente de ID).
+
+    Args:
+        df: DataFrame canónico
+
+    Returns:
+        DataFrame con productos_str y productos_list en lugar de 'productos'
+        y 'cantidades'
+    """
+    if PRODUCTS_COLUMN not in df.columns:
+        return df
+
+    offsets, productos, cantidades = basket_arrays(df)
+    offsets, productos = expand_baskets(offsets, productos, cantidades)
+    productos = productos.astype(str)
+    productos_list = [productos[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])]
+
+    result = df.drop(columns=[col for col in (PRODUCTS_COLUMN, QUANTITIES_COLUMN) if col in df.columns])
+    position = list(df.columns).index(PRODUCTS_COLUMN)
+    result.insert(position, 'productos_str', [' '.join(products) if products else np.nan for products in productos_list])
+    result.insert(position + 1, 'productos_list', productos_list)
+    return result
+
+
+def write_transformed(
+    df: pd.DataFrame,
+    path: Path,
+    row_group_size: int = TRANSFORMED_ROW_GROUP_SIZE
+) -> Path:
+    """
+    Escribir transacciones transformadas como parquet con el esquema canónico
+
+    Args:
+        df: DataFrame transformado (canónico o con las columnas antiguas)
+        path: Ruta del archivo parquet
+        row_group_size: Filas por row group
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Sin metadatos de pandas: así cualquier lector (p. ej. el backend con
+    # pd.read_parquet) interpreta la columna de listas sin conocer ArrowDtype
+    table = pa.Table.from_pandas(to_canonical(df), preserve_index=False).replace_schema_metadata(None)
+    # Temporal oculto: un lector del directorio de particiones no lo ve a medias
+    tmp_path = path.with_name('.' + path.name + '.tmp')
+    pq.write_table(table, tmp_path, row_group_size=row_group_size)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _partition_groups(df: pd.DataFrame):
+    """Grupos (directorio relativo, filas) del DataFrame canónico por mes y tipo"""
+    año_mes = df['año'].to_numpy(dtype=np.int32) * 100 + df['mes'].to_numpy(dtype=np.int32)
+    for (key, tipo), part in df.groupby([año_mes, 'tipo_transaccion'], sort=True):
+        yield Path(f"año_mes={key // 100:04d}-{key % 100:02d}") / f"tipo_transaccion={tipo}", part
+
+
+def transformed_partitions(df: pd.DataFrame) -> List[str]:
+    """
+    Directorios de partición (año_mes=AAAA-MM/tipo_transaccion=N) que ocupan
+    las transacciones, relativos a la raíz del dataset
+
+    Args:
+        df: DataFrame transformado (canónico o con las columnas antiguas)
+
+    Returns:
+        Lista ordenada de directorios
+    """
+    fechas = pd.DatetimeIndex(df['fecha'])
+    keys = np.unique(np.stack([
+        fechas.year.to_numpy(dtype=np.int64) * 100 + fechas.month.to_numpy(dtype=np.int64),
+        df['tipo_transaccion'].to_numpy(dtype=np.int64),
+    ], axis=1), axis=0)
+    return [
+        str(Path(f"año_mes={key // 100:04d}-{key % 100:02d}") / f"tipo_transaccion={tipo}")
+        for key, tipo in keys.tolist()
+    ]
+
+
+def write_transformed_partitions(df: pd.DataFrame, root: Path, basename: str) -> List[str]:
+    """
+    Escribir transacciones transformadas en particiones hive por mes y tipo
+
+    Cada combinación año_mes/tipo_transaccion va a
+    root/año_mes=AAAA-MM/tipo_transaccion=N/<basename>.parquet, sin las
+    columnas de partición (se reconstruyen al leer) y ordenada por fecha.
+
+    Args:
+        df: DataFrame transformado (canónico o con las columnas antiguas)
+        root: Directorio raíz del dataset
+        basename: Nombre de los archivos
+
+    Returns:
+        Rutas escritas, relativas a root
+    """
+    written = []
+    for relative, part in _partition_groups(to_canonical(df)):
+        relative = relative / f"{basename}.parquet"
+        part = part.drop(columns=['tipo_transaccion']).sort_values('fecha', kind='stable')
+        write_transformed(part, Path(root) / relative)
+        written.append(str(relative))
+    return written
+
+
+def month_bounds(month: str) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """Rango [inicio, fin) de fechas de un mes AAAA-MM"""
+    desde = pd.Timestamp(f"{month}-01")
+    return desde, desde + pd.DateOffset(months=1)
+
+
+def transformed_months(path: Path) -> List[str]:
+    """
+    Meses AAAA-MM del dataset transformado particionado, en orden
+
+    Args:
+        path: Directorio raíz del dataset (ver write_transformed_partitions)
+
+    Returns:
+        Lista de meses con directorio año_mes=AAAA-MM (vacía si no hay)
+    """
+    return sorted(
+        part.name.split('=', 1)[1] for part in Path(path).glob('año_mes=*') if part.is_dir()
+    )
+
+
+def _partitioning():
+    """Esquema de las particiones hive (ver write_transformed_partitions)"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(
+        pa.schema([('año_mes', pa.string()), ('tipo_transaccion', pa.int16())]),
+        flavor='hive'
+    )
+
+
+def _filter_expression(
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None,
+    partitioned: bool = False
+):
+    """
+    Expresión de filtro de pyarrow para read_transformed
+
+    Sobre un dataset particionado se agregan condiciones sobre año_mes para
+    descartar directorios completos; la condición sobre fecha usa las
+    estadísticas de los row groups.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    conditions = []
+    if fecha_desde is not None:
+        desde = pd.Timestamp(fecha_desde)
+        conditions.append(ds.field('fecha') >= pa.scalar(desde, pa.timestamp('ns')))
+        if partitioned:
+            conditions.append(ds.field('año_mes') >= desde.strftime('%Y-%m'))
+    if fecha_hasta is not None:
+        hasta = pd.Timestamp(fecha_hasta)
+        conditions.append(ds.field('fecha') < pa.scalar(hasta, pa.timestamp('ns')))
+        if partitioned:
+            conditions.append(ds.field('año_mes') <= (hasta - pd.Timedelta(1, 'ns')).strftime('%Y-%m'))
+    if tipos is not None:
+        conditions.append(ds.field('tipo_transaccion').isin([int(tipo) for tipo in tipos]))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def filter_transformed(
+    df: pd.DataFrame,
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
+    """
+    Aplicar en memoria los filtros de read_transformed
+
+    Args:
+        df: DataFrame transformado
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a conservar (None = todos)
+
+    Returns:
+        El mismo DataFrame si no hay filtros, o las filas que los cumplen
+    """
+    if fecha_desde is None and fecha_hasta is None and tipos is None:
+        return df
+
+    mask = np.ones(len(df), dtype=bool)
+    if fecha_desde is not None:
+        mask &= (pd.to_datetime(df['fecha']) >= pd.Timestamp(fecha_desde)).to_numpy()
+    if fecha_hasta is not None:
+        mask &= (pd.to_datetime(df['fecha']) < pd.Timestamp(fecha_hasta)).to_numpy()
+    if tipos is not None:
+        mask &= df['tipo_transaccion'].isin(list(tipos)).to_numpy()
+    return df[mask]
+
+
+def read_transformed(
+    path: Union[Path, Sequence[Path]],
+    columns: Optional[List[str]] = None,
+    legacy: bool = False,
+    fecha_desde=None,
+    fecha_hasta=None,
+    tipos: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
+    """
+    Leer el parquet de transacciones transformadas
+
+    Las columnas y los filtros se resuelven en la capa de parquet: sobre el
+    dataset particionado solo se abren los directorios de los meses y tipos
+    pedidos, y dentro de cada archivo se saltan los row groups fuera del
+    rango de fechas.
+
+    Args:
+        path: Ruta del archivo parquet o del directorio de particiones
+            (refresh_transformed_partitions), que se lee como un solo
+            dataset, o lista de archivos parquet sin particionar (se leen en
+            ese orden)
+        columns: Columnas a leer (None = todas)
+        legacy: Si True devuelve la vista con productos_str y productos_list
+        fecha_desde: Fecha inicial, incluida (None = sin límite)
+        fecha_hasta: Fecha final, excluida (None = sin límite)
+        tipos: Tipos de transacción a leer (None = todos)
+
+    Returns:
+        DataFrame con la columna 'productos' respaldada por Arrow (sin copia),
+        o la vista de compatibilidad si legacy=True
+    """
+    import pyarrow.dataset as ds
+
+    if isinstance(path, (str, os.PathLike)):
+        path = Path(path)
+        partitioned = path.is_dir()
+        source = str(path)
+    else:
+        partitioned = False
+        source = [str(file) for file in path]
+    dataset = ds.dataset(source, format='parquet', partitioning=_partitioning() if partitioned else None)
+
+    if columns is None:
+        # Orden canónico: las columnas de partición se leen del directorio
+        columns = [col for col in dataset.schema.names if col not in TRANSFORMED_PARTITION_COLUMNS]
+        columns.insert(1, 'tipo_transaccion')
+    elif legacy:
+        columns = [
+            name for col in columns
+            for name in ((PRODUCTS_COLUMN, QUANTITIES_COLUMN) if col in LEGACY_PRODUCT_COLUMNS else (col,))
+        ]
+        columns = list(dict.fromkeys(columns))
+
+    table = dataset.to_table(
+        columns=columns,
+        filter=_filter_expression(fecha_desde, fecha_hasta, tipos, partitioned)
+    )
+    df = table.to_pandas(types_mapper=_list_types_mapper, split_blocks=True, self_destruct=True)
+    df = apply_schema(df, TRANSFORMED_SCHEMA)
+    return legacy_view(df) if legacy else df
+
+
+def head_transformed(path: Path, n: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Primeras n transacciones por fecha del parquet transformado
+
+    Sobre el dataset particionado se leen los meses en orden y solo hasta
+    reunir n filas, en lugar de todo el historial.
+
+    Args:
+        path: Ruta del archivo parquet o del directorio de particiones
+        n: Número de transacciones
+        columns: Columnas a leer (None = todas)
+
+    Returns:
+        DataFrame canónico con las n primeras transacciones por fecha
+    """
+    path = Path(path)
+    if not path.is_dir():
+        return read_transformed(path, columns=columns).sort_values('fecha', kind='stable').head(n)
+
+    parts = []
+    n_rows = 0
+    for month in transformed_months(path):
+        desde, hasta = month_bounds(month)
+        parts.append(read_transformed(path, columns=columns, fecha_desde=desde, fecha_hasta=hasta))
+        n_rows += len(parts[-1])
+        if n_rows >= n:
+            break
+    if not parts:
+        return read_transformed(path, columns=columns)
+    df = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    return df.sort_values('fecha', kind='stable').head(n)